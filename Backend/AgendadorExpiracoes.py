@@ -0,0 +1,216 @@
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from Backend.Reserva import Reserva
+
+
+class AgendadorExpiracoes:
+    """Expira reservas no prazo, com um heap de prazos em memória.
+
+    O heap guarda (prazo, id) das reservas na fila (DataReserva +
+    PRAZO_FILA_DIAS) e das separadas para retirada (DataExpiracao). Uma
+    thread dorme até o prazo mais próximo e então expira tudo o que venceu
+    com os UPDATEs em lote de Reserva, sem olhar os ids: reserva atendida
+    ou cancelada antes do prazo deixa no heap uma entrada que só é
+    descartada quando vence.
+
+    O banco é a fonte da verdade. Na partida (e a cada
+    intervalo_reconstrucao segundos, para enxergar o que outras estações
+    gravaram) o heap é refeito com os janela prazos mais próximos de cada
+    tipo; prazos além do horizonte dessa leitura não entram no heap e são
+    lidos na reconstrução seguinte.
+    """
+
+    def __init__(self, janela: int = 10_000,
+                 intervalo_reconstrucao: float = 600.0,
+                 espera_maxima: float = 60.0):
+        self.janela = janela
+        self.intervalo_reconstrucao = intervalo_reconstrucao
+        self.espera_maxima = espera_maxima
+
+        self._heap: list[tuple[datetime, int]] = []
+        # Até onde o heap reflete o banco; None quando nada ficou de fora
+        self._horizonte: Optional[datetime] = None
+        self._proxima_reconstrucao = 0.0
+        self._condicao = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._parar = False
+
+        self._execucoes = 0
+        self._reservas_expiradas = 0
+        self._retiradas_expiradas = 0
+        self._promovidas = 0
+        self._reconstrucoes = 0
+        self._atraso_ultimo = 0.0
+        self._atraso_maximo = 0.0
+
+    def iniciar(self) -> None:
+        """Sobe a thread do agendador (a primeira reconstrução roda nela)"""
+
+        with self._condicao:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._parar = False
+            self._proxima_reconstrucao = 0.0
+            self._thread = threading.Thread(
+                target=self._laco, name="agendador-expiracoes", daemon=True)
+
+        Reserva.registrar_ouvinte(self.ao_agendar_reserva)
+        self._thread.start()
+
+    def parar(self, timeout: float = 5.0) -> None:
+
+        Reserva.remover_ouvinte(self.ao_agendar_reserva)
+        with self._condicao:
+            self._parar = True
+            self._condicao.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def agendar(self, reserva_id: int, prazo: Optional[datetime]) -> None:
+
+        if reserva_id is None or prazo is None:
+            return
+
+        with self._condicao:
+            if self._horizonte is not None and prazo > self._horizonte:
+                return
+            heapq.heappush(self._heap, (prazo, reserva_id))
+            if self._heap[0] == (prazo, reserva_id):
+                # Novo prazo mais próximo: a thread recalcula a espera
+                self._condicao.notify_all()
+
+    def ao_agendar_reserva(self, reserva: Reserva) -> None:
+        self.agendar(reserva.id, reserva.prazo)
+
+    def reconstruir(self) -> int:
+        """Refaz o heap a partir do banco; devolve quantos prazos leu"""
+
+        prazos, horizonte = Reserva.proximos_prazos(self.janela)
+        heapq.heapify(prazos)
+
+        with self._condicao:
+            self._heap = prazos
+            self._horizonte = horizonte
+            self._proxima_reconstrucao = time.monotonic() + self.intervalo_reconstrucao
+            self._reconstrucoes += 1
+            self._condicao.notify_all()
+        return len(prazos)
+
+    def executar_vencidos(self, agora: Optional[datetime] = None) -> tuple[int, int, int]:
+        """Expira o que venceu até agora.
+
+        Devolve (reservas da fila expiradas, retiradas expiradas, reservas
+        promovidas no lugar das retiradas).
+        """
+        agora = agora or datetime.now()
+
+        with self._condicao:
+            if not self._heap or self._heap[0][0] > agora:
+                return 0, 0, 0
+            mais_antigo = self._heap[0][0]
+            while self._heap and self._heap[0][0] <= agora:
+                heapq.heappop(self._heap)
+            recarregar = self._horizonte is not None and self._horizonte <= agora
+
+        # Fora do lock: promover_fila agenda os novos prazos por aqui mesmo
+        reservas = Reserva.expirar_reservas_vencidas(agora)
+        retiradas, promovidas = Reserva.expirar_retiradas_vencidas(agora)
+        atraso = (datetime.now() - mais_antigo).total_seconds()
+
+        with self._condicao:
+            self._execucoes += 1
+            self._reservas_expiradas += reservas
+            self._retiradas_expiradas += retiradas
+            self._promovidas += promovidas
+            self._atraso_ultimo = atraso
+            self._atraso_maximo = max(self._atraso_maximo, atraso)
+            if recarregar:
+                # O heap chegou ao fim do que foi lido do banco
+                self._proxima_reconstrucao = 0.0
+                self._condicao.notify_all()
+
+        if reservas or retiradas:
+            print(f"✓ {reservas} reserva(s) expiradas na fila, {retiradas} retirada(s) "
+                  f"expiradas e {promovidas} repassadas ({atraso:.1f}s após o prazo)")
+        return reservas, retiradas, promovidas
+
+    def estatisticas(self) -> dict:
+
+        agora = datetime.now()
+        with self._condicao:
+            proximo = self._heap[0][0] if self._heap else None
+            pendente = (agora - proximo).total_seconds() if proximo and proximo <= agora else 0.0
+            return {
+                'profundidade': len(self._heap),
+                'proximo_prazo': proximo,
+                'horizonte': self._horizonte,
+                'atraso_pendente': round(pendente, 3),
+                'atraso_ultimo': round(self._atraso_ultimo, 3),
+                'atraso_maximo': round(self._atraso_maximo, 3),
+                'execucoes': self._execucoes,
+                'reservas_expiradas': self._reservas_expiradas,
+                'retiradas_expiradas': self._retiradas_expiradas,
+                'promovidas': self._promovidas,
+                'reconstrucoes': self._reconstrucoes,
+                'ativo': self._thread is not None and self._thread.is_alive()
+            }
+
+    def _laco(self) -> None:
+
+        while True:
+            with self._condicao:
+                if self._parar:
+                    return
+                reconstruir = time.monotonic() >= self._proxima_reconstrucao
+
+            try:
+                if reconstruir:
+                    self.reconstruir()
+                self.executar_vencidos()
+            except Exception as e:
+                print(f"✗ Erro no agendador de expirações: {e}")
+                # Tenta ler o banco de novo na próxima volta
+                with self._condicao:
+                    self._proxima_reconstrucao = time.monotonic() + self.espera_maxima
+
+            with self._condicao:
+                if self._parar:
+                    return
+                espera = min(self.espera_maxima,
+                             self._proxima_reconstrucao - time.monotonic())
+                if self._heap:
+                    espera = min(espera, (self._heap[0][0] - datetime.now()).total_seconds())
+                if espera > 0:
+                    self._condicao.wait(espera)
+
+
+_agendador: Optional[AgendadorExpiracoes] = None
+_agendador_lock = threading.Lock()
+
+
+def obter_agendador() -> AgendadorExpiracoes:
+    """Agendador do processo, criado na primeira chamada (iniciar() à parte)"""
+
+    global _agendador
+
+    if _agendador is None:
+        with _agendador_lock:
+            if _agendador is None:
+                _agendador = AgendadorExpiracoes()
+
+    return _agendador
+
+
+def parar_agendador() -> None:
+
+    global _agendador
+
+    with _agendador_lock:
+        if _agendador is not None:
+            _agendador.parar()
+            _agendador = None
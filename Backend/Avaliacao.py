@@ -4,6 +4,9 @@ from typing import Optional
 
 class Avaliacao:
 
+    # Abaixo do limite de parâmetros por comando do SQLite (999) e do SQL Server (2100)
+    LOTE_IDS = 900
+
     def __init__(self, livro_id: int, usuario_id: int, nota: int,
                  comentario: Optional[str] = None, id: Optional[int] = None,
                  data_avaliacao: Optional[datetime] = None, ativa: bool = True,
@@ -60,23 +63,26 @@ class Avaliacao:
 
         db = DatabaseConnection()
 
-        if self._usuario_ja_avaliou(db):
-            return False, "Usuário já avaliou este livro"
-
         try:
             query = """INSERT INTO Avaliacao (LivroId, UsuarioId, Nota, Comentario, DataAvaliacao, EmprestimoId)
+                      OUTPUT INSERTED.Id
                       VALUES (?, ?, ?, ?, ?, ?)"""
             params = (self.livro_id, self.usuario_id, self.nota,
                       self.comentario, self.data_avaliacao, self.emprestimo_id)
 
-            if db.execute_non_query(query, params):
-                self.id = self._buscar_ultimo_id(db)
-                return True, "Avaliação salva com sucesso!"
-            else:
-                return False, "Falha ao salvar avaliação"
+            with db.transaction():
+                if self._usuario_ja_avaliou(db):
+                    return False, "Usuário já avaliou este livro"
+
+                self.id = db.execute_returning(query, params)
+                Avaliacao._atualizar_resumo(db, self.livro_id, self.nota, +1)
+
+            return True, "Avaliação salva com sucesso!"
 
         except Exception as e:
             return False, f"Erro ao salvar avaliação: {e}"
+        finally:
+            db.close()
 
     def excluir(self) -> tuple[bool, str]:
 
@@ -88,15 +94,23 @@ class Avaliacao:
         db = DatabaseConnection()
 
         try:
-            query = "UPDATE Avaliacao SET Ativa = 0 WHERE Id = ?"
-            if db.execute_non_query(query, (self.id,)):
-                self.ativa = False
-                return True, "Avaliação removida com sucesso!"
-            else:
-                return False, "Falha ao remover avaliação"
+            query = "UPDATE Avaliacao SET Ativa = 0 WHERE Id = ? AND Ativa = 1"
+
+            with db.transaction():
+                if not db.execute_rowcount(query, (self.id,)):
+                    return False, "Avaliação não encontrada ou já removida"
+
+                row = db.execute_query(
+                    "SELECT LivroId, Nota FROM Avaliacao WHERE Id = ?", (self.id,))[0]
+                Avaliacao._atualizar_resumo(db, row['LivroId'], row['Nota'], -1)
+
+            self.ativa = False
+            return True, "Avaliação removida com sucesso!"
 
         except Exception as e:
             return False, f"Erro ao remover avaliação: {e}"
+        finally:
+            db.close()
 
     @staticmethod
     def listar_por_livro(livro_id: int) -> list['Avaliacao']:
@@ -118,6 +132,52 @@ class Avaliacao:
         except Exception as e:
             print(f"✗ Erro ao listar avaliações: {e}")
             return []
+        finally:
+            db.close()
+
+    @staticmethod
+    def listar_por_livro_com_avaliador(
+            livro_id: int, limite: int = 20, offset: int = 0) -> list[dict]:
+        """Avaliações do livro, mais recentes primeiro, já com nome e tipo de
+        quem avaliou (uma consulta por página, sem buscar cada usuário)"""
+
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            query = """
+                SELECT
+                    a.Id, a.UsuarioId, a.Nota, a.Comentario, a.DataAvaliacao, a.EmprestimoId,
+                    u.Nome as AvaliadorNome, u.TipoUsuario as AvaliadorTipo
+                FROM Avaliacao a
+                LEFT JOIN Usuario u ON u.Id = a.UsuarioId
+                WHERE a.LivroId = ? AND a.Ativa = 1
+                ORDER BY a.DataAvaliacao DESC, a.Id DESC
+                OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+            """
+            resultados = db.execute_query(query, (livro_id, offset, limite))
+
+            return [
+                {
+                    'id': row['Id'],
+                    'livro_id': livro_id,
+                    'usuario_id': row['UsuarioId'],
+                    'nota': row['Nota'],
+                    'comentario': row['Comentario'],
+                    'data_avaliacao': row['DataAvaliacao'],
+                    'emprestimo_id': row['EmprestimoId'],
+                    'avaliador_nome': row['AvaliadorNome'],
+                    'avaliador_tipo': row['AvaliadorTipo']
+                }
+                for row in resultados or []
+            ]
+
+        except Exception as e:
+            print(f"✗ Erro ao listar avaliações com avaliador: {e}")
+            return []
+        finally:
+            db.close()
 
     @staticmethod
     def listar_por_emprestimo(emprestimo_id: int) -> list['Avaliacao']:
@@ -140,6 +200,8 @@ class Avaliacao:
         except Exception as e:
             print(f"✗ Erro ao listar avaliações por empréstimo: {e}")
             return []
+        finally:
+            db.close()
 
     @staticmethod
     def listar_por_usuario(usuario_id: int) -> list[dict]:
@@ -192,32 +254,141 @@ class Avaliacao:
         except Exception as e:
             print(f"Erro ao buscar avaliações do usuário: {e}")
             return []
+        finally:
+            db.close()
 
     @staticmethod
     def calcular_media_livro(livro_id: int) -> float:
+        return Avaliacao.resumo_livro(livro_id)['media']
+
+    @staticmethod
+    def resumo_livro(livro_id: int) -> dict:
+        """Média, total e distribuição de estrelas de um livro (leitura O(1))"""
+        return Avaliacao.resumos_por_livro([livro_id]).get(
+            livro_id, Avaliacao._resumo_vazio(livro_id))
 
+    @staticmethod
+    def resumos_por_livro(livro_ids: Optional[list[int]] = None) -> dict[int, dict]:
+        """Resumos de vários livros lidos de AvaliacaoResumo.
+
+        Sem livro_ids, devolve todos os livros avaliados. Livros sem
+        avaliação ficam fora do dicionário.
+        """
         from Banco_de_dados.connection import DatabaseConnection
 
         db = DatabaseConnection()
 
         try:
-            query = "SELECT AVG(CAST(Nota AS FLOAT)) as Media FROM Avaliacao WHERE LivroId = ? AND Ativa = 1"
-            resultado = db.execute_query(query, (livro_id,))
+            query = """
+                SELECT LivroId, SomaNotas, TotalAvaliacoes,
+                       Estrelas1, Estrelas2, Estrelas3, Estrelas4, Estrelas5
+                FROM AvaliacaoResumo
+                WHERE TotalAvaliacoes > 0{filtro}
+            """
+
+            if livro_ids is None:
+                lotes = [()]
+            else:
+                ids = list(dict.fromkeys(livro_ids))
+                lotes = [tuple(ids[i:i + Avaliacao.LOTE_IDS])
+                         for i in range(0, len(ids), Avaliacao.LOTE_IDS)]
 
-            if resultado and len(resultado) > 0:
-                if isinstance(resultado[0], dict):
-                    media = resultado[0].get('Media') or resultado[0].get('')
-                else:
-                    media = resultado[0][0]
+            resumos = {}
+            for lote in lotes:
+                filtro = ""
+                if lote:
+                    filtro = f" AND LivroId IN ({', '.join('?' * len(lote))})"
 
-                if media is not None:
-                    return round(float(media), 1)
+                resultados = db.execute_query(query.format(filtro=filtro), lote)
+                for row in resultados or []:
+                    resumos[row['LivroId']] = Avaliacao._resumo_from_row(row)
 
-            return 0.0
+            return resumos
 
         except Exception as e:
-            print(f"✗ Erro ao calcular média: {e}")
-            return 0.0
+            print(f"✗ Erro ao carregar resumos de avaliação: {e}")
+            return {}
+        finally:
+            db.close()
+
+    @staticmethod
+    def medias_por_livro(livro_ids: Optional[list[int]] = None) -> dict[int, dict]:
+        """Média e total de avaliações de vários livros"""
+        return {
+            livro_id: {'media': resumo['media'], 'total': resumo['total']}
+            for livro_id, resumo in Avaliacao.resumos_por_livro(livro_ids).items()
+        }
+
+    @staticmethod
+    def reconstruir_resumos() -> bool:
+        """Recalcula AvaliacaoResumo a partir da tabela Avaliacao"""
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            with db.transaction():
+                db.execute_non_query("DELETE FROM AvaliacaoResumo")
+                db.execute_non_query("""
+                    INSERT INTO AvaliacaoResumo (LivroId, SomaNotas, TotalAvaliacoes,
+                        Estrelas1, Estrelas2, Estrelas3, Estrelas4, Estrelas5)
+                    SELECT LivroId, SUM(Nota), COUNT(*),
+                        SUM(CASE WHEN Nota = 1 THEN 1 ELSE 0 END),
+                        SUM(CASE WHEN Nota = 2 THEN 1 ELSE 0 END),
+                        SUM(CASE WHEN Nota = 3 THEN 1 ELSE 0 END),
+                        SUM(CASE WHEN Nota = 4 THEN 1 ELSE 0 END),
+                        SUM(CASE WHEN Nota = 5 THEN 1 ELSE 0 END)
+                    FROM Avaliacao
+                    WHERE Ativa = 1
+                    GROUP BY LivroId
+                """)
+            return True
+
+        except Exception as e:
+            print(f"✗ Erro ao reconstruir resumos de avaliação: {e}")
+            return False
+        finally:
+            db.close()
+
+    @staticmethod
+    def _atualizar_resumo(db, livro_id: int, nota: int, delta: int) -> None:
+        """Soma (delta=+1) ou retira (delta=-1) uma nota do resumo do livro"""
+        estrelas = f"Estrelas{int(nota)}"
+        query = f"""
+            UPDATE AvaliacaoResumo WITH (UPDLOCK, HOLDLOCK)
+            SET SomaNotas = SomaNotas + ?, TotalAvaliacoes = TotalAvaliacoes + ?,
+                {estrelas} = {estrelas} + ?
+            WHERE LivroId = ?
+        """
+        if db.execute_rowcount(query, (nota * delta, delta, delta, livro_id)):
+            return
+
+        db.execute_non_query(
+            f"""INSERT INTO AvaliacaoResumo (LivroId, SomaNotas, TotalAvaliacoes, {estrelas})
+                VALUES (?, ?, ?, ?)""",
+            (livro_id, nota * delta, delta, delta))
+
+    @staticmethod
+    def _resumo_vazio(livro_id: int) -> dict:
+        return {
+            'livro_id': livro_id,
+            'media': 0.0,
+            'total': 0,
+            'soma': 0,
+            'histograma': {estrelas: 0 for estrelas in range(1, 6)}
+        }
+
+    @staticmethod
+    def _resumo_from_row(row) -> dict:
+
+        total = row['TotalAvaliacoes']
+        return {
+            'livro_id': row['LivroId'],
+            'media': round(row['SomaNotas'] / total, 1) if total else 0.0,
+            'total': total,
+            'soma': row['SomaNotas'],
+            'histograma': {estrelas: row[f'Estrelas{estrelas}'] for estrelas in range(1, 6)}
+        }
 
     @staticmethod
     def _from_db_row(row) -> 'Avaliacao':
@@ -246,34 +417,19 @@ class Avaliacao:
             )
 
     def _usuario_ja_avaliou(self, db) -> bool:
+        """Roda dentro da transação de salvar: um erro aqui sobe e desfaz
+        tudo, em vez de deixar passar uma avaliação duplicada"""
 
-        try:
-            if self.emprestimo_id:
-                query = "SELECT COUNT(*) FROM Avaliacao WHERE EmprestimoId = ? AND Ativa = 1"
-                resultado = db.execute_query(query, (self.emprestimo_id,))
-            else:
-                query = "SELECT COUNT(*) FROM Avaliacao WHERE LivroId = ? AND UsuarioId = ? AND Ativa = 1"
-                resultado = db.execute_query(
-                    query, (self.livro_id, self.usuario_id))
-
-            if resultado:
-                if isinstance(resultado[0], dict):
-                    return resultado[0].get('', 0) > 0
-                else:
-                    return resultado[0][0] > 0
-            return False
-        except Exception as e:
-            print(f"Erro ao verificar duplicação: {e}")
-            return False
+        if self.emprestimo_id:
+            query = "SELECT COUNT(*) FROM Avaliacao WHERE EmprestimoId = ? AND Ativa = 1"
+            resultado = db.execute_scalar(query, (self.emprestimo_id,))
+        else:
+            query = "SELECT COUNT(*) FROM Avaliacao WHERE LivroId = ? AND UsuarioId = ? AND Ativa = 1"
+            resultado = db.execute_scalar(
+                query, (self.livro_id, self.usuario_id))
 
-    def _buscar_ultimo_id(self, db) -> Optional[int]:
+        return bool(resultado and resultado > 0)
 
-        try:
-            query = "SELECT SCOPE_IDENTITY()"
-            resultado = db.execute_query(query)
-            return int(resultado[0][0]) if resultado else None
-        except BaseException:
-            return None
 
     def __str__(self) -> str:
         return f"Avaliacao(id={self.id}, livro_id={self.livro_id}, nota={self.nota})"
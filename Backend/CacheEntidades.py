@@ -0,0 +1,121 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class CacheEntidades:
+    """Cache LRU com validade (TTL) para entidades lidas por chave.
+
+    Cada entidade pode ser guardada sob várias chaves (por exemplo
+    ('id', 7) e ('isbn', '978...')); invalidar(id) remove todas de uma vez.
+    O cache devolve cópias, então quem altera o objeto recebido antes de
+    salvar não suja o que está guardado.
+    """
+
+    def __init__(self, nome: str, capacidade: int = 512, ttl: float = 300.0):
+        self.nome = nome
+        self.capacidade = capacidade
+        self.ttl = ttl
+
+        # chave -> (expira_em, id, entidade)
+        self._entradas: OrderedDict[Hashable, tuple[float, Any, Any]] = OrderedDict()
+        self._chaves_por_id: dict[Any, set] = {}
+        self._lock = threading.Lock()
+
+        self._acertos = 0
+        self._falhas = 0
+        self._expirados = 0
+        self._descartes = 0
+        self._invalidacoes = 0
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        """Cópia da entidade guardada, ou None se ausente/expirada"""
+
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self._falhas += 1
+                return None
+
+            expira_em, entidade_id, entidade = entrada
+            if expira_em <= time.monotonic():
+                self._remover_id(entidade_id)
+                self._expirados += 1
+                self._falhas += 1
+                return None
+
+            self._entradas.move_to_end(chave)
+            self._acertos += 1
+            return copy.copy(entidade)
+
+    def guardar(self, entidade: Any, *chaves: Hashable) -> None:
+        """Guarda uma cópia da entidade sob as chaves informadas"""
+
+        entidade_id = getattr(entidade, 'id', None)
+        if entidade is None or entidade_id is None or not chaves:
+            return
+
+        copia = copy.copy(entidade)
+        expira_em = time.monotonic() + self.ttl
+
+        with self._lock:
+            # Chaves antigas da mesma entidade (ex.: ISBN alterado) saem junto
+            self._remover_id(entidade_id)
+            for chave in chaves:
+                self._remover_chave(chave)
+                self._entradas[chave] = (expira_em, entidade_id, copia)
+                self._chaves_por_id.setdefault(entidade_id, set()).add(chave)
+
+            while len(self._entradas) > self.capacidade:
+                chave, (_, antigo_id, _) = self._entradas.popitem(last=False)
+                chaves_antigas = self._chaves_por_id.get(antigo_id)
+                if chaves_antigas is not None:
+                    chaves_antigas.discard(chave)
+                    if not chaves_antigas:
+                        del self._chaves_por_id[antigo_id]
+                self._descartes += 1
+
+    def invalidar(self, entidade_id: Any) -> None:
+
+        with self._lock:
+            if self._remover_id(entidade_id):
+                self._invalidacoes += 1
+
+    def limpar(self) -> None:
+
+        with self._lock:
+            self._entradas.clear()
+            self._chaves_por_id.clear()
+
+    def estatisticas(self) -> dict:
+
+        with self._lock:
+            consultas = self._acertos + self._falhas
+            return {
+                'cache': self.nome,
+                'tamanho': len(self._entradas),
+                'capacidade': self.capacidade,
+                'acertos': self._acertos,
+                'falhas': self._falhas,
+                'expirados': self._expirados,
+                'descartes': self._descartes,
+                'invalidacoes': self._invalidacoes,
+                'taxa_acerto': round(self._acertos / consultas, 3) if consultas else 0.0
+            }
+
+    def _remover_id(self, entidade_id: Any) -> bool:
+        chaves = self._chaves_por_id.pop(entidade_id, None)
+        for chave in chaves or ():
+            self._entradas.pop(chave, None)
+        return bool(chaves)
+
+    def _remover_chave(self, chave: Hashable) -> None:
+        entrada = self._entradas.pop(chave, None)
+        if entrada is not None:
+            chaves = self._chaves_por_id.get(entrada[1])
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._chaves_por_id[entrada[1]]
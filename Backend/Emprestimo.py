@@ -22,6 +22,11 @@ class TipoEmprestimo(Enum):
 
 class Emprestimo:
 
+    LIMITE_EMPRESTIMOS = 3
+    # R$ 2,00 por dia de atraso, até R$ 50,00 por empréstimo
+    MULTA_DIARIA = 2.0
+    MULTA_MAXIMA = 50.0
+
     def __init__(
             self,
             usuario_id: int,
@@ -84,27 +89,32 @@ class Emprestimo:
 
         return True, "Dados válidos"
 
-    def esta_em_atraso(self) -> bool:
+    def esta_em_atraso(self, referencia: Optional[datetime] = None) -> bool:
 
         if self.status == StatusEmprestimo.DEVOLVIDO:
             return False
 
-        return datetime.now() > self.data_prevista_devolucao
+        return (referencia or datetime.now()) > self.data_prevista_devolucao
 
-    def dias_atraso(self) -> int:
+    def dias_atraso(self, referencia: Optional[datetime] = None) -> int:
+        """Dias de calendário desde a data prevista (mesma conta do
+        DATEDIFF(day, ...) usado na varredura)"""
+        referencia = referencia or datetime.now()
 
-        if not self.esta_em_atraso():
+        if not self.esta_em_atraso(referencia):
             return 0
 
-        return (datetime.now() - self.data_prevista_devolucao).days
+        return (referencia.date() - self.data_prevista_devolucao.date()).days
 
-    def calcular_multa(self, valor_diario: float = 2.0) -> float:
+    def calcular_multa(self,
+                       valor_diario: float = MULTA_DIARIA,
+                       referencia: Optional[datetime] = None) -> float:
 
-        dias = self.dias_atraso()
+        dias = self.dias_atraso(referencia)
         if dias <= 0:
             return 0.0
 
-        return dias * valor_diario
+        return min(dias * valor_diario, Emprestimo.MULTA_MAXIMA)
 
     def atualizar_status(self) -> None:
 
@@ -158,45 +168,76 @@ class Emprestimo:
         if self.status == StatusEmprestimo.CANCELADO:
             return False, "Empréstimo foi cancelado"
 
-        try:
-            from Banco_de_dados.connection import DatabaseConnection
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
 
+        try:
             self.data_devolucao = data_devolucao or datetime.now()
+            # A multa fica congelada no dia da devolução
+            self.valor_multa = self.calcular_multa(referencia=self.data_devolucao)
             self.status = StatusEmprestimo.DEVOLVIDO
 
             if observacoes_devolucao:
                 self.observacoes = (self.observacoes or "") + \
                     f"\nDevolução: {observacoes_devolucao}"
 
-            db = DatabaseConnection()
             query = """
             UPDATE Emprestimo
-            SET DataDevolucao = ?, Status = 'Devolvido', Observacoes = ?
-            WHERE Id = ?
+            SET DataDevolucao = ?, Status = 'Devolvido', Observacoes = ?, ValorMulta = ?
+            WHERE Id = ? AND Status IN ('Emprestado', 'Atrasado')
             """
 
-            if db.execute_non_query(
-                    query, (self.data_devolucao, self.observacoes, self.id)):
-                return True, "Devolução registrada com sucesso"
-            else:
-                return False, "Erro ao salvar devolução no banco"
+            with db.transaction():
+                Emprestimo._ajustar_estoque(db, self.id, -1)
+                if db.execute_rowcount(query, (
+                        self.data_devolucao, self.observacoes,
+                        self.valor_multa, self.id)):
+                    # O exemplar devolvido fica separado para o primeiro da
+                    # fila de espera, na mesma transação
+                    from Backend.Reserva import Reserva
+                    if Reserva.promover_fila(db, {self.livro_id: 1}):
+                        return True, "Devolução registrada; exemplar separado para a próxima reserva"
+                    return True, "Devolução registrada com sucesso"
+
+            return False, "Empréstimo não está ativo no banco"
         except Exception as e:
             return False, f"Erro ao registrar devolução: {e}"
+        finally:
+            db.close()
 
     def cancelar(self, motivo: str) -> tuple[bool, str]:
 
         if self.status == StatusEmprestimo.DEVOLVIDO:
             return False, "Não é possível cancelar empréstimo devolvido"
 
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
         try:
             self.status = StatusEmprestimo.CANCELADO
             self.observacoes = (self.observacoes or "") + \
                 f"\nCancelado: {motivo}"
             self.data_atualizacao = datetime.now()
 
+            if self.id:
+                query = """
+                UPDATE Emprestimo
+                SET Status = 'Cancelado', Observacoes = ?
+                WHERE Id = ? AND Status IN ('Emprestado', 'Atrasado')
+                """
+                with db.transaction():
+                    Emprestimo._ajustar_estoque(db, self.id, -1)
+                    if db.execute_rowcount(query, (self.observacoes, self.id)):
+                        from Backend.Reserva import Reserva
+                        Reserva.promover_fila(db, {self.livro_id: 1})
+
             return True, "Empréstimo cancelado com sucesso"
         except Exception as e:
             return False, f"Erro ao cancelar empréstimo: {e}"
+        finally:
+            db.close()
 
     def salvar(self) -> tuple[bool, str]:
         """Salva o empréstimo no banco de dados"""
@@ -204,11 +245,12 @@ class Emprestimo:
         if not valido:
             return False, f"Erro de validação: {mensagem}"
 
-        try:
-            from Banco_de_dados.connection import DatabaseConnection
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
 
+        try:
             self.atualizar_status()
-            db = DatabaseConnection()
 
             if self.id:
 
@@ -225,70 +267,118 @@ class Emprestimo:
                     self.status.value, self.observacoes, self.id
                 )
 
-                if db.execute_non_query(query, params):
-                    return True, "Empréstimo atualizado com sucesso"
-                else:
-                    return False, "Erro ao atualizar empréstimo no banco"
-            else:
-
-                limite_check_query = """
-                SELECT COUNT(*) as TotalAtivos
-                FROM Emprestimo
-                WHERE UsuarioId = ? AND Status IN ('Emprestado', 'Atrasado')
-                """
-                limite_result = db.execute_query(
-                    limite_check_query, (self.usuario_id,))
+                with db.transaction():
+                    # Sai do contador do livro/status antigos e entra no novo
+                    Emprestimo._ajustar_estoque(db, self.id, -1)
+                    if not db.execute_rowcount(query, params):
+                        return False, "Empréstimo não encontrado no banco"
+                    Emprestimo._ajustar_estoque(db, self.id, +1)
 
-                if limite_result and len(limite_result) > 0:
-                    total_ativos = limite_result[0].get('TotalAtivos', 0)
-                    limite_emprestimos = 3
-
-                    if total_ativos >= limite_emprestimos:
-                        return False, f"Usuário já atingiu o limite de {limite_emprestimos} empréstimos simultâneos"
-
-                disponibilidade_query = """
-                SELECT
-                    l.Quantidade,
-                    ISNULL((SELECT COUNT(*) FROM Emprestimo e WHERE e.LivroId = l.Id AND e.Status IN ('Emprestado', 'Atrasado')), 0) as Emprestados
-                FROM Livro l
-                WHERE l.Id = ?
-                """
-                disp_result = db.execute_query(
-                    disponibilidade_query, (self.livro_id,))
-
-                if disp_result and len(disp_result) > 0:
-                    quantidade_total = disp_result[0].get('Quantidade', 0)
-                    emprestados = disp_result[0].get('Emprestados', 0)
-                    disponivel = quantidade_total - emprestados
+                return True, "Empréstimo atualizado com sucesso"
+            else:
 
-                    if disponivel <= 0:
-                        return False, "Livro não está disponível para empréstimo"
+                with db.transaction():
+                    novo_id = self._inserir_novo(db)
+                    if novo_id is not None:
+                        self.id = int(novo_id)
+                        return True, "Empréstimo registrado com sucesso"
 
-                query = """
-                INSERT INTO Emprestimo (UsuarioId, LivroId, DataEmprestimo, DataPrevistaDevolucao, Status, Observacoes)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """
-                params = (
-                    self.usuario_id,
-                    self.livro_id,
-                    self.data_emprestimo,
-                    self.data_prevista_devolucao,
-                    self.status.value,
-                    self.observacoes)
-
-                result = db.execute_non_query(query, params)
-                if result:
-
-                    id_query = "SELECT @@IDENTITY as NovoId"
-                    id_result = db.execute_query(id_query)
-                    if id_result and len(id_result) > 0:
-                        self.id = id_result[0].get('NovoId')
-                    return True, "Empréstimo registrado com sucesso"
-                else:
-                    return False, "Erro ao salvar empréstimo no banco"
+                return False, self._motivo_recusa(db)
 
         except Exception as e:
             return False, f"Erro ao salvar empréstimo: {e}"
+        finally:
+            db.close()
+
+    def _inserir_novo(self, db) -> Optional[int]:
+        """Insere o empréstimo se o usuário está abaixo do limite e há
+        exemplar para ele; devolve o id ou None se foi recusado.
+
+        Quem tem um exemplar separado pela fila de espera o retira sem
+        disputar o estoque (o contador já o inclui): a reserva vira
+        Atendida. Senão o exemplar sai do contador do livro. No SQL Server
+        a checagem, o INSERT e a baixa vão num único batch, com os locks
+        segurando limite e estoque até o commit; no SQLite são comandos em
+        sequência dentro do BEGIN IMMEDIATE, que já serializa as escritas.
+        """
+        insercao = """
+        INSERT INTO Emprestimo (UsuarioId, LivroId, DataEmprestimo, DataPrevistaDevolucao, Status, Observacoes)
+        OUTPUT INSERTED.Id{destino}
+        SELECT ?, ?, ?, ?, ?, ?
+        WHERE (SELECT COUNT(*) FROM Emprestimo WITH (UPDLOCK, HOLDLOCK)
+               WHERE UsuarioId = ? AND Status IN ('Emprestado', 'Atrasado')) < ?
+          AND (EXISTS (SELECT 1 FROM Reserva WITH (UPDLOCK, HOLDLOCK)
+                       WHERE UsuarioId = ? AND LivroId = ? AND Status = 'AguardandoRetirada')
+               OR EXISTS (SELECT 1 FROM Livro WITH (UPDLOCK, HOLDLOCK)
+                          WHERE Id = ? AND QuantidadeEmprestada < Quantidade))
+        """
+        retirada_query = """
+        UPDATE Reserva SET Status = 'Atendida'
+        WHERE UsuarioId = ? AND LivroId = ? AND Status = 'AguardandoRetirada'
+        """
+        estoque_query = """
+        UPDATE Livro SET QuantidadeEmprestada = QuantidadeEmprestada + 1 WHERE Id = ?
+        """
+        params = (
+            self.usuario_id, self.livro_id, self.data_emprestimo,
+            self.data_prevista_devolucao, self.status.value, self.observacoes,
+            self.usuario_id, Emprestimo.LIMITE_EMPRESTIMOS,
+            self.usuario_id, self.livro_id,
+            self.livro_id)
+        retirada_params = (self.usuario_id, self.livro_id)
+        estoque_params = (self.livro_id,)
+
+        if db.backend.name == 'sqlite':
+            novo_id = db.execute_returning(insercao.format(destino=""), params)
+            if novo_id is not None and not db.execute_rowcount(retirada_query, retirada_params):
+                db.execute_non_query(estoque_query, estoque_params)
+            return novo_id
+
+        lote = f"""
+        SET NOCOUNT ON;
+        DECLARE @novo TABLE (Id INT);
+        {insercao.format(destino=" INTO @novo")};
+        IF @@ROWCOUNT > 0
+        BEGIN
+            {retirada_query};
+            IF @@ROWCOUNT = 0
+                {estoque_query};
+        END
+        SELECT Id FROM @novo;
+        """
+        return db.execute_returning(lote, params + retirada_params + estoque_params)
+
+    @staticmethod
+    def _ajustar_estoque(db, emprestimo_id: int, delta: int) -> None:
+        """Soma delta ao contador do livro se o empréstimo estiver ativo"""
+        query = """
+        UPDATE Livro
+        SET QuantidadeEmprestada = QuantidadeEmprestada + ?
+        WHERE Id = (SELECT LivroId FROM Emprestimo
+                    WHERE Id = ? AND Status IN ('Emprestado', 'Atrasado'))
+        """
+        db.execute_non_query(query, (delta, emprestimo_id))
+
+    def _motivo_recusa(self, db) -> str:
+        """Explica por que a retirada atômica não inseriu o empréstimo"""
+        query = """
+        SELECT
+            (SELECT COUNT(*) FROM Emprestimo
+             WHERE UsuarioId = ? AND Status IN ('Emprestado', 'Atrasado')) as TotalAtivos,
+            (SELECT COUNT(*) FROM Livro WHERE Id = ?) as LivroExiste
+        """
+        result = db.execute_query(query, (self.usuario_id, self.livro_id))
+
+        if not result:
+            return "Erro ao salvar empréstimo no banco"
+
+        if result[0].get('TotalAtivos', 0) >= Emprestimo.LIMITE_EMPRESTIMOS:
+            return f"Usuário já atingiu o limite de {Emprestimo.LIMITE_EMPRESTIMOS} empréstimos simultâneos"
+
+        if not result[0].get('LivroExiste'):
+            return "Livro não encontrado"
+
+        return "Livro não está disponível para empréstimo"
 
     def obter_dias_restantes(self) -> int:
 
@@ -324,14 +414,15 @@ class Emprestimo:
             usuario_id: int,
             apenas_ativos: bool = True) -> List['Emprestimo']:
         """Lista empréstimos de um usuário específico"""
-        try:
-            from Banco_de_dados.connection import DatabaseConnection
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
 
-            db = DatabaseConnection()
+        try:
             if apenas_ativos:
                 query = """
                 SELECT Id, UsuarioId, LivroId, DataEmprestimo, DataPrevistaDevolucao,
-                       DataDevolucao, Status, Observacoes
+                       DataDevolucao, Status, Observacoes, ValorMulta
                 FROM Emprestimo
                 WHERE UsuarioId = ? AND Status != 'Devolvido'
                 ORDER BY DataEmprestimo DESC
@@ -339,7 +430,7 @@ class Emprestimo:
             else:
                 query = """
                 SELECT Id, UsuarioId, LivroId, DataEmprestimo, DataPrevistaDevolucao,
-                       DataDevolucao, Status, Observacoes
+                       DataDevolucao, Status, Observacoes, ValorMulta
                 FROM Emprestimo
                 WHERE UsuarioId = ?
                 ORDER BY DataEmprestimo DESC
@@ -347,28 +438,12 @@ class Emprestimo:
 
             result = db.execute_query(query, (usuario_id,))
 
-            emprestimos = []
-            if result:
-                for row in result:
-                    emprestimo = Emprestimo(
-                        usuario_id=row['UsuarioId'],
-                        livro_id=row['LivroId'],
-                        biblioteca_id=1
-                    )
-                    emprestimo.id = row['Id']
-                    emprestimo.data_emprestimo = row['DataEmprestimo']
-                    emprestimo.data_prevista_devolucao = row['DataPrevistaDevolucao']
-                    emprestimo.data_devolucao = row['DataDevolucao']
-                    emprestimo.status = StatusEmprestimo.DEVOLVIDO if row[
-                        'Status'] == 'Devolvido' else StatusEmprestimo.ATIVO
-                    emprestimo.observacoes = row['Observacoes']
-
-                    emprestimos.append(emprestimo)
-
-            return emprestimos
+            return [Emprestimo._from_db_row(row) for row in result or []]
         except Exception as e:
             print(f"Erro ao buscar empréstimos do usuário {usuario_id}: {e}")
             return []
+        finally:
+            db.close()
 
     @staticmethod
     def buscar_por_livro(livro_id: int) -> List['Emprestimo']:
@@ -376,54 +451,121 @@ class Emprestimo:
         return []
 
     @staticmethod
-    def buscar_atrasados() -> List['Emprestimo']:
+    def buscar_atrasados(limite: int = 100, offset: int = 0) -> List['Emprestimo']:
+        """Empréstimos marcados como Atrasado pela varredura, do vencimento
+        mais antigo para o mais recente, uma página por vez"""
+        from Banco_de_dados.connection import DatabaseConnection
 
-        return []
+        db = DatabaseConnection()
+
+        try:
+            query = """
+            SELECT Id, UsuarioId, LivroId, DataEmprestimo, DataPrevistaDevolucao,
+                   DataDevolucao, Status, Observacoes, ValorMulta
+            FROM Emprestimo
+            WHERE Status = 'Atrasado'
+            ORDER BY DataPrevistaDevolucao, Id
+            OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+            """
+            result = db.execute_query(query, (offset, limite))
+            return [Emprestimo._from_db_row(row) for row in result or []]
+        except Exception as e:
+            print(f"Erro ao buscar empréstimos atrasados: {e}")
+            return []
+        finally:
+            db.close()
+
+    @staticmethod
+    def varrer_atrasados(referencia: Optional[datetime] = None) -> int:
+        """Marca como Atrasado os empréstimos vencidos e atualiza a multa
+        de todos eles num único UPDATE. Devolve quantos mudaram.
+
+        Feita para rodar periodicamente: os já atrasados só são regravados
+        enquanto a multa ainda não chegou ao teto.
+        """
+        from Banco_de_dados.connection import DatabaseConnection
+
+        referencia = referencia or datetime.now()
+        multa = """CASE WHEN DATEDIFF(day, DataPrevistaDevolucao, ?) * ? > ?
+                         THEN ? ELSE DATEDIFF(day, DataPrevistaDevolucao, ?) * ? END"""
+        query = f"""
+        UPDATE Emprestimo
+        SET Status = 'Atrasado', ValorMulta = {multa}
+        WHERE Status IN ('Emprestado', 'Atrasado')
+          AND DataPrevistaDevolucao < ?
+          AND (Status = 'Emprestado' OR ValorMulta < {multa})
+        """
+        parametros_multa = (
+            referencia, Emprestimo.MULTA_DIARIA, Emprestimo.MULTA_MAXIMA,
+            Emprestimo.MULTA_MAXIMA, referencia, Emprestimo.MULTA_DIARIA)
+
+        db = DatabaseConnection()
+
+        try:
+            with db.transaction():
+                return db.execute_rowcount(
+                    query, parametros_multa + (referencia,) + parametros_multa)
+        except Exception as e:
+            print(f"Erro na varredura de empréstimos atrasados: {e}")
+            return 0
+        finally:
+            db.close()
 
     @staticmethod
     def buscar_por_id(emprestimo_id: int) -> Optional['Emprestimo']:
         """Busca um empréstimo pelo ID no banco de dados"""
-        try:
-            from Banco_de_dados.connection import DatabaseConnection
+        from Banco_de_dados.connection import DatabaseConnection
 
-            db = DatabaseConnection()
+        db = DatabaseConnection()
+
+        try:
             query = """
             SELECT Id, UsuarioId, LivroId, DataEmprestimo, DataPrevistaDevolucao,
-                   DataDevolucao, Status, Observacoes
+                   DataDevolucao, Status, Observacoes, ValorMulta
             FROM Emprestimo
             WHERE Id = ?
             """
             result = db.execute_query(query, (emprestimo_id,))
 
             if result and len(result) > 0:
-                row = result[0]
-
-                emprestimo = Emprestimo(
-                    usuario_id=row['UsuarioId'],
-                    livro_id=row['LivroId'],
-                    biblioteca_id=1
-                )
-                emprestimo.id = row['Id']
-                emprestimo.data_emprestimo = row['DataEmprestimo']
-                emprestimo.data_prevista_devolucao = row['DataPrevistaDevolucao']
-                emprestimo.data_devolucao = row['DataDevolucao']
-                emprestimo.status = StatusEmprestimo.DEVOLVIDO if row[
-                    'Status'] == 'Devolvido' else StatusEmprestimo.ATIVO
-                emprestimo.observacoes = row['Observacoes']
-
-                return emprestimo
+                return Emprestimo._from_db_row(result[0])
             return None
         except Exception as e:
             print(f"Erro ao buscar empréstimo: {e}")
             return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def _from_db_row(row: dict) -> 'Emprestimo':
+
+        try:
+            status = StatusEmprestimo(row['Status'])
+        except ValueError:
+            status = StatusEmprestimo.ATIVO
+
+        emprestimo = Emprestimo(
+            usuario_id=row['UsuarioId'],
+            livro_id=row['LivroId'],
+            biblioteca_id=1,
+            id=row['Id'],
+            data_emprestimo=row['DataEmprestimo'],
+            data_prevista_devolucao=row['DataPrevistaDevolucao'],
+            data_devolucao=row['DataDevolucao'],
+            status=status,
+            valor_multa=float(row.get('ValorMulta') or 0),
+            observacoes=row['Observacoes']
+        )
+        return emprestimo
 
     @staticmethod
     def obter_historico_usuario_completo(usuario_id: int) -> List[dict]:
         """Obtém histórico completo de empréstimos do usuário com status detalhado"""
-        try:
-            from Banco_de_dados.connection import DatabaseConnection
+        from Banco_de_dados.connection import DatabaseConnection
 
-            db = DatabaseConnection()
+        db = DatabaseConnection()
+
+        try:
             query = """
                 SELECT
                     e.Id,
@@ -517,14 +659,17 @@ class Emprestimo:
         except Exception as e:
             print(f"Erro ao obter histórico do usuário {usuario_id}: {e}")
             return []
+        finally:
+            db.close()
 
     @staticmethod
     def verificar_emprestimos_atrasados(usuario_id: int) -> List[dict]:
         """Verifica se o usuário tem empréstimos em atraso"""
-        try:
-            from Banco_de_dados.connection import DatabaseConnection
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
 
-            db = DatabaseConnection()
+        try:
             query = """
             SELECT
                 e.Id,
@@ -568,30 +713,30 @@ class Emprestimo:
         except Exception as e:
             print(f"Erro ao verificar empréstimos atrasados: {e}")
             return []
+        finally:
+            db.close()
 
     @staticmethod
     def contar_emprestimos_ativos_por_livro(livro_id: int) -> int:
-        """Conta quantos empréstimos ativos existem para um livro específico"""
+        """Conta quantos empréstimos ativos existem para um livro específico.
+
+        Não inclui exemplares separados para reserva, que também entram em
+        QuantidadeEmprestada (ver Reserva.contar_separados_por_livro).
+        """
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
         try:
-            from Banco_de_dados.connection import DatabaseConnection
-            
-            db = DatabaseConnection()
-            query = """
-            SELECT COUNT(*) as total_ativos
-            FROM Emprestimo 
-            WHERE LivroId = ? AND Status IN ('Emprestado', 'Atrasado')
-            """
-            
-            result = db.execute_query(query, (livro_id,))
-            
-            if result and len(result) > 0:
-                return result[0].get('total_ativos', 0)
-            
-            return 0
+            query = """SELECT COUNT(*) FROM Emprestimo
+                       WHERE LivroId = ? AND Status IN ('Emprestado', 'Atrasado')"""
+            return db.execute_scalar(query, (livro_id,)) or 0
             
         except Exception as e:
             print(f"Erro ao contar empréstimos ativos do livro {livro_id}: {e}")
             return 0
+        finally:
+            db.close()
 
     @staticmethod
     def estatisticas_biblioteca(biblioteca_id: int) -> dict:
@@ -0,0 +1,126 @@
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+
+# (número da linha no arquivo, campos lidos ou None, erro de leitura ou None)
+Registro = tuple[int, Optional[dict], Optional[str]]
+
+TAMANHO_LOTE_PADRAO = 1000
+
+# Valores por consulta de existência (SQL Server aceita até 2100 parâmetros)
+LOTE_CONSULTA = 900
+
+MAX_ERROS_GUARDADOS = 1000
+
+
+class ResultadoImportacao:
+    """Contadores e erros por linha de uma importação"""
+
+    def __init__(self, entidade: str = "registros"):
+        self.entidade = entidade
+        self.lidos = 0
+        self.inseridos = 0
+        self.duplicados = 0
+        self.invalidos = 0
+        self.falhas = 0
+        self.erros: list[tuple[int, str]] = []
+        self.segundos = 0.0
+        self._inicio = time.perf_counter()
+
+    @property
+    def rejeitados(self) -> int:
+        return self.duplicados + self.invalidos + self.falhas
+
+    @property
+    def por_segundo(self) -> float:
+        segundos = self.segundos or (time.perf_counter() - self._inicio)
+        return self.inseridos / segundos if segundos > 0 else 0.0
+
+    def registrar_erro(self, linha: int, mensagem: str) -> None:
+        # Um arquivo inteiro ruim não deve ocupar memória sem limite
+        if len(self.erros) < MAX_ERROS_GUARDADOS:
+            self.erros.append((linha, mensagem))
+
+    def finalizar(self) -> None:
+        self.segundos = time.perf_counter() - self._inicio
+
+    def resumo(self) -> str:
+        return (f"{self.lidos} lidos | {self.inseridos} inseridos | "
+                f"{self.duplicados} duplicados | {self.invalidos} inválidos | "
+                f"{self.falhas} falhas | {self.por_segundo:.0f} {self.entidade}/s")
+
+    def __str__(self) -> str:
+        return self.resumo()
+
+
+def ler_csv(arquivo: Iterable[str], delimitador: Optional[str] = None) -> Iterator[Registro]:
+    """Lê CSV com cabeçalho; as chaves de cada registro são os nomes das
+    colunas em minúsculas.
+
+    Sem delimitador, aceita ',' ou ';' conforme a primeira linha.
+    """
+    linhas = iter(arquivo)
+    cabecalho = next(linhas, None)
+    if cabecalho is None:
+        return
+
+    if delimitador is None:
+        delimitador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+
+    campos = [c.strip().lower() for c in next(csv.reader([cabecalho], delimiter=delimitador))]
+    leitor = csv.reader(linhas, delimiter=delimitador)
+
+    for numero, valores in enumerate(leitor, start=2):
+        if not any(v.strip() for v in valores):
+            continue
+        if len(valores) != len(campos):
+            yield numero, None, f"Esperadas {len(campos)} colunas, encontradas {len(valores)}"
+            continue
+        yield numero, dict(zip(campos, valores)), None
+
+
+def ler_jsonl(arquivo: Iterable[str]) -> Iterator[Registro]:
+    """Lê JSON Lines: um objeto por linha, chaves em minúsculas"""
+
+    for numero, texto in enumerate(arquivo, start=1):
+        if not texto.strip():
+            continue
+        try:
+            dados = json.loads(texto)
+        except json.JSONDecodeError as e:
+            yield numero, None, f"JSON inválido: {e.msg}"
+            continue
+        if not isinstance(dados, dict):
+            yield numero, None, "Cada linha deve ser um objeto JSON"
+            continue
+        yield numero, {str(k).lower(): v for k, v in dados.items()}, None
+
+
+def ler_arquivo(caminho: str) -> Iterator[Registro]:
+    """Escolhe o leitor pela extensão (.csv, .jsonl/.ndjson) e lê sob demanda"""
+
+    extensao = Path(caminho).suffix.lower()
+    if extensao == '.csv':
+        leitor = ler_csv
+    elif extensao in ('.jsonl', '.ndjson'):
+        leitor = ler_jsonl
+    else:
+        raise ValueError(f"Formato não suportado: '{extensao}' (use .csv ou .jsonl)")
+
+    with open(caminho, encoding='utf-8-sig', newline='') as arquivo:
+        yield from leitor(arquivo)
+
+
+def valores_existentes(db, tabela: str, coluna: str, valores: list) -> set:
+    """Quais de valores já aparecem em tabela.coluna, consultando em lotes"""
+
+    existentes = set()
+    for i in range(0, len(valores), LOTE_CONSULTA):
+        parte = valores[i:i + LOTE_CONSULTA]
+        query = f"SELECT {coluna} FROM {tabela} WHERE {coluna} IN ({', '.join('?' * len(parte))})"
+        for row in db.execute_query(query, tuple(parte)) or []:
+            existentes.add(row[coluna])
+    return existentes
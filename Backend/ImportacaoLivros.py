@@ -0,0 +1,152 @@
+from typing import Callable, Iterable, Optional
+
+from Backend.Importacao import (
+    TAMANHO_LOTE_PADRAO, Registro, ResultadoImportacao, ler_arquivo,
+    valores_existentes)
+from Backend.Livro import Livro
+
+
+_INSERT = "INSERT INTO Livro (Nome, Autor, ISBN, Genero, Quantidade) VALUES (?, ?, ?, ?, ?)"
+
+
+def importar_livros(
+        registros: Iterable[Registro],
+        tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+        ao_progresso: Optional[Callable[[ResultadoImportacao], None]] = None
+) -> ResultadoImportacao:
+    """Cadastra livros em lote a partir de um iterável de registros.
+
+    Cada registro passa por Livro.validar; ISBN repetido no próprio arquivo
+    ou já cadastrado é rejeitado. Os válidos são gravados a cada
+    tamanho_lote com uma consulta de ISBNs existentes e um executemany
+    numa única transação. ao_progresso é chamado após cada lote.
+    """
+    from Banco_de_dados.connection import DatabaseConnection
+
+    if tamanho_lote < 1:
+        raise ValueError("tamanho_lote deve ser positivo")
+
+    resultado = ResultadoImportacao("livros")
+    vistos: set[str] = set()
+    lote: list[tuple[int, Livro]] = []
+
+    db = DatabaseConnection()
+
+    try:
+        for linha, dados, erro in registros:
+            resultado.lidos += 1
+
+            livro = None
+            if erro is None:
+                livro, erro = _livro_de_registro(dados)
+            if erro is None:
+                valido, mensagem = livro.validar()
+                if not valido:
+                    erro = mensagem
+            if erro is not None:
+                resultado.invalidos += 1
+                resultado.registrar_erro(linha, erro)
+                continue
+
+            if livro.isbn in vistos:
+                resultado.duplicados += 1
+                resultado.registrar_erro(linha, f"ISBN {livro.isbn} repetido no arquivo")
+                continue
+            vistos.add(livro.isbn)
+
+            lote.append((linha, livro))
+            if len(lote) >= tamanho_lote:
+                _gravar_lote(db, lote, resultado)
+                lote = []
+                if ao_progresso:
+                    ao_progresso(resultado)
+
+        if lote:
+            _gravar_lote(db, lote, resultado)
+            if ao_progresso:
+                ao_progresso(resultado)
+
+    finally:
+        db.close()
+        resultado.finalizar()
+
+    if resultado.inseridos:
+        # Os livros novos não passaram por salvar(), então o índice em
+        # memória (se montado) é refeito na próxima busca
+        from Backend.IndiceLivros import descartar_indice
+        descartar_indice()
+
+    return resultado
+
+
+def importar_arquivo(caminho: str, **kwargs) -> ResultadoImportacao:
+    return importar_livros(ler_arquivo(caminho), **kwargs)
+
+
+def _livro_de_registro(dados: dict) -> tuple[Optional[Livro], Optional[str]]:
+
+    def texto(campo: str) -> str:
+        valor = dados.get(campo)
+        return str(valor).strip() if valor is not None else ""
+
+    faltando = [c for c in ('nome', 'autor', 'isbn', 'genero') if not texto(c)]
+    if faltando:
+        return None, f"Campos obrigatórios ausentes: {', '.join(faltando)}"
+
+    quantidade = dados.get('quantidade')
+    if quantidade in (None, ""):
+        quantidade = 5
+    else:
+        try:
+            quantidade = int(quantidade)
+        except (TypeError, ValueError):
+            return None, f"Quantidade inválida: {quantidade!r}"
+        if quantidade < 1:
+            return None, "Quantidade deve ser pelo menos 1"
+
+    livro = Livro(
+        nome=texto('nome'),
+        autor=texto('autor'),
+        isbn=texto('isbn'),
+        genero=texto('genero'),
+        quantidade_total=quantidade)
+    return livro, None
+
+
+def _gravar_lote(db, lote: list[tuple[int, Livro]], resultado: ResultadoImportacao) -> None:
+
+    existentes = valores_existentes(db, 'Livro', 'ISBN', [livro.isbn for _, livro in lote])
+
+    novos = []
+    for linha, livro in lote:
+        if livro.isbn in existentes:
+            resultado.duplicados += 1
+            resultado.registrar_erro(linha, f"ISBN {livro.isbn} já cadastrado")
+        else:
+            novos.append((linha, livro))
+
+    if not novos:
+        return
+
+    try:
+        with db.transaction():
+            db.execute_many(_INSERT, [_parametros(livro) for _, livro in novos])
+        resultado.inseridos += len(novos)
+        return
+    except Exception:
+        # Alguma linha derrubou o lote inteiro (ISBN inserido por outra
+        # sessão no meio tempo, valor grande demais para a coluna...):
+        # regrava uma a uma para apontar qual foi
+        pass
+
+    for linha, livro in novos:
+        if db.execute_non_query(_INSERT, _parametros(livro)):
+            resultado.inseridos += 1
+        else:
+            resultado.falhas += 1
+            resultado.registrar_erro(
+                linha, f"Banco recusou o livro de ISBN {livro.isbn}")
+
+
+def _parametros(livro: Livro) -> tuple:
+    return (livro.nome, livro.autor, livro.isbn, livro.genero, livro.quantidade_total)
@@ -0,0 +1,206 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Iterable, Optional
+
+from Backend.Importacao import (
+    TAMANHO_LOTE_PADRAO, Registro, ResultadoImportacao, ler_arquivo,
+    valores_existentes)
+from Backend.Usuario import Usuario, criptografar_senha
+
+
+TIPOS_MATRICULAVEIS = ('Aluno', 'Professor')
+
+# Já tem formato de hash, então o construtor não criptografa: o objeto é
+# montado só para validar e o hash de verdade sai do pool de processos
+_SENHA_PENDENTE = "0" * 32
+
+_INSERT = """INSERT INTO Usuario (Nome, Email, Senha, TipoUsuario, Matricula, Curso, Departamento)
+             VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+
+def importar_usuarios(
+        registros: Iterable[Registro],
+        tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+        processos: Optional[int] = None,
+        ao_progresso: Optional[Callable[[ResultadoImportacao], None]] = None
+) -> ResultadoImportacao:
+    """Matricula alunos e professores em lote.
+
+    Cada registro vira um Aluno/Professor validado com Usuario.validar;
+    email ou matrícula repetidos no próprio arquivo ou já cadastrados são
+    rejeitados. A cada tamanho_lote, as senhas são criptografadas em
+    paralelo (processos workers; 1 criptografa no próprio processo) e os
+    usuários entram com um executemany numa única transação.
+    """
+    from Banco_de_dados.connection import DatabaseConnection
+
+    if tamanho_lote < 1:
+        raise ValueError("tamanho_lote deve ser positivo")
+
+    processos = processos or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=processos) if processos > 1 else None
+
+    resultado = ResultadoImportacao("usuários")
+    emails_vistos: set[str] = set()
+    matriculas_vistas: set[str] = set()
+    lote: list[tuple[int, Usuario, str]] = []
+
+    db = DatabaseConnection()
+
+    try:
+        for linha, dados, erro in registros:
+            resultado.lidos += 1
+
+            usuario = senha = None
+            if erro is None:
+                usuario, senha, erro = _usuario_de_registro(dados)
+            if erro is None:
+                valido, mensagem = usuario.validar()
+                if not valido:
+                    erro = mensagem
+            if erro is not None:
+                resultado.invalidos += 1
+                resultado.registrar_erro(linha, erro)
+                continue
+
+            email = usuario.email.casefold()
+            if email in emails_vistos:
+                resultado.duplicados += 1
+                resultado.registrar_erro(linha, f"Email {usuario.email} repetido no arquivo")
+                continue
+            if usuario.matricula in matriculas_vistas:
+                resultado.duplicados += 1
+                resultado.registrar_erro(
+                    linha, f"Matrícula {usuario.matricula} repetida no arquivo")
+                continue
+            emails_vistos.add(email)
+            matriculas_vistas.add(usuario.matricula)
+
+            lote.append((linha, usuario, senha))
+            if len(lote) >= tamanho_lote:
+                _gravar_lote(db, lote, resultado, pool, processos)
+                lote = []
+                if ao_progresso:
+                    ao_progresso(resultado)
+
+        if lote:
+            _gravar_lote(db, lote, resultado, pool, processos)
+            if ao_progresso:
+                ao_progresso(resultado)
+
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        db.close()
+        resultado.finalizar()
+
+    return resultado
+
+
+def importar_arquivo(caminho: str, **kwargs) -> ResultadoImportacao:
+    return importar_usuarios(ler_arquivo(caminho), **kwargs)
+
+
+def _usuario_de_registro(dados: dict) -> tuple[Optional[Usuario], Optional[str], Optional[str]]:
+    """(usuário montado com senha pendente, senha em texto, erro)"""
+
+    def texto(campo: str) -> str:
+        valor = dados.get(campo)
+        return str(valor).strip() if valor is not None else ""
+
+    tipo = texto('tipo_usuario') or texto('tipo')
+    tipo = tipo.capitalize()
+    if tipo not in TIPOS_MATRICULAVEIS:
+        return None, None, f"Tipo de usuário deve ser Aluno ou Professor, não {tipo or 'vazio'!r}"
+
+    senha = texto('senha')
+    if not senha:
+        return None, None, "Senha é obrigatória"
+
+    comuns = {
+        'nome': texto('nome'),
+        'email': texto('email'),
+        'senha': _SENHA_PENDENTE,
+        'matricula': texto('matricula'),
+    }
+
+    if tipo == 'Aluno':
+        from Backend.Aluno import Aluno
+        usuario = Aluno(curso=texto('curso'), **comuns)
+    else:
+        from Backend.Professor import Professor
+        usuario = Professor(departamento=texto('departamento'), **comuns)
+
+    return usuario, senha, None
+
+
+def _criptografar(senhas: list[str], pool: Optional[Executor], processos: int) -> list[str]:
+
+    if pool is None:
+        return [criptografar_senha(senha) for senha in senhas]
+
+    # Pedaços grandes: o custo de enviar cada senha ao worker não pode
+    # superar o do próprio hash
+    tamanho = max(1, len(senhas) // (processos * 4))
+    return list(pool.map(criptografar_senha, senhas, chunksize=tamanho))
+
+
+def _gravar_lote(db, lote: list[tuple[int, Usuario, str]],
+                 resultado: ResultadoImportacao,
+                 pool: Optional[Executor], processos: int) -> None:
+
+    # Com collation CI o IN acha o email com a caixa gravada no banco, que
+    # pode não ser a do arquivo: compara os dois lados sem caixa, como na
+    # checagem de repetidos dentro do arquivo
+    emails = {email.casefold() for email in
+              valores_existentes(db, 'Usuario', 'Email', [u.email for _, u, _ in lote])}
+    matriculas = valores_existentes(db, 'Usuario', 'Matricula', [u.matricula for _, u, _ in lote])
+
+    novos = []
+    for linha, usuario, senha in lote:
+        if usuario.email.casefold() in emails:
+            resultado.duplicados += 1
+            resultado.registrar_erro(linha, f"Email {usuario.email} já cadastrado")
+        elif usuario.matricula in matriculas:
+            resultado.duplicados += 1
+            resultado.registrar_erro(linha, f"Matrícula {usuario.matricula} já cadastrada")
+        else:
+            novos.append((linha, usuario, senha))
+
+    if not novos:
+        return
+
+    hashes = _criptografar([senha for _, _, senha in novos], pool, processos)
+    parametros = [_parametros(usuario, hash_senha)
+                  for (_, usuario, _), hash_senha in zip(novos, hashes)]
+
+    try:
+        with db.transaction():
+            db.execute_many(_INSERT, parametros)
+        resultado.inseridos += len(novos)
+        return
+    except Exception:
+        # Algum usuário derrubou o lote (email cadastrado por outra sessão
+        # no meio tempo...): regrava um a um para apontar qual foi
+        pass
+
+    for (linha, usuario, _), params in zip(novos, parametros):
+        if db.execute_non_query(_INSERT, params):
+            resultado.inseridos += 1
+        else:
+            resultado.falhas += 1
+            resultado.registrar_erro(
+                linha, f"Banco recusou o usuário de email {usuario.email}")
+
+
+def _parametros(usuario: Usuario, hash_senha: str) -> tuple:
+
+    dados = usuario.obter_dados_para_banco()
+    return (
+        dados['nome'],
+        dados['email'],
+        hash_senha,
+        dados['tipo_usuario'],
+        dados.get('matricula'),
+        dados.get('curso'),
+        dados.get('departamento'))
@@ -0,0 +1,413 @@
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import namedtuple
+from typing import Iterable, Iterator, Optional
+
+from Backend.Livro import Livro
+
+
+PESOS_CAMPOS = {
+    'nome': 3.0,
+    'autor': 2.0,
+    'isbn': 2.0,
+    'genero': 1.0,
+}
+
+# O que o índice guarda de cada livro: só campos que não mudam com
+# empréstimos e reservas. O estoque é lido na hora (Livro.listar_por_ids)
+LivroIndexado = namedtuple('LivroIndexado', ['id', 'nome', 'autor', 'isbn', 'genero'])
+
+_PALAVRA = re.compile(r"\w+")
+_ISBN = re.compile(r"^[\d\s-]*\d[\d\s-]*-[\d\s-]*$")
+
+
+def normalizar(texto: str) -> str:
+    """Remove acentos e caixa: 'Cortiço' -> 'cortico'"""
+    decomposto = unicodedata.normalize('NFKD', texto or "")
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def tokenizar(texto: str) -> list[str]:
+    return _PALAVRA.findall(normalizar(texto))
+
+
+def _indexado(livro: Livro) -> LivroIndexado:
+    return LivroIndexado(livro.id, livro.nome, livro.autor, livro.isbn, livro.genero)
+
+
+def _termos_livro(livro: Livro) -> dict[str, float]:
+    """Palavra -> maior peso entre os campos do livro em que ela aparece"""
+
+    termos: dict[str, float] = {}
+    campos = {
+        'nome': livro.nome,
+        'autor': livro.autor,
+        'isbn': livro.isbn,
+        'genero': livro.genero,
+    }
+    for campo, valor in campos.items():
+        palavras = tokenizar(valor)
+        if campo == 'isbn' and len(palavras) > 1:
+            # ISBN também pode ser digitado sem hífens
+            palavras.append("".join(palavras))
+        for palavra in palavras:
+            termos[palavra] = max(termos.get(palavra, 0.0), PESOS_CAMPOS[campo])
+    return termos
+
+
+def termos_consulta(texto: str) -> list[str]:
+    """Termos de uma consulta, tratando ISBN com hífens como um termo só"""
+
+    if _ISBN.match(texto or ""):
+        # "978-85-35" vira o prefixo do ISBN compacto em vez de três
+        # números curtos que aparecem em quase todo o acervo
+        termos = tokenizar(texto)
+        return ["".join(termos)] if termos else []
+    return list(set(tokenizar(texto)))
+
+
+def corresponde(livro: Livro, texto: str) -> bool:
+    """Se todos os termos de texto são prefixo de alguma palavra do livro"""
+
+    termos = termos_consulta(texto)
+    if not termos:
+        return False
+    palavras = _termos_livro(livro)
+    return all(any(p.startswith(t) for p in palavras) for t in termos)
+
+
+class IndiceLivros:
+    """Índice invertido em memória do acervo, para busca enquanto se digita.
+
+    Cada palavra normalizada aponta para os livros em que aparece; a lista
+    ordenada de palavras permite achar por bisect todas as que começam com
+    o que foi digitado. Todas as palavras da busca precisam casar (como
+    palavra inteira ou prefixo) e o resultado é ordenado pela pontuação:
+    peso do campo (nome > autor/isbn > gênero) vezes a qualidade do
+    casamento (palavra exata vale mais que prefixo curto).
+
+    buscar devolve LivroIndexado (id, nome, autor, isbn, genero), sem
+    estoque: os contadores mudam a cada empréstimo sem passar pelos
+    ouvintes de Livro, então quem exibe disponibilidade lê o estoque dos
+    ids encontrados com Livro.listar_por_ids.
+    """
+
+    # Até esse número de livros casando com o termo mais seletivo a busca
+    # pontua todos; acima disso percorre os livros do maior para o menor
+    # ponto e para assim que nenhum outro consegue entrar no resultado
+    LIMITE_VERIFICACAO_DIRETA = 2000
+
+    def __init__(self, livros: Iterable[Livro] = ()):
+
+        self._lock = threading.RLock()
+        self._postings: dict[str, dict[int, float]] = {}
+        self._palavras: list[str] = []
+        self._livros: dict[int, LivroIndexado] = {}
+        self._termos: dict[int, dict[str, float]] = {}
+        self._ordenados: dict[str, list[tuple[float, int]]] = {}
+        self.construir(livros)
+
+    def __len__(self) -> int:
+        return len(self._livros)
+
+    def __contains__(self, livro_id: int) -> bool:
+        return livro_id in self._livros
+
+    def construir(self, livros: Iterable[Livro]) -> None:
+        """Recria o índice do zero a partir dos livros informados"""
+
+        postings: dict[str, dict[int, float]] = {}
+        livros_por_id: dict[int, LivroIndexado] = {}
+        termos_por_id: dict[int, dict[str, float]] = {}
+
+        for livro in livros:
+            if livro.id is None:
+                continue
+            termos = _termos_livro(livro)
+            livros_por_id[livro.id] = _indexado(livro)
+            termos_por_id[livro.id] = termos
+            for palavra, peso in termos.items():
+                postings.setdefault(palavra, {})[livro.id] = peso
+
+        with self._lock:
+            self._postings = postings
+            self._palavras = sorted(postings)
+            self._livros = livros_por_id
+            self._termos = termos_por_id
+            self._ordenados = {}
+
+    def adicionar(self, livro: Livro) -> None:
+        """Indexa o livro, substituindo a versão anterior se já existir"""
+
+        if livro.id is None:
+            return
+
+        with self._lock:
+            self._remover_locked(livro.id)
+
+            termos = _termos_livro(livro)
+            self._livros[livro.id] = _indexado(livro)
+            self._termos[livro.id] = termos
+            for palavra, peso in termos.items():
+                livros = self._postings.get(palavra)
+                if livros is None:
+                    livros = self._postings[palavra] = {}
+                    insort(self._palavras, palavra)
+                livros[livro.id] = peso
+                self._ordenados.pop(palavra, None)
+
+    def remover(self, livro_id: int) -> None:
+
+        with self._lock:
+            self._remover_locked(livro_id)
+
+    def ao_alterar_livro(self, evento: str, livro: Livro) -> None:
+        """Ouvinte de Livro.registrar_ouvinte: mantém o índice em dia"""
+
+        if evento in ('salvo', 'reativado') and livro.ativo:
+            self.adicionar(livro)
+        elif livro.id is not None:
+            self.remover(livro.id)
+
+    def buscar(self, texto: str, limite: int = 20) -> list[LivroIndexado]:
+        return [livro for livro, _ in self.buscar_com_pontuacao(texto, limite)]
+
+    def buscar_com_pontuacao(
+            self, texto: str, limite: int = 20) -> list[tuple[LivroIndexado, float]]:
+
+        consulta = termos_consulta(texto)
+        if not consulta:
+            return []
+
+        with self._lock:
+            faixas = {termo: self._faixa(termo) for termo in consulta}
+            if not all(faixas.values()):
+                return []
+
+            # Começa pelo termo com menos livros para filtrar o resto
+            estimativas = {termo: self._estimar(faixas[termo]) for termo in consulta}
+            consulta.sort(key=estimativas.__getitem__)
+
+            if estimativas[consulta[0]] <= self.LIMITE_VERIFICACAO_DIRETA:
+                melhores = self._pontuar_todos(consulta, faixas, limite)
+            else:
+                melhores = self._pontuar_por_limiar(consulta, faixas, limite)
+
+            resultado = [(self._livros[livro_id], pontos) for livro_id, pontos in melhores]
+
+        resultado.sort(key=lambda item: (-item[1], normalizar(item[0].nome)))
+        return resultado
+
+    def _pontuar_todos(self, consulta: list[str], faixas: dict[str, list[str]],
+                       limite: int) -> list[tuple[int, float]]:
+
+        pontuacao = self._pontuar_prefixo(consulta[0], faixas[consulta[0]])
+        for termo in consulta[1:]:
+            pontuacao = self._filtrar_candidatos(pontuacao, termo)
+            if not pontuacao:
+                return []
+
+        return heapq.nlargest(
+            limite, pontuacao.items(), key=lambda item: (item[1], -item[0]))
+
+    def _pontuar_por_limiar(self, consulta: list[str], faixas: dict[str, list[str]],
+                            limite: int) -> list[tuple[int, float]]:
+        """Percorre os livros do termo de maior pontuação possível em ordem
+        decrescente, conferindo os demais termos em cada um, até que nem o
+        máximo dos termos restantes leve um novo livro ao resultado"""
+
+        fontes = {termo: self._fontes(termo, faixas[termo]) for termo in consulta}
+        guia = max(consulta, key=lambda termo: fontes[termo][0][0])
+        restantes = [termo for termo in consulta if termo != guia]
+        teto_restantes = sum(fontes[termo][0][0] for termo in restantes)
+
+        melhores: list[tuple[float, int]] = []
+        vistos: set[int] = set()
+
+        for pontos, livro_id in self._percorrer(fontes[guia]):
+            if len(melhores) >= limite and melhores[0][0] >= pontos + teto_restantes:
+                break
+            if livro_id in vistos:
+                continue
+            vistos.add(livro_id)
+
+            termos = self._termos[livro_id]
+            total = pontos
+            for termo in restantes:
+                casamento = self._melhor_casamento(termos, termo)
+                if not casamento:
+                    break
+                total += casamento
+            else:
+                item = (total, -livro_id)
+                if len(melhores) < limite:
+                    heapq.heappush(melhores, item)
+                elif item > melhores[0]:
+                    heapq.heapreplace(melhores, item)
+
+        return [(-negativo, total) for total, negativo in sorted(melhores, reverse=True)]
+
+    @staticmethod
+    def _qualidade(termo: str, palavra: str) -> float:
+        """1.0 para a palavra exata; prefixos valem proporcionalmente menos"""
+        if termo == palavra:
+            return 1.0
+        return 0.8 * len(termo) / len(palavra)
+
+    def _faixa(self, termo: str) -> list[str]:
+        """Palavras indexadas que começam com o termo"""
+        inicio = bisect_left(self._palavras, termo)
+        fim = bisect_left(self._palavras, termo + "\U0010ffff", inicio)
+        return self._palavras[inicio:fim]
+
+    def _estimar(self, palavras: list[str]) -> int:
+        """Quantos livros casam com o termo, contando só até passar do
+        limite da verificação direta (acima dele a ordem pouco importa)"""
+
+        total = 0
+        for palavra in palavras:
+            total += len(self._postings[palavra])
+            if total > self.LIMITE_VERIFICACAO_DIRETA:
+                break
+        return total
+
+    def _ordenado(self, palavra: str) -> list[tuple[float, int]]:
+        """Livros da palavra como (-peso, id), do maior peso para o menor.
+        Montado na primeira busca e descartado quando a palavra muda"""
+
+        livros = self._ordenados.get(palavra)
+        if livros is None:
+            livros = sorted((-peso, livro_id)
+                            for livro_id, peso in self._postings[palavra].items())
+            self._ordenados[palavra] = livros
+        return livros
+
+    def _fontes(self, termo: str, palavras: list[str]) -> list[tuple[float, float, list]]:
+        """(maior pontuação, qualidade, livros ordenados) de cada palavra do
+        prefixo, da que pode pontuar mais para a que pode pontuar menos"""
+
+        fontes = []
+        for palavra in palavras:
+            qualidade = self._qualidade(termo, palavra)
+            livros = self._ordenado(palavra)
+            fontes.append((-livros[0][0] * qualidade, qualidade, livros))
+        fontes.sort(key=lambda fonte: -fonte[0])
+        return fontes
+
+    @staticmethod
+    def _percorrer(fontes: list[tuple[float, float, list]]) -> Iterator[tuple[float, int]]:
+        """(pontos, id) dos livros que casam com o termo, do maior para o menor.
+
+        Junta as listas já ordenadas de cada palavra com um heap, abrindo
+        uma palavra só quando ela pode superar o próximo livro a sair.
+        """
+
+        abertas: list[tuple[float, int, int]] = []
+        proxima = 0
+
+        while True:
+            while proxima < len(fontes) and (not abertas or fontes[proxima][0] > -abertas[0][0]):
+                _, qualidade, livros = fontes[proxima]
+                heapq.heappush(abertas, (livros[0][0] * qualidade, proxima, 0))
+                proxima += 1
+            if not abertas:
+                return
+
+            negativo, fonte, posicao = abertas[0]
+            _, qualidade, livros = fontes[fonte]
+            yield -negativo, livros[posicao][1]
+
+            posicao += 1
+            if posicao < len(livros):
+                heapq.heapreplace(abertas, (livros[posicao][0] * qualidade, fonte, posicao))
+            else:
+                heapq.heappop(abertas)
+
+    def _pontuar_prefixo(self, termo: str, palavras: list[str]) -> dict[int, float]:
+
+        pontuacao: dict[int, float] = {}
+
+        for palavra in palavras:
+            qualidade = self._qualidade(termo, palavra)
+            livros = self._postings[palavra]
+            if not pontuacao:
+                pontuacao = {livro_id: peso * qualidade for livro_id, peso in livros.items()}
+                continue
+
+            atual = pontuacao.get
+            for livro_id, peso in livros.items():
+                pontos = peso * qualidade
+                if pontos > atual(livro_id, 0.0):
+                    pontuacao[livro_id] = pontos
+
+        return pontuacao
+
+    def _filtrar_candidatos(
+            self, pontuacao: dict[int, float], termo: str) -> dict[int, float]:
+
+        filtrados = {}
+        for livro_id, pontos in pontuacao.items():
+            melhor = self._melhor_casamento(self._termos[livro_id], termo)
+            if melhor:
+                filtrados[livro_id] = pontos + melhor
+        return filtrados
+
+    def _melhor_casamento(self, termos: dict[str, float], termo: str) -> float:
+
+        melhor = 0.0
+        for palavra, peso in termos.items():
+            if palavra.startswith(termo):
+                melhor = max(melhor, peso * self._qualidade(termo, palavra))
+        return melhor
+
+    def _remover_locked(self, livro_id: int) -> None:
+
+        termos = self._termos.pop(livro_id, None)
+        self._livros.pop(livro_id, None)
+        if not termos:
+            return
+
+        for palavra in termos:
+            livros = self._postings.get(palavra)
+            if livros is None:
+                continue
+            livros.pop(livro_id, None)
+            self._ordenados.pop(palavra, None)
+            if not livros:
+                del self._postings[palavra]
+                posicao = bisect_left(self._palavras, palavra)
+                if posicao < len(self._palavras) and self._palavras[posicao] == palavra:
+                    del self._palavras[posicao]
+
+
+_indice: Optional[IndiceLivros] = None
+_indice_lock = threading.Lock()
+
+
+def obter_indice() -> IndiceLivros:
+    """Índice do acervo ativo, montado na primeira chamada a partir de
+    Livro.listar_com_estoque e atualizado a cada salvar/excluir/reativar"""
+
+    global _indice
+
+    if _indice is None:
+        with _indice_lock:
+            if _indice is None:
+                indice = IndiceLivros(Livro.listar_com_estoque())
+                Livro.registrar_ouvinte(indice.ao_alterar_livro)
+                _indice = indice
+
+    return _indice
+
+
+def descartar_indice() -> None:
+
+    global _indice
+
+    with _indice_lock:
+        if _indice is not None:
+            Livro.remover_ouvinte(_indice.ao_alterar_livro)
+            _indice = None
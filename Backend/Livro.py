@@ -1,12 +1,66 @@
+import re
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Iterable, Optional
 
 import sys
 sys.modules.setdefault('Backend.livro', sys.modules.get(__name__))
 
+from Backend.CacheEntidades import CacheEntidades
+from Backend.Projecao import Projecao
+
 
 class Livro:
 
+    CAMPOS_BUSCA = {
+        'nome': 'Nome',
+        'autor': 'Autor',
+        'isbn': 'ISBN',
+        'genero': 'Genero',
+    }
+    MAX_TERMOS_BUSCA = 8
+    # Palavra do tokenizador do FTS5 (unicode61 com tokenchars '-')
+    _PALAVRA_FTS = re.compile(r"(?:[^\W_]|-)+")
+
+    # None até a primeira busca no SQL Server descobrir se há índice full-text
+    _full_text_disponivel: Optional[bool] = None
+
+    # Chamados com (evento, livro) após salvar, excluir, reativar e deletar
+    _ouvintes: list[Callable[[str, 'Livro'], None]] = []
+
+    # buscar_por_id/buscar_por_isbn; invalidado em _notificar. Os contadores
+    # de empréstimo não passam por aqui (vêm de VW_EstoqueLivros)
+    _cache = CacheEntidades('Livro')
+
+    # Colunas da tabela Livro lidas por buscar_por_id/buscar_por_isbn
+    _COLUNAS = ("Id, Nome, Autor, ISBN, Genero, Quantidade AS QuantidadeTotal, "
+                "DataCadastro, DataAtualizacao, Ativo")
+
+    # Campos aceitos em campos= pelos buscar_por_* (tabela Livro) e pelas
+    # listagens/busca (VW_EstoqueLivros, que tem os contadores de estoque)
+    _projecao = Projecao('Livro', {
+        'id': 'Id',
+        'nome': 'Nome',
+        'autor': 'Autor',
+        'isbn': 'ISBN',
+        'genero': 'Genero',
+        'quantidade_total': 'Quantidade',
+        'ativo': 'Ativo',
+        'data_cadastro': 'DataCadastro',
+        'data_atualizacao': 'DataAtualizacao',
+    }, conversoes={'ativo': bool})
+    _projecao_estoque = Projecao('Livro', {
+        'id': 'Id',
+        'nome': 'Nome',
+        'autor': 'Autor',
+        'isbn': 'ISBN',
+        'genero': 'Genero',
+        'quantidade_total': 'QuantidadeTotal',
+        'quantidade_emprestada': 'QuantidadeEmprestada',
+        'quantidade_disponivel': 'QuantidadeDisponivel',
+        'ativo': 'Ativo',
+        'data_cadastro': 'DataCadastro',
+    }, conversoes={'ativo': bool})
+
     def __init__(
             self,
             nome: str,
@@ -36,6 +90,10 @@ class Livro:
     def id(self):
         return self._id
 
+    @id.setter
+    def id(self, valor: int):
+        self._id = valor
+
     @property
     def nome(self):
         return self._nome
@@ -150,10 +208,13 @@ class Livro:
 
         db = DatabaseConnection()
 
-        if self.id is None:
-            return self._inserir(db)
-        else:
-            return self._atualizar(db)
+        try:
+            if self.id is None:
+                return self._inserir(db)
+            else:
+                return self._atualizar(db)
+        finally:
+            db.close()
 
     def _inserir(self, db) -> tuple[bool, str]:
         if self._isbn_existe(db, self.isbn):
@@ -167,6 +228,7 @@ class Livro:
                 self.id = self._buscar_ultimo_id(db)
                 mensagem = f"Livro '{self.nome}' adicionado com sucesso!"
                 print(f"✓ {mensagem}")
+                self._notificar('salvo')
                 return True, mensagem
             else:
                 mensagem = f"Falha ao inserir livro '{self.nome}'"
@@ -181,7 +243,7 @@ class Livro:
         if not self._existe_por_id(db, self.id):
             return False, f"Livro com ID {self.id} não encontrado"
 
-        livro_existente = self.buscar_por_isbn(self.isbn)
+        livro_existente = self.buscar_por_isbn(self.isbn, campos=())
         if livro_existente and livro_existente.id != self.id:
             return False, f"ISBN {self.isbn} já está sendo usado por outro livro"
 
@@ -191,6 +253,7 @@ class Livro:
 
             if db.execute_non_query(query, params):
                 mensagem = f"Livro '{self.nome}' atualizado com sucesso!"
+                self._notificar('salvo')
                 return True, mensagem
             else:
                 return False, f"Falha ao atualizar livro '{self.nome}'"
@@ -210,12 +273,15 @@ class Livro:
             query = "UPDATE Livro SET Ativo = 0 WHERE Id = ?"
             if db.execute_non_query(query, (self.id,)):
                 self.ativo = False
+                self._notificar('excluido')
                 return True, f"Livro '{self.nome}' inativado com sucesso!"
             else:
                 return False, f"Falha ao inativar livro '{self.nome}'"
 
         except Exception as e:
             return False, f"Erro ao inativar livro: {e}"
+        finally:
+            db.close()
 
     def reativar(self) -> tuple[bool, str]:
         from Banco_de_dados.connection import DatabaseConnection
@@ -229,12 +295,15 @@ class Livro:
             query = "UPDATE Livro SET Ativo = 1 WHERE Id = ?"
             if db.execute_non_query(query, (self.id,)):
                 self.ativo = True
+                self._notificar('reativado')
                 return True, f"Livro '{self.nome}' reativado com sucesso!"
             else:
                 return False, f"Falha ao reativar livro '{self.nome}'"
 
         except Exception as e:
             return False, f"Erro ao reativar livro: {e}"
+        finally:
+            db.close()
 
     def deletar(self) -> tuple[bool, str]:
         from Banco_de_dados.connection import DatabaseConnection
@@ -251,6 +320,7 @@ class Livro:
             query = "DELETE FROM Livro WHERE Id = ?"
             if db.execute_non_query(query, (self.id,)):
                 nome_livro = self.nome
+                self._notificar('deletado')
                 self.id = None
                 return True, f"Livro '{nome_livro}' deletado permanentemente!"
             else:
@@ -258,6 +328,27 @@ class Livro:
 
         except Exception as e:
             return False, f"Erro ao deletar livro: {e}"
+        finally:
+            db.close()
+
+    @staticmethod
+    def registrar_ouvinte(ouvinte: Callable[[str, 'Livro'], None]) -> None:
+        if ouvinte not in Livro._ouvintes:
+            Livro._ouvintes.append(ouvinte)
+
+    @staticmethod
+    def remover_ouvinte(ouvinte: Callable[[str, 'Livro'], None]) -> None:
+        if ouvinte in Livro._ouvintes:
+            Livro._ouvintes.remove(ouvinte)
+
+    def _notificar(self, evento: str) -> None:
+
+        Livro._cache.invalidar(self.id)
+        for ouvinte in list(Livro._ouvintes):
+            try:
+                ouvinte(evento, self)
+            except Exception as e:
+                print(f"✗ Erro no ouvinte de livros ({evento}): {e}")
 
     def pode_ser_deletado(self) -> tuple[bool, str]:
         if not self.id:
@@ -278,26 +369,28 @@ class Livro:
     @staticmethod
     def listar_todos(
             limite: int = 100,
-            incluir_inativos: bool = False) -> list['Livro']:
+            incluir_inativos: bool = False,
+            campos: Optional[Iterable[str]] = None) -> list:
+        """Livros em ordem de nome; com campos, resumos só com esses campos
+        (e o id) em vez de objetos Livro"""
         from Banco_de_dados.connection import DatabaseConnection
 
+        colunas, montar = Livro._leitura_estoque(campos)
         db = DatabaseConnection()
 
         try:
 
             if incluir_inativos:
-                query = """
-                SELECT Id, Nome, Autor, ISBN, Genero, QuantidadeTotal,
-                       QuantidadeEmprestada, QuantidadeDisponivel, Ativo, DataCadastro
+                query = f"""
+                SELECT {colunas}
                 FROM VW_EstoqueLivros
                 ORDER BY Nome
                 OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
                 """
                 params = (limite,)
             else:
-                query = """
-                SELECT Id, Nome, Autor, ISBN, Genero, QuantidadeTotal,
-                       QuantidadeEmprestada, QuantidadeDisponivel, Ativo, DataCadastro
+                query = f"""
+                SELECT {colunas}
                 FROM VW_EstoqueLivros
                 WHERE Ativo = 1
                 ORDER BY Nome
@@ -308,51 +401,315 @@ class Livro:
             resultados = db.execute_query(query, params)
 
             if resultados:
-                return [Livro._from_estoque_row(row) for row in resultados]
+                return [montar(row) for row in resultados]
             else:
                 return []
 
         except Exception as e:
             print(f"✗ Erro ao listar livros: {e}")
             return []
+        finally:
+            db.close()
 
     @staticmethod
-    def buscar_por_isbn(isbn: str) -> Optional['Livro']:
+    def listar_pagina(
+            cursor: Optional[str] = None,
+            limite: int = 50,
+            incluir_inativos: bool = False,
+            campos: Optional[Iterable[str]] = None) -> tuple[list, Optional[str]]:
+        """Página de livros em ordem de nome e o cursor da próxima (None no fim).
+
+        Com campos, a página traz resumos só com esses campos (mais id e
+        nome, usados pelo cursor). Levanta ValueError se o cursor não veio
+        de uma chamada anterior.
+        """
+        from Backend.Paginacao import FILTRO_APOS_CURSOR, fechar_pagina, parametros_cursor
         from Banco_de_dados.connection import DatabaseConnection
 
+        params = parametros_cursor(cursor)
+        if campos is not None:
+            campos = ['nome', *campos]
+        colunas, montar = Livro._leitura_estoque(campos)
+
+        filtros = []
+        if not incluir_inativos:
+            filtros.append("Ativo = 1")
+        if params:
+            filtros.append(FILTRO_APOS_CURSOR)
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+
         db = DatabaseConnection()
 
         try:
-            query = "SELECT * FROM Livro WHERE ISBN = ?"
+            query = f"""
+            SELECT {colunas}
+            FROM VW_EstoqueLivros
+            {where}
+            ORDER BY Nome, Id
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+            """
+
+            resultados = db.execute_query(query, params + (limite + 1,))
+            livros = [montar(row) for row in resultados or []]
+            return fechar_pagina(livros, limite)
+
+        except Exception as e:
+            print(f"✗ Erro ao listar página de livros: {e}")
+            return [], None
+        finally:
+            db.close()
+
+    @staticmethod
+    def buscar(
+            texto: str,
+            campos: Optional[list[str]] = None,
+            limite: int = 50,
+            offset: int = 0,
+            incluir_inativos: bool = False,
+            projecao: Optional[Iterable[str]] = None) -> list:
+        """Busca paginada por prefixo de palavras, sem diferenciar acento e caixa.
+
+        Todas as palavras de ``texto`` precisam aparecer (como prefixo) em
+        algum dos ``campos`` (nome, autor, isbn, genero; padrão: todos).
+        Com ``projecao``, devolve resumos só com esses campos (e o id).
+        """
+        termos = Livro._termos_busca(texto)
+        if not termos:
+            return []
+
+        campos = campos or list(Livro.CAMPOS_BUSCA)
+        invalidos = [c for c in campos if c not in Livro.CAMPOS_BUSCA]
+        if invalidos:
+            raise ValueError(f"Campos de busca inválidos: {', '.join(invalidos)}")
+        colunas = [Livro.CAMPOS_BUSCA[c] for c in campos]
+        selecao, montar = Livro._leitura_estoque(projecao, prefixo="v.")
+
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            origem, filtro, params = Livro._filtro_busca(db, termos, colunas)
+            if not incluir_inativos:
+                filtro += " AND v.Ativo = 1"
+
+            query = f"""
+                SELECT {selecao}
+                FROM {origem}
+                WHERE {filtro}
+                ORDER BY v.Nome, v.Id
+                OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+            """
+
+            resultados = db.execute_query(query, (*params, offset, limite))
+            return [montar(row) for row in resultados or []]
+
+        except Exception as e:
+            print(f"✗ Erro ao buscar livros: {e}")
+            return []
+        finally:
+            db.close()
+
+    @staticmethod
+    def _termos_busca(texto: str) -> list[str]:
+
+        termos = [t.strip('-') for t in re.findall(r"[\w-]+", texto or "")]
+        return [t for t in termos if t][:Livro.MAX_TERMOS_BUSCA]
+
+    @staticmethod
+    def _filtro_busca(db, termos: list[str], colunas: list[str]) -> tuple[str, str, list]:
+        """Monta FROM/WHERE da busca conforme o que o banco oferece.
+
+        Em todos os caminhos cada termo é conferido à parte, podendo casar
+        em colunas diferentes ("machado dom" acha Nome "Dom Casmurro" com
+        Autor "Machado de Assis"). O FTS5 trata o hífen como parte da
+        palavra (tokenchars '-'), então "casmurro" não casa com
+        "Dom-Casmurro" nem "9788" com o ISBN "978-85-..."; o LIKE, além
+        disso, só reconhece espaço como separador de palavras.
+        filtrar_busca reproduz essas regras em memória.
+        """
+
+        if db.backend.name == 'sqlite':
+            # FTS5 com unicode61 remove_diacritics: a consulta passa pelo mesmo
+            # tokenizador do índice, então acento e caixa já são ignorados
+            expressao = " AND ".join(f'"{t}"*' for t in termos)
+            return (
+                "LivroBusca INNER JOIN VW_EstoqueLivros v ON v.Id = LivroBusca.rowid",
+                "LivroBusca MATCH ?",
+                [f"{{{' '.join(colunas)}}} : ({expressao})"])
+
+        if Livro._full_text_disponivel is None:
+            Livro._full_text_disponivel = bool(db.execute_scalar(
+                "SELECT OBJECTPROPERTY(OBJECT_ID('Livro'), 'TableHasActiveFulltextIndex')"))
+
+        if Livro._full_text_disponivel:
+            # Um CONTAINS por termo: com todos num só, "a*" AND "b*" teria
+            # de casar dentro da mesma coluna. O índice cobre exatamente as
+            # colunas de CAMPOS_BUSCA, então a busca padrão usa *
+            if len(colunas) == len(Livro.CAMPOS_BUSCA):
+                contem = "CONTAINS(*, ?)"
+            else:
+                contem = f"CONTAINS(({', '.join(colunas)}), ?)"
+            return (
+                "VW_EstoqueLivros v",
+                f"v.Id IN (SELECT Id FROM Livro WHERE {' AND '.join([contem] * len(termos))})",
+                [f'"{t}*"' for t in termos])
+
+        # Prefixo no início da coluna ou logo após um espaço
+        condicoes, params = [], []
+        for termo in termos:
+            termo = termo.replace('_', '[_]')
+            condicoes.append("(" + " OR ".join(
+                f"v.{coluna} COLLATE Latin1_General_CI_AI LIKE ?"
+                for coluna in colunas for _ in range(2)) + ")")
+            params.extend([f"{termo}%", f"% {termo}%"] * len(colunas))
+        return "VW_EstoqueLivros v", " AND ".join(condicoes), params
+
+    @staticmethod
+    def filtrar_busca(livros: list, texto: str,
+                      campos: Optional[list[str]] = None) -> Optional[list]:
+        """Refaz em memória o filtro de buscar(texto, campos) sobre livros já lidos.
+
+        Segue a regra de _filtro_busca no backend em uso, então o resultado
+        é o que o banco devolveria dentre esses livros. Com o full-text do
+        SQL Server, cujo separador de palavras não dá para reproduzir aqui,
+        devolve None e quem chamou deve consultar o banco.
+        """
+        from Banco_de_dados.backends import get_backend
+        from Backend.IndiceLivros import normalizar
+
+        termos = [normalizar(t) for t in Livro._termos_busca(texto)]
+        if not termos:
+            return []
+        campos = campos or list(Livro.CAMPOS_BUSCA)
+
+        if get_backend().name == 'sqlite':
+            def palavras(valor: str) -> list[str]:
+                return Livro._PALAVRA_FTS.findall(valor)
+
+            frases = [palavras(t) for t in termos]
+
+            def casa(valores: list[str]) -> bool:
+                tokens = [palavras(v) for v in valores]
+                return all(any(Livro._casa_frase(t, frase) for t in tokens)
+                           for frase in frases)
+
+        elif Livro._full_text_disponivel is False:
+            # LIKE 'termo%' OR LIKE '% termo%'
+            def casa(valores: list[str]) -> bool:
+                return all(any(v.startswith(t) or f" {t}" in v for v in valores)
+                           for t in termos)
+
+        else:
+            return None
+
+        return [livro for livro in livros
+                if casa([normalizar(getattr(livro, c, None) or "") for c in campos])]
+
+    @staticmethod
+    def _casa_frase(tokens: list[str], frase: list[str]) -> bool:
+        """Se frase aparece em sequência em tokens, a última palavra como prefixo"""
+
+        if not frase:
+            return False
+        n = len(frase)
+        return any(tokens[i:i + n - 1] == frase[:-1] and tokens[i + n - 1].startswith(frase[-1])
+                   for i in range(len(tokens) - n + 1))
+
+    @staticmethod
+    def buscar_por_isbn(isbn: str, campos: Optional[Iterable[str]] = None):
+        """Livro completo ou, com campos, um resumo só com esses campos"""
+        from Banco_de_dados.connection import DatabaseConnection
+
+        livro = Livro._cache.obter(('isbn', isbn))
+        if livro is not None:
+            return livro if campos is None else Livro._projecao.de_entidade(campos, livro)
+
+        colunas, montar = Livro._leitura(campos)
+        db = DatabaseConnection()
+
+        try:
+            query = f"SELECT {colunas} FROM Livro WHERE ISBN = ?"
             resultados = db.execute_query(query, (isbn,))
 
             if resultados:
-                return Livro._from_db_row(resultados[0])
+                if campos is not None:
+                    return montar(resultados[0])
+                livro = montar(resultados[0])
+                Livro._guardar_no_cache(livro)
+                return livro
             else:
                 return None
 
         except Exception as e:
             print(f"✗ Erro ao buscar livro por ISBN: {e}")
             return None
+        finally:
+            db.close()
 
     @staticmethod
-    def buscar_por_id(livro_id: int) -> Optional['Livro']:
+    def buscar_por_id(livro_id: int, campos: Optional[Iterable[str]] = None):
+        """Livro completo ou, com campos, um resumo só com esses campos"""
         from Banco_de_dados.connection import DatabaseConnection
 
+        livro = Livro._cache.obter(('id', livro_id))
+        if livro is not None:
+            return livro if campos is None else Livro._projecao.de_entidade(campos, livro)
+
+        colunas, montar = Livro._leitura(campos)
         db = DatabaseConnection()
 
         try:
-            query = "SELECT * FROM Livro WHERE Id = ?"
+            query = f"SELECT {colunas} FROM Livro WHERE Id = ?"
             resultados = db.execute_query(query, (livro_id,))
 
             if resultados:
-                return Livro._from_db_row(resultados[0])
+                if campos is not None:
+                    return montar(resultados[0])
+                livro = montar(resultados[0])
+                Livro._guardar_no_cache(livro)
+                return livro
             else:
                 return None
 
         except Exception as e:
             print(f"✗ Erro ao buscar livro por ID: {e}")
             return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def _leitura(campos: Optional[Iterable[str]]):
+        """Colunas da tabela Livro e montagem das linhas: Livro completo sem
+        campos, resumo com eles"""
+        if campos is None:
+            return Livro._COLUNAS, Livro._from_db_row
+        return Livro._projecao.preparar(campos)
+
+    @staticmethod
+    def _leitura_estoque(campos: Optional[Iterable[str]], prefixo: str = ""):
+        """Colunas de VW_EstoqueLivros e montagem das linhas: Livro completo
+        sem campos, resumo com eles"""
+        if campos is not None:
+            return Livro._projecao_estoque.preparar(campos, prefixo)
+
+        colunas = ", ".join(prefixo + coluna for coluna in (
+            "Id", "Nome", "Autor", "ISBN", "Genero", "QuantidadeTotal",
+            "QuantidadeEmprestada", "QuantidadeDisponivel", "Ativo", "DataCadastro"))
+        return colunas, Livro._from_estoque_row
+
+    @staticmethod
+    def _guardar_no_cache(livro: 'Livro') -> None:
+        Livro._cache.guardar(livro, ('id', livro.id), ('isbn', livro.isbn))
+
+    @staticmethod
+    def estatisticas_cache() -> dict:
+        """Acertos, falhas e ocupação do cache de buscar_por_id/isbn"""
+        return Livro._cache.estatisticas()
+
+    @staticmethod
+    def limpar_cache() -> None:
+        Livro._cache.limpar()
 
     @staticmethod
     def _from_db_row(row) -> 'Livro':
@@ -426,9 +783,7 @@ class Livro:
 
     def _buscar_ultimo_id(self, db) -> Optional[int]:
         try:
-            query = "SELECT SCOPE_IDENTITY()"
-            resultado = db.execute_scalar(query)
-            return int(resultado) if resultado else None
+            return db.last_insert_id()
         except BaseException:
             return None
 
@@ -448,10 +803,108 @@ class Livro:
             """
 
             resultados = db.execute_query(query)
-            return [Livro._from_estoque_row(row) for row in resultados]
+            return [Livro._from_estoque_row(row) for row in resultados or []]
 
         except Exception as e:
             print(f"Erro ao listar livros com estoque: {e}")
             return []
         finally:
             db.close()
+
+    @staticmethod
+    def listar_por_ids(ids: Iterable[int], campos: Optional[Iterable[str]] = None) -> list:
+        """Livros ativos de VW_EstoqueLivros na ordem de ids, com o estoque
+        lido agora (ex.: para completar o resultado do IndiceLivros). Ids
+        inativos ou inexistentes ficam de fora."""
+        from Banco_de_dados.connection import DatabaseConnection
+
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+
+        colunas, montar = Livro._leitura_estoque(campos)
+        db = DatabaseConnection()
+
+        try:
+            marcadores = ', '.join('?' * len(ids))
+            query = f"""
+                SELECT {colunas}
+                FROM VW_EstoqueLivros
+                WHERE Ativo = 1 AND Id IN ({marcadores})
+            """
+
+            por_id = {}
+            for row in db.execute_query(query, tuple(ids)) or []:
+                livro = montar(row)
+                por_id[livro.id] = livro
+            return [por_id[livro_id] for livro_id in ids if livro_id in por_id]
+
+        except Exception as e:
+            print(f"✗ Erro ao listar livros por id: {e}")
+            return []
+        finally:
+            db.close()
+
+    @staticmethod
+    def reconciliar_estoque(corrigir: bool = False) -> list[dict]:
+        """Confere o contador QuantidadeEmprestada contra os empréstimos
+        ativos mais os exemplares separados para reservas.
+
+        Devolve os livros divergentes; com corrigir=True regrava o contador
+        a partir da contagem real.
+        """
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+        try:
+            query = """
+                SELECT l.Id, l.Nome, l.QuantidadeEmprestada as Contador,
+                       ISNULL(e.Ativos, 0) as Real
+                FROM Livro l
+                LEFT JOIN (
+                    SELECT LivroId, COUNT(*) as Ativos
+                    FROM (SELECT LivroId FROM Emprestimo
+                          WHERE Status IN ('Emprestado', 'Atrasado')
+                          UNION ALL
+                          SELECT LivroId FROM Reserva
+                          WHERE Status = 'AguardandoRetirada') retidos
+                    GROUP BY LivroId
+                ) e ON e.LivroId = l.Id
+                WHERE l.QuantidadeEmprestada <> ISNULL(e.Ativos, 0)
+                ORDER BY l.Id
+            """
+            resultados = db.execute_query(query) or []
+            divergencias = [
+                {
+                    'livro_id': row['Id'],
+                    'nome': row['Nome'],
+                    'contador': row['Contador'],
+                    'real': row['Real']
+                }
+                for row in resultados
+            ]
+
+            if corrigir and divergencias:
+                correcao = """
+                    UPDATE Livro
+                    SET QuantidadeEmprestada = (
+                        SELECT COUNT(*) FROM Emprestimo e
+                        WHERE e.LivroId = Livro.Id AND e.Status IN ('Emprestado', 'Atrasado'))
+                      + (SELECT COUNT(*) FROM Reserva r
+                         WHERE r.LivroId = Livro.Id AND r.Status = 'AguardandoRetirada')
+                    WHERE QuantidadeEmprestada <> (
+                        SELECT COUNT(*) FROM Emprestimo e
+                        WHERE e.LivroId = Livro.Id AND e.Status IN ('Emprestado', 'Atrasado'))
+                      + (SELECT COUNT(*) FROM Reserva r
+                         WHERE r.LivroId = Livro.Id AND r.Status = 'AguardandoRetirada')
+                """
+                corrigidos = db.execute_rowcount(correcao)
+                print(f"✓ Estoque de {corrigidos} livro(s) reconciliado")
+
+            return divergencias
+
+        except Exception as e:
+            print(f"✗ Erro ao reconciliar estoque: {e}")
+            return []
+        finally:
+            db.close()
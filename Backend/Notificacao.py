@@ -1,6 +1,8 @@
 
-from datetime import datetime
-from typing import Optional
+import threading
+import time
+from datetime import date, datetime
+from typing import Callable, Iterable, Optional
 from enum import Enum
 
 
@@ -21,8 +23,60 @@ class StatusNotificacao(Enum):
     ARQUIVADA = "ARQUIVADA"
 
 
+class ContadorNaoLidas:
+    """Total de notificações não lidas por usuário, mantido em memória.
+
+    O primeiro pedido de cada usuário faz o COUNT; depois o total é
+    ajustado pelas operações deste processo (salvar, marcar como lida,
+    arquivar, excluir). Como outros processos (varredura agendada, outra
+    estação) também gravam notificações, cada total vale por ttl segundos
+    e então é recontado.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._totais: dict[int, tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def obter(self, usuario_id: int, contar: Callable[[int], int]) -> int:
+
+        with self._lock:
+            entrada = self._totais.get(usuario_id)
+            if entrada is not None and entrada[0] > time.monotonic():
+                return entrada[1]
+
+        total = contar(usuario_id)
+        with self._lock:
+            self._totais[usuario_id] = (time.monotonic() + self.ttl, total)
+        return total
+
+    def ajustar(self, usuario_id: int, delta: int) -> None:
+        """Soma delta ao total guardado (sem efeito se ainda não contado)"""
+
+        with self._lock:
+            entrada = self._totais.get(usuario_id)
+            if entrada is not None:
+                self._totais[usuario_id] = (entrada[0], max(entrada[1] + delta, 0))
+
+    def invalidar(self, usuario_id: Optional[int] = None) -> None:
+
+        with self._lock:
+            if usuario_id is None:
+                self._totais.clear()
+            else:
+                self._totais.pop(usuario_id, None)
+
+
 class Notificacao:
 
+    # Quantas notificações novas o feed devolve por consulta
+    LIMITE_NOVIDADES = 50
+
+    _INSERT = """INSERT INTO Notificacao (UsuarioId, Tipo, Titulo, Mensagem, Status, DataCriacao, LivroId, Chave)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+
+    _nao_lidas = ContadorNaoLidas()
+
     def __init__(
             self,
             usuario_id: int,
@@ -34,7 +88,8 @@ class Notificacao:
             data_criacao: Optional[datetime] = None,
             data_leitura: Optional[datetime] = None,
             ativa: bool = True,
-            livro_id: Optional[int] = None):
+            livro_id: Optional[int] = None,
+            chave: Optional[str] = None):
 
         self._id = id
         self.usuario_id = usuario_id
@@ -46,11 +101,18 @@ class Notificacao:
         self.data_leitura = data_leitura
         self._ativa = ativa
         self.livro_id = livro_id
+        # Identifica avisos que só podem existir uma vez (ex.: atraso de um
+        # empréstimo num dia); None para notificações comuns
+        self.chave = chave
 
     @property
     def id(self):
         return self._id
 
+    @id.setter
+    def id(self, valor: int):
+        self._id = valor
+
     @property
     def ativa(self):
         return self._ativa
@@ -89,25 +151,18 @@ class Notificacao:
         db = DatabaseConnection()
 
         try:
-            query = """INSERT INTO Notificacao (UsuarioId, Tipo, Titulo, Mensagem, Status, DataCriacao, LivroId)
-                      VALUES (?, ?, ?, ?, ?, ?, ?)"""
-            params = (
-                self.usuario_id,
-                self.tipo.value,
-                self.titulo,
-                self.mensagem,
-                self.status.value,
-                self.data_criacao,
-                self.livro_id)
-
-            if db.execute_non_query(query, params):
+            if db.execute_non_query(Notificacao._INSERT, self._parametros_insert()):
                 self.id = self._buscar_ultimo_id(db)
+                if self.ativa and self.status == StatusNotificacao.NAO_LIDA:
+                    Notificacao._nao_lidas.ajustar(self.usuario_id, +1)
                 return True, "Notificação criada com sucesso!"
             else:
                 return False, "Falha ao criar notificação"
 
         except Exception as e:
             return False, f"Erro ao criar notificação: {e}"
+        finally:
+            db.close()
 
     def marcar_como_lida(self) -> tuple[bool, str]:
 
@@ -119,19 +174,19 @@ class Notificacao:
         db = DatabaseConnection()
 
         try:
-            query = "UPDATE Notificacao SET Status = ?, DataLeitura = ? WHERE Id = ?"
             self.data_leitura = datetime.now()
             self.status = StatusNotificacao.LIDA
 
-            params = (self.status.value, self.data_leitura, self.id)
-
-            if db.execute_non_query(query, params):
+            if self._atualizar(db, "Status = ?, DataLeitura = ?",
+                               (self.status.value, self.data_leitura)):
                 return True, "Notificação marcada como lida!"
             else:
                 return False, "Falha ao marcar como lida"
 
         except Exception as e:
             return False, f"Erro ao marcar como lida: {e}"
+        finally:
+            db.close()
 
     def arquivar(self) -> tuple[bool, str]:
 
@@ -143,16 +198,17 @@ class Notificacao:
         db = DatabaseConnection()
 
         try:
-            query = "UPDATE Notificacao SET Status = ? WHERE Id = ?"
             self.status = StatusNotificacao.ARQUIVADA
 
-            if db.execute_non_query(query, (self.status.value, self.id)):
+            if self._atualizar(db, "Status = ?", (self.status.value,)):
                 return True, "Notificação arquivada!"
             else:
                 return False, "Falha ao arquivar notificação"
 
         except Exception as e:
             return False, f"Erro ao arquivar: {e}"
+        finally:
+            db.close()
 
     def excluir(self) -> tuple[bool, str]:
 
@@ -164,8 +220,7 @@ class Notificacao:
         db = DatabaseConnection()
 
         try:
-            query = "UPDATE Notificacao SET Ativa = 0 WHERE Id = ?"
-            if db.execute_non_query(query, (self.id,)):
+            if self._atualizar(db, "Ativa = 0", ()):
                 self.ativa = False
                 return True, "Notificação excluída!"
             else:
@@ -173,11 +228,30 @@ class Notificacao:
 
         except Exception as e:
             return False, f"Erro ao excluir: {e}"
+        finally:
+            db.close()
+
+    def _atualizar(self, db, atribuicoes: str, params: tuple) -> bool:
+        """UPDATE da linha desta notificação que mantém o contador de não
+        lidas: se a linha estava ativa e não lida, o total do usuário cai um"""
+
+        with db.transaction():
+            if db.execute_rowcount(
+                    f"""UPDATE Notificacao SET {atribuicoes}
+                        WHERE Id = ? AND Ativa = 1 AND Status = ?""",
+                    params + (self.id, StatusNotificacao.NAO_LIDA.value)):
+                Notificacao._nao_lidas.ajustar(self.usuario_id, -1)
+                return True
+
+            return db.execute_rowcount(
+                f"UPDATE Notificacao SET {atribuicoes} WHERE Id = ?",
+                params + (self.id,)) > 0
 
     @staticmethod
     def listar_por_usuario(
             usuario_id: int,
-            apenas_nao_lidas: bool = False) -> list['Notificacao']:
+            apenas_nao_lidas: bool = False,
+            incluir_arquivadas: bool = False) -> list['Notificacao']:
 
         from Banco_de_dados.connection import DatabaseConnection
 
@@ -185,15 +259,20 @@ class Notificacao:
 
         try:
             if apenas_nao_lidas:
-                query = """SELECT Id, UsuarioId, Tipo, Titulo, Mensagem, Status, DataCriacao, DataLeitura, Ativa, LivroId
+                query = """SELECT Id, UsuarioId, Tipo, Titulo, Mensagem, Status, DataCriacao, DataLeitura, Ativa, LivroId, Chave
                           FROM Notificacao WHERE UsuarioId = ? AND Status = ? AND Ativa = 1
                           ORDER BY DataCriacao DESC"""
                 params = (usuario_id, StatusNotificacao.NAO_LIDA.value)
-            else:
-                query = """SELECT Id, UsuarioId, Tipo, Titulo, Mensagem, Status, DataCriacao, DataLeitura, Ativa, LivroId
+            elif incluir_arquivadas:
+                query = """SELECT Id, UsuarioId, Tipo, Titulo, Mensagem, Status, DataCriacao, DataLeitura, Ativa, LivroId, Chave
                           FROM Notificacao WHERE UsuarioId = ? AND Ativa = 1
                           ORDER BY DataCriacao DESC"""
                 params = (usuario_id,)
+            else:
+                query = """SELECT Id, UsuarioId, Tipo, Titulo, Mensagem, Status, DataCriacao, DataLeitura, Ativa, LivroId, Chave
+                          FROM Notificacao WHERE UsuarioId = ? AND Status <> ? AND Ativa = 1
+                          ORDER BY DataCriacao DESC"""
+                params = (usuario_id, StatusNotificacao.ARQUIVADA.value)
 
             resultados = db.execute_query(query, params)
 
@@ -205,9 +284,16 @@ class Notificacao:
         except Exception as e:
             print(f"✗ Erro ao listar notificações: {e}")
             return []
+        finally:
+            db.close()
 
     @staticmethod
     def contar_nao_lidas(usuario_id: int) -> int:
+        """Total de não lidas, do contador em memória quando disponível"""
+        return Notificacao._nao_lidas.obter(usuario_id, Notificacao._contar_nao_lidas_no_banco)
+
+    @staticmethod
+    def _contar_nao_lidas_no_banco(usuario_id: int) -> int:
 
         from Banco_de_dados.connection import DatabaseConnection
 
@@ -228,6 +314,83 @@ class Notificacao:
         except Exception as e:
             print(f"✗ Erro ao contar notificações: {e}")
             return 0
+        finally:
+            db.close()
+
+    @staticmethod
+    def marcar_todas_como_lidas(usuario_id: int) -> int:
+        """Marca como lidas todas as não lidas do usuário num único UPDATE.
+        Devolve quantas mudaram."""
+        return Notificacao._mudar_status_em_lote(
+            usuario_id, StatusNotificacao.LIDA, (StatusNotificacao.NAO_LIDA,))
+
+    @staticmethod
+    def marcar_como_lidas(usuario_id: int, ids: Iterable[int]) -> int:
+        """Como marcar_todas_como_lidas, restrito às notificações em ids"""
+        return Notificacao._mudar_status_em_lote(
+            usuario_id, StatusNotificacao.LIDA, (StatusNotificacao.NAO_LIDA,), ids)
+
+    @staticmethod
+    def arquivar_todas(usuario_id: int) -> int:
+        """Arquiva todas as notificações (lidas ou não) do usuário"""
+        return Notificacao._mudar_status_em_lote(
+            usuario_id, StatusNotificacao.ARQUIVADA,
+            (StatusNotificacao.NAO_LIDA, StatusNotificacao.LIDA))
+
+    @staticmethod
+    def arquivar_varias(usuario_id: int, ids: Iterable[int]) -> int:
+        return Notificacao._mudar_status_em_lote(
+            usuario_id, StatusNotificacao.ARQUIVADA,
+            (StatusNotificacao.NAO_LIDA, StatusNotificacao.LIDA), ids)
+
+    @staticmethod
+    def _mudar_status_em_lote(
+            usuario_id: int,
+            novo_status: StatusNotificacao,
+            de_status: tuple[StatusNotificacao, ...],
+            ids: Optional[Iterable[int]] = None) -> int:
+        """UPDATE de Status das notificações ativas do usuário que estão em
+        de_status. Com ids, só essas (em lotes de até LOTE_CONSULTA
+        parâmetros); DataLeitura é preenchida se ainda estiver vazia."""
+        from Backend.Importacao import LOTE_CONSULTA
+        from Banco_de_dados.connection import DatabaseConnection
+
+        query = f"""UPDATE Notificacao
+                    SET Status = ?, DataLeitura = ISNULL(DataLeitura, ?)
+                    WHERE UsuarioId = ? AND Ativa = 1
+                      AND Status IN ({', '.join('?' * len(de_status))})"""
+        params = (novo_status.value, datetime.now(), usuario_id) + \
+            tuple(status.value for status in de_status)
+
+        if ids is None:
+            partes = [()]
+        else:
+            ids = list(dict.fromkeys(ids))
+            if not ids:
+                return 0
+            partes = [tuple(ids[i:i + LOTE_CONSULTA])
+                      for i in range(0, len(ids), LOTE_CONSULTA)]
+
+        db = DatabaseConnection()
+
+        try:
+            total = 0
+            with db.transaction():
+                for parte in partes:
+                    filtro = f" AND Id IN ({', '.join('?' * len(parte))})" if parte else ""
+                    total += db.execute_rowcount(query + filtro, params + parte)
+
+            if de_status == (StatusNotificacao.NAO_LIDA,):
+                Notificacao._nao_lidas.ajustar(usuario_id, -total)
+            elif total:
+                # Não se sabe quantas das alteradas estavam não lidas
+                Notificacao._nao_lidas.invalidar(usuario_id)
+            return total
+        except Exception as e:
+            print(f"✗ Erro ao atualizar notificações: {e}")
+            return 0
+        finally:
+            db.close()
 
     @staticmethod
     def criar_notificacao_sistema(
@@ -246,28 +409,189 @@ class Notificacao:
         notificacao.salvar()
         return notificacao
 
+    @staticmethod
+    def buscar_novidades(usuario_id: int, desde_id: int = 0) -> dict:
+        """Feed de mudanças para a interface consultar a cada poucos
+        segundos: notificações ativas criadas depois de desde_id (no
+        máximo LIMITE_NOVIDADES, mais antigas primeiro), o maior Id visto e
+        o total de não lidas.
+
+        Com desde_id = 0 só informa o ponto de partida, sem listar nada.
+        """
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            if desde_id:
+                query = """SELECT Id, UsuarioId, Tipo, Titulo, Mensagem, Status, DataCriacao, DataLeitura, Ativa, LivroId, Chave
+                          FROM Notificacao WHERE UsuarioId = ? AND Id > ? AND Ativa = 1
+                          ORDER BY Id
+                          OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"""
+                resultados = db.execute_query(
+                    query, (usuario_id, desde_id, Notificacao.LIMITE_NOVIDADES)) or []
+                novas = [Notificacao._from_db_row(row) for row in resultados]
+                ultimo_id = novas[-1].id if novas else desde_id
+            else:
+                novas = []
+                ultimo_id = db.execute_scalar(
+                    "SELECT MAX(Id) FROM Notificacao WHERE UsuarioId = ?",
+                    (usuario_id,)) or 0
+        except Exception as e:
+            print(f"✗ Erro ao buscar novidades: {e}")
+            novas, ultimo_id = [], desde_id
+        finally:
+            db.close()
+
+        if novas:
+            # Pode ter vindo de outro processo: o contador é refeito
+            Notificacao._nao_lidas.invalidar(usuario_id)
+
+        return {
+            'novas': novas,
+            'ultimo_id': ultimo_id,
+            'nao_lidas': Notificacao.contar_nao_lidas(usuario_id)
+        }
+
+    @staticmethod
+    def inserir_em_lote(db, notificacoes: list['Notificacao']) -> int:
+        """Grava várias notificações com um executemany, na conexão (e
+        transação) de quem chama; os erros sobem para ela desfazer tudo"""
+
+        if not notificacoes:
+            return 0
+
+        db.execute_many(
+            Notificacao._INSERT, [n._parametros_insert() for n in notificacoes])
+
+        # A transação ainda pode ser desfeita: os totais são recontados
+        for usuario_id in {n.usuario_id for n in notificacoes}:
+            Notificacao._nao_lidas.invalidar(usuario_id)
+        return len(notificacoes)
+
+    @staticmethod
+    def chave_atraso(usuario_id: int, emprestimo_id: int, dia: date) -> str:
+        return f"atraso:{usuario_id}:{emprestimo_id}:{dia.isoformat()}"
+
+    @staticmethod
+    def gerar_alertas_atraso(
+            referencia: Optional[datetime] = None,
+            tamanho_lote: int = 1000) -> int:
+        """Cria um aviso por empréstimo atrasado, para todos os usuários,
+        no máximo uma vez por dia.
+
+        Percorre os empréstimos com Status = 'Atrasado' (gravado pela
+        varredura de Emprestimo) em lotes por Id, descarta os que já têm o
+        aviso do dia (chave usuário + empréstimo + dia) e insere o resto
+        com inserir_em_lote, um executemany por lote. Devolve quantos
+        avisos foram criados.
+        """
+        from Backend.Importacao import valores_existentes
+        from Banco_de_dados.connection import DatabaseConnection
+
+        referencia = referencia or datetime.now()
+        query = """
+        SELECT e.Id, e.UsuarioId, e.LivroId, e.DataPrevistaDevolucao, e.ValorMulta,
+               l.Nome as LivroTitulo, l.Autor as LivroAutor
+        FROM Emprestimo e
+        INNER JOIN Livro l ON e.LivroId = l.Id
+        WHERE e.Status = 'Atrasado' AND e.Id > ?
+        ORDER BY e.Id
+        OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+        """
+
+        db = DatabaseConnection()
+        criadas = 0
+        ultimo_id = 0
+
+        try:
+            while True:
+                linhas = db.execute_query(query, (ultimo_id, tamanho_lote))
+                if not linhas:
+                    break
+                ultimo_id = linhas[-1]['Id']
+
+                avisos = [Notificacao._aviso_atraso(row, referencia) for row in linhas]
+                existentes = valores_existentes(
+                    db, 'Notificacao', 'Chave', [n.chave for n in avisos])
+                novos = [n for n in avisos if n.chave not in existentes]
+
+                if novos:
+                    try:
+                        with db.transaction():
+                            inseridas = Notificacao.inserir_em_lote(db, novos)
+                        criadas += inseridas
+                    except Exception:
+                        # Outra rodada criou parte dos avisos no meio tempo:
+                        # o índice único recusa as repetidas, uma a uma
+                        gravados = [n for n in novos if db.execute_non_query(
+                            Notificacao._INSERT, n._parametros_insert())]
+                        criadas += len(gravados)
+                        for usuario_id in {n.usuario_id for n in gravados}:
+                            Notificacao._nao_lidas.invalidar(usuario_id)
+
+                if len(linhas) < tamanho_lote:
+                    break
+
+            return criadas
+        except Exception as e:
+            print(f"✗ Erro ao gerar avisos de atraso: {e}")
+            return criadas
+        finally:
+            db.close()
+
+    @staticmethod
+    def _aviso_atraso(row: dict, referencia: datetime) -> 'Notificacao':
+
+        prevista = row['DataPrevistaDevolucao']
+        dias = max((referencia.date() - prevista.date()).days, 0) if prevista else 0
+        multa = float(row.get('ValorMulta') or 0)
+
+        titulo = f"📚 Livro em Atraso: {row['LivroTitulo']}"
+        mensagem = (f"O livro '{row['LivroTitulo']}' do autor {row['LivroAutor']} "
+                    f"está {dias} dia(s) em atraso. Multa atual: R$ {multa:.2f}. "
+                    f"Por favor, devolva o quanto antes.")
+
+        return Notificacao(
+            usuario_id=row['UsuarioId'],
+            tipo=TipoNotificacao.MULTA,
+            titulo=titulo[:100],
+            mensagem=mensagem[:1000],
+            data_criacao=referencia,
+            livro_id=row['LivroId'],
+            chave=Notificacao.chave_atraso(row['UsuarioId'], row['Id'], referencia.date()))
+
+    def _parametros_insert(self) -> tuple:
+        return (
+            self.usuario_id,
+            self.tipo.value,
+            self.titulo,
+            self.mensagem,
+            self.status.value,
+            self.data_criacao,
+            self.livro_id,
+            self.chave)
+
     @staticmethod
     def _from_db_row(row) -> 'Notificacao':
 
         return Notificacao(
-            id=row[0],
-            usuario_id=row[1],
-            tipo=TipoNotificacao(row[2]),
-            titulo=row[3],
-            mensagem=row[4],
-            status=StatusNotificacao(row[5]),
-            data_criacao=row[6],
-            data_leitura=row[7],
-            ativa=bool(row[8]),
-            livro_id=row[9]
+            id=row['Id'],
+            usuario_id=row['UsuarioId'],
+            tipo=TipoNotificacao(row['Tipo']),
+            titulo=row['Titulo'],
+            mensagem=row['Mensagem'],
+            status=StatusNotificacao(row['Status']),
+            data_criacao=row['DataCriacao'],
+            data_leitura=row['DataLeitura'],
+            ativa=bool(row['Ativa']),
+            livro_id=row['LivroId'],
+            chave=row.get('Chave')
         )
 
     def _buscar_ultimo_id(self, db) -> Optional[int]:
-
         try:
-            query = "SELECT SCOPE_IDENTITY()"
-            resultado = db.execute_query(query)
-            return int(resultado[0][0]) if resultado else None
+            return db.last_insert_id()
         except BaseException:
             return None
 
@@ -275,4 +599,4 @@ class Notificacao:
         return f"Notificacao(id={self.id}, usuario_id={self.usuario_id}, tipo={self.tipo.value})"
 
     def __repr__(self) -> str:
-        return f"Notificacao(id={self.id}, usuario_id={self.usuaraio_id}, titulo='{self.titulo}', status={self.status.value})"
+        return f"Notificacao(id={self.id}, usuario_id={self.usuario_id}, titulo='{self.titulo}', status={self.status.value})"
@@ -0,0 +1,48 @@
+import base64
+import json
+from typing import Optional
+
+
+# Paginação por chave (keyset): cada página continua depois do último
+# (Nome, Id) entregue, em vez de pular N linhas com OFFSET. O custo de
+# buscar a página 1000 é o mesmo da primeira e nada fica escondido atrás
+# de um limite fixo.
+
+FILTRO_APOS_CURSOR = "(Nome > ? OR (Nome = ? AND Id > ?))"
+
+
+def codificar_cursor(nome: str, id: int) -> str:
+    """Cursor opaco que aponta para depois do registro (nome, id)"""
+    bruto = json.dumps([nome, id], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii')
+
+
+def decodificar_cursor(cursor: str) -> tuple[str, int]:
+
+    try:
+        nome, id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if not isinstance(nome, str) or not isinstance(id, int):
+            raise ValueError
+        return nome, id
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Cursor de paginação inválido") from None
+
+
+def parametros_cursor(cursor: Optional[str]) -> tuple:
+    """Parâmetros de FILTRO_APOS_CURSOR, ou () para a primeira página"""
+    if not cursor:
+        return ()
+    nome, id = decodificar_cursor(cursor)
+    return (nome, nome, id)
+
+
+def fechar_pagina(registros: list, limite: int) -> tuple[list, Optional[str]]:
+    """Recebe até limite + 1 registros e devolve a página com o cursor da
+    próxima, ou None quando não há mais nada"""
+
+    if len(registros) <= limite:
+        return registros, None
+
+    pagina = registros[:limite]
+    ultimo = pagina[-1]
+    return pagina, codificar_cursor(ultimo.nome, ultimo.id)
@@ -0,0 +1,60 @@
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
+
+
+class Projecao:
+    """Leitura de só alguns campos de uma entidade, para telas de listagem.
+
+    colunas mapeia o nome do atributo na entidade (nome, email...) para a
+    coluna ou expressão SQL que o preenche. Cada conjunto de campos vira
+    uma tupla nomeada (ex.: UsuarioResumo(id, nome)) com os mesmos nomes
+    de atributo da entidade, então o código de exibição lê os dois do
+    mesmo jeito; só não há métodos (salvar, excluir...), e quem precisar
+    deles busca a entidade completa pelo id, que vem sempre junto.
+    """
+
+    def __init__(self, entidade: str, colunas: dict[str, str],
+                 conversoes: Optional[dict[str, Callable[[Any], Any]]] = None):
+        self.entidade = entidade
+        self.colunas = colunas
+        self.conversoes = conversoes or {}
+
+    def preparar(self, campos: Iterable[str], prefixo: str = "") -> tuple[str, Callable[[dict], tuple]]:
+        """(lista de colunas para o SELECT, função que monta o resumo de uma linha).
+
+        Levanta ValueError para campos que a projeção não conhece.
+        """
+        campos = self.normalizar(campos)
+        selecao = ", ".join(f"{prefixo}{self.colunas[campo]} AS {campo}" for campo in campos)
+        tipo = self._tipo(campos)
+        conversoes = [(campo, self.conversoes.get(campo)) for campo in campos]
+
+        def montar(row: dict) -> tuple:
+            return tipo(*(converter(row[campo]) if converter and row[campo] is not None
+                          else row[campo] for campo, converter in conversoes))
+
+        return selecao, montar
+
+    def de_entidade(self, campos: Iterable[str], entidade: Any) -> tuple:
+        """Resumo a partir de uma entidade já carregada (ex.: do cache)"""
+        campos = self.normalizar(campos)
+        return self._tipo(campos)(*(getattr(entidade, campo) for campo in campos))
+
+    def normalizar(self, campos: Iterable[str]) -> tuple[str, ...]:
+        """Campos sem repetição, com id sempre primeiro"""
+
+        campos = tuple(dict.fromkeys(['id', *campos]))
+        invalidos = [c for c in campos if c not in self.colunas]
+        if invalidos:
+            raise ValueError(
+                f"Campos inválidos para {self.entidade}: {', '.join(invalidos)}")
+        return campos
+
+    def _tipo(self, campos: tuple[str, ...]):
+        return _tipo_resumo(f"{self.entidade}Resumo", campos)
+
+
+@lru_cache(maxsize=None)
+def _tipo_resumo(nome: str, campos: tuple[str, ...]):
+    return namedtuple(nome, campos)
@@ -1,45 +1,83 @@
-from datetime import datetime
-from typing import Optional, List
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Optional, List
 from enum import Enum
 
 
 class StatusReserva(Enum):
     ATIVA = "Ativa"
+    AGUARDANDO_RETIRADA = "AguardandoRetirada"
     ATENDIDA = "Atendida"
     CANCELADA = "Cancelada"
     EXPIRADA = "Expirada"
 
 
 class Reserva:
-    FILAS_POR_LIVRO = {}
+    """Reserva de um livro, na fila de espera persistida no banco.
+
+    A fila de cada livro é a ordem (Prioridade, Id) das reservas ativas,
+    lida pelo índice filtrado IX_Reserva_Fila: professores (prioridade 0)
+    passam à frente dos demais (prioridade 1) e, dentro de cada faixa, vale
+    a ordem de chegada. Entrar e sair da fila são um INSERT e um UPDATE no
+    índice, sem renumerar ninguém.
+
+    Quando um exemplar volta à prateleira, a cabeça da fila passa para
+    AguardandoRetirada: o exemplar fica separado (conta em
+    QuantidadeEmprestada), o usuário é avisado e tem até DataExpiracao
+    para retirá-lo; depois disso a reserva expira e o exemplar segue para
+    o próximo da fila. Reservas que passam PRAZO_FILA_DIAS na fila sem
+    serem atendidas também expiram (ver AgendadorExpiracoes).
+    """
+
+    PRIORIDADE_PROFESSOR = 0
+    PRIORIDADE_PADRAO = 1
+
+    # Prazo informado no aviso e prazo em que a reserva separada expira
+    PRAZO_RETIRADA_HORAS = 24
+    PRAZO_EXPIRACAO_HORAS = 48
+    # Tempo máximo de espera na fila antes de a reserva expirar
+    PRAZO_FILA_DIAS = 30
+
+    # Chamados com cada reserva que ganhou um prazo (entrou na fila ou foi
+    # separada para retirada)
+    _ouvintes: list[Callable[['Reserva'], None]] = []
+
+    _COLUNAS = "Id, UsuarioId, LivroId, DataReserva, Status, Prioridade, DataDisponibilidade, DataExpiracao"
 
     def __init__(self, usuario_id: int, livro_id: int,
                  data_reserva: Optional[datetime] = None,
                  status: StatusReserva = StatusReserva.ATIVA,
-                 id: Optional[int] = None):
+                 id: Optional[int] = None,
+                 prioridade: Optional[int] = None,
+                 data_disponibilidade: Optional[datetime] = None,
+                 data_expiracao: Optional[datetime] = None):
 
         self.id = id
         self.usuario_id = usuario_id
         self.livro_id = livro_id
         self.data_reserva = data_reserva or datetime.now()
         self.status = status
+        # None: definida pelo tipo do usuário ao entrar na fila
+        self.prioridade = prioridade
+        self.data_disponibilidade = data_disponibilidade
+        self.data_expiracao = data_expiracao
+
+    @property
+    def prazo(self) -> Optional[datetime]:
+        """Quando a reserva expira se nada acontecer; None se já encerrada"""
+        if self.status == StatusReserva.ATIVA:
+            return self.data_reserva + timedelta(days=Reserva.PRAZO_FILA_DIAS)
+        if self.status == StatusReserva.AGUARDANDO_RETIRADA:
+            return self.data_expiracao
+        return None
 
     def salvar(self) -> tuple[bool, str]:
         """Registra a reserva no banco de dados."""
-        try:
-            from Banco_de_dados.connection import DatabaseConnection
+        from Banco_de_dados.connection import DatabaseConnection
 
-            db = DatabaseConnection()
+        db = DatabaseConnection()
 
-            check_query = """
-                SELECT Id FROM Reserva
-                WHERE UsuarioId = ? AND LivroId = ? AND Status = 'Ativa'
-            """
-            existing = db.execute_query(
-                check_query, (self.usuario_id, self.livro_id))
-
-            if existing:
-                return False, "Usuário já possui uma reserva ativa para este livro"
+        try:
 
             if self.id:
 
@@ -55,89 +93,517 @@ class Reserva:
                     return False, "Erro ao atualizar reserva"
             else:
 
+                check_query = """
+                    SELECT Id FROM Reserva
+                    WHERE UsuarioId = ? AND LivroId = ? AND Status IN ('Ativa', 'AguardandoRetirada')
+                """
+                existing = db.execute_query(
+                    check_query, (self.usuario_id, self.livro_id))
+
+                if existing:
+                    return False, "Usuário já possui uma reserva ativa para este livro"
+
+                # A faixa de prioridade sai do tipo do usuário no próprio
+                # INSERT; o índice único filtrado barra uma segunda reserva
+                # ativa que passe pela checagem acima ao mesmo tempo
                 insert_query = """
-                    INSERT INTO Reserva (UsuarioId, LivroId, DataReserva, Status)
-                    VALUES (?, ?, ?, ?)
+                    INSERT INTO Reserva (UsuarioId, LivroId, DataReserva, Status, Prioridade)
+                    OUTPUT INSERTED.Id
+                    SELECT Id, ?, ?, ?,
+                           ISNULL(?, CASE WHEN TipoUsuario = 'Professor' THEN ? ELSE ? END)
+                    FROM Usuario WHERE Id = ?
                 """
-                if db.execute_non_query(
-                    insert_query,
-                    (self.usuario_id,
-                     self.livro_id,
-                     self.data_reserva,
-                     self.status.value)):
-
-                    id_query = "SELECT @@IDENTITY as NovoId"
-                    id_result = db.execute_query(id_query)
-                    if id_result and len(id_result) > 0:
-                        self.id = id_result[0].get('NovoId')
-                    return True, "Reserva registrada com sucesso"
-                else:
+                novo_id = db.execute_returning(insert_query, (
+                    self.livro_id,
+                    self.data_reserva,
+                    self.status.value,
+                    self.prioridade,
+                    Reserva.PRIORIDADE_PROFESSOR,
+                    Reserva.PRIORIDADE_PADRAO,
+                    self.usuario_id))
+
+                if novo_id is None:
                     return False, "Erro ao salvar reserva no banco"
 
+                self.id = int(novo_id)
+                if self.prioridade is None:
+                    self.prioridade = db.execute_scalar(
+                        "SELECT Prioridade FROM Reserva WHERE Id = ?", (self.id,))
+                Reserva._notificar([self])
+                return True, "Reserva registrada com sucesso"
+
         except Exception as e:
             return False, f"Erro ao processar reserva: {e}"
+        finally:
+            db.close()
 
     @staticmethod
     def proxima_para_livro(livro_id: int) -> Optional['Reserva']:
         """Retorna a próxima reserva ativa (primeiro da fila)."""
-        fila = Reserva.FILAS_POR_LIVRO.get(livro_id, [])
-        for reserva in fila:
-            if reserva.status == StatusReserva.ATIVA:
-                return reserva
-        return None
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            query = f"""
+                SELECT {Reserva._COLUNAS}
+                FROM Reserva
+                WHERE LivroId = ? AND Status = 'Ativa'
+                ORDER BY Prioridade, Id
+                OFFSET 0 ROWS FETCH NEXT 1 ROWS ONLY
+            """
+            result = db.execute_query(query, (livro_id,))
+            return Reserva._from_db_row(result[0]) if result else None
+
+        except Exception as e:
+            print(f"Erro ao buscar próxima reserva: {e}")
+            return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def retirar_proxima(livro_id: int) -> Optional['Reserva']:
+        """Tira o primeiro da fila, marcando a reserva como atendida.
+
+        O UPDATE escolhe e altera a cabeça da fila num só comando, então
+        duas retiradas simultâneas nunca atendem a mesma reserva.
+        """
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            query = """
+                UPDATE Reserva
+                SET Status = 'Atendida'
+                OUTPUT INSERTED.Id
+                WHERE Id = (SELECT Id FROM Reserva WITH (UPDLOCK, READPAST)
+                            WHERE LivroId = ? AND Status = 'Ativa'
+                            ORDER BY Prioridade, Id
+                            OFFSET 0 ROWS FETCH NEXT 1 ROWS ONLY)
+                  AND Status = 'Ativa'
+            """
+            reserva_id = db.execute_returning(query, (livro_id,))
+            if reserva_id is None:
+                return None
+
+            result = db.execute_query(
+                f"SELECT {Reserva._COLUNAS} FROM Reserva WHERE Id = ?", (reserva_id,))
+            return Reserva._from_db_row(result[0]) if result else None
+
+        except Exception as e:
+            print(f"Erro ao retirar reserva da fila: {e}")
+            return None
+        finally:
+            db.close()
+
+    def posicao_na_fila(self) -> int:
+        """1 para o primeiro da fila; 0 se a reserva não está ativa"""
+        from Banco_de_dados.connection import DatabaseConnection
+
+        if not self.id or self.status != StatusReserva.ATIVA or self.prioridade is None:
+            return 0
+
+        db = DatabaseConnection()
+
+        try:
+            query = """
+                SELECT COUNT(*) FROM Reserva
+                WHERE LivroId = ? AND Status = 'Ativa'
+                  AND (Prioridade < ? OR (Prioridade = ? AND Id < ?))
+            """
+            antes = db.execute_scalar(
+                query, (self.livro_id, self.prioridade, self.prioridade, self.id))
+            return (antes or 0) + 1
+
+        except Exception as e:
+            print(f"Erro ao calcular posição na fila: {e}")
+            return 0
+        finally:
+            db.close()
 
     def cancelar(self) -> tuple[bool, str]:
-        """Cancela uma reserva ativa."""
+        """Cancela uma reserva ativa ou já separada para retirada; neste
+        caso o exemplar passa para o próximo da fila."""
+        if self.status == StatusReserva.AGUARDANDO_RETIRADA:
+            return self._liberar_retirada()
+
         if self.status != StatusReserva.ATIVA:
             return False, "Reserva não está ativa"
-        self.status = StatusReserva.CANCELADA
-        return True, "Reserva cancelada com sucesso"
+
+        sucesso, mensagem = self._sair_da_fila(StatusReserva.CANCELADA)
+        return (True, "Reserva cancelada com sucesso") if sucesso else (False, mensagem)
+
+    def _liberar_retirada(self) -> tuple[bool, str]:
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            with db.transaction():
+                if not db.execute_rowcount(
+                        """UPDATE Reserva SET Status = 'Cancelada'
+                           WHERE Id = ? AND Status = 'AguardandoRetirada'""",
+                        (self.id,)):
+                    return False, "Reserva não está mais separada no banco"
+
+                Reserva._devolver_exemplares(db, {self.livro_id: 1})
+                Reserva.promover_fila(db, {self.livro_id: 1})
+
+            self.status = StatusReserva.CANCELADA
+            return True, "Reserva cancelada com sucesso"
+
+        except Exception as e:
+            return False, f"Erro ao cancelar reserva: {e}"
+        finally:
+            db.close()
+
+    @staticmethod
+    def promover_fila(db, exemplares: dict[int, int],
+                      agora: Optional[datetime] = None) -> list['Reserva']:
+        """Separa exemplares que acabaram de voltar à prateleira para os
+        primeiros da fila de cada livro.
+
+        exemplares mapeia livro_id -> exemplares liberados. Roda dentro da
+        transação de quem liberou (devolução, expiração, cancelamento): cada
+        livro é promovido num UPDATE que devolve as reservas afetadas, o contador
+        QuantidadeEmprestada volta a reter os exemplares separados e os
+        avisos entram em lote. Devolve as reservas promovidas.
+        """
+        from Backend.Notificacao import Notificacao
+
+        exemplares = {livro: n for livro, n in exemplares.items() if n > 0}
+        if not exemplares:
+            return []
+
+        agora = agora or datetime.now()
+        expira_em = agora + timedelta(hours=Reserva.PRAZO_EXPIRACAO_HORAS)
+        livros = list(exemplares)
+        marcadores = ', '.join('?' * len(livros))
+
+        # Quantos esperam em cada livro limita quantos exemplares ficam retidos
+        na_fila = {
+            row['LivroId']: row['Total'] for row in db.execute_query(
+                f"""SELECT LivroId, COUNT(*) as Total FROM Reserva WITH (UPDLOCK, HOLDLOCK)
+                    WHERE Status = 'Ativa' AND LivroId IN ({marcadores})
+                    GROUP BY LivroId""", tuple(livros)) or []
+        }
+        promocoes = {livro: min(n, na_fila.get(livro, 0)) for livro, n in exemplares.items()}
+        promocoes = {livro: n for livro, n in promocoes.items() if n > 0}
+        if not promocoes:
+            return []
+
+        # Um UPDATE por livro, com OUTPUT: as reservas promovidas saem do
+        # próprio comando, sem reler a tabela
+        linhas = []
+        for livro, n in promocoes.items():
+            linhas.extend(db.execute_query(
+                """UPDATE Reserva
+                   SET Status = 'AguardandoRetirada', DataDisponibilidade = ?, DataExpiracao = ?
+                   OUTPUT INSERTED.Id, INSERTED.UsuarioId, INSERTED.LivroId,
+                          INSERTED.DataReserva, INSERTED.Prioridade
+                   WHERE Id IN (SELECT Id FROM Reserva
+                                WHERE LivroId = ? AND Status = 'Ativa'
+                                ORDER BY Prioridade, Id
+                                OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY)""",
+                (agora, expira_em, livro, n)) or [])
+        if not linhas:
+            return []
+
+        retidos = Counter(row['LivroId'] for row in linhas)
+        db.execute_many(
+            "UPDATE Livro SET QuantidadeEmprestada = QuantidadeEmprestada + ? WHERE Id = ?",
+            [(n, livro) for livro, n in retidos.items()])
+
+        marcadores = ', '.join('?' * len(retidos))
+        nomes = {
+            row['Id']: row['Nome'] for row in db.execute_query(
+                f"SELECT Id, Nome FROM Livro WHERE Id IN ({marcadores})",
+                tuple(retidos)) or []
+        }
+
+        promovidas = [Reserva._from_db_row({**row, 'Status': 'AguardandoRetirada',
+                                            'DataDisponibilidade': agora,
+                                            'DataExpiracao': expira_em})
+                      for row in linhas]
+        Notificacao.inserir_em_lote(db, [
+            Reserva._aviso_disponivel(reserva, nomes.get(reserva.livro_id, ''))
+            for reserva in promovidas])
+        # Ainda dentro da transação: se ela for desfeita, o prazo agendado
+        # só encontra a reserva em outro estado e não expira nada
+        Reserva._notificar(promovidas)
+        return promovidas
+
+    @staticmethod
+    def _devolver_exemplares(db, exemplares: dict[int, int]) -> None:
+        """Tira do contador de emprestados os exemplares que deixaram de
+        estar separados"""
+        db.execute_many(
+            "UPDATE Livro SET QuantidadeEmprestada = QuantidadeEmprestada - ? WHERE Id = ?",
+            [(n, livro) for livro, n in exemplares.items() if n > 0])
+
+    @staticmethod
+    def _aviso_disponivel(reserva: 'Reserva', livro_nome: str):
+        from Backend.Notificacao import Notificacao, TipoNotificacao
+
+        mensagem = (f"O livro '{livro_nome}' que você reservou está separado para você. "
+                    f"Retire em até {Reserva.PRAZO_RETIRADA_HORAS} horas; sem retirada, "
+                    f"a reserva expira em {reserva.data_expiracao:%d/%m/%Y %H:%M}.")
+        return Notificacao(
+            usuario_id=reserva.usuario_id,
+            tipo=TipoNotificacao.RESERVA,
+            titulo=f"📦 Livro Disponível: {livro_nome}"[:100],
+            mensagem=mensagem[:1000],
+            data_criacao=reserva.data_disponibilidade,
+            livro_id=reserva.livro_id,
+            chave=f"reserva:{reserva.id}:disponivel")
+
+    @staticmethod
+    def expirar_retiradas_vencidas(agora: Optional[datetime] = None) -> tuple[int, int]:
+        """Expira de uma vez as reservas separadas cujo prazo de retirada
+        passou e repassa os exemplares aos próximos das filas.
+
+        Devolve (reservas expiradas, reservas promovidas).
+        """
+        from Banco_de_dados.connection import DatabaseConnection
+
+        agora = agora or datetime.now()
+        db = DatabaseConnection()
+
+        try:
+            with db.transaction():
+                vencidas = {
+                    row['LivroId']: row['Total'] for row in db.execute_query(
+                        """SELECT LivroId, COUNT(*) as Total FROM Reserva WITH (UPDLOCK, HOLDLOCK)
+                           WHERE Status = 'AguardandoRetirada' AND DataExpiracao <= ?
+                           GROUP BY LivroId""", (agora,)) or []
+                }
+                if not vencidas:
+                    return 0, 0
+
+                expiradas = db.execute_rowcount(
+                    """UPDATE Reserva SET Status = 'Expirada'
+                       WHERE Status = 'AguardandoRetirada' AND DataExpiracao <= ?""",
+                    (agora,))
+                Reserva._devolver_exemplares(db, vencidas)
+                promovidas = Reserva.promover_fila(db, vencidas, agora)
+
+            return expiradas, len(promovidas)
+
+        except Exception as e:
+            print(f"Erro ao expirar reservas: {e}")
+            return 0, 0
+        finally:
+            db.close()
+
+    @staticmethod
+    def expirar_reservas_vencidas(agora: Optional[datetime] = None) -> int:
+        """Expira de uma vez as reservas que passaram PRAZO_FILA_DIAS na
+        fila. Nenhum exemplar estava retido por elas, então o estoque não
+        muda."""
+        from Banco_de_dados.connection import DatabaseConnection
+
+        limite = (agora or datetime.now()) - timedelta(days=Reserva.PRAZO_FILA_DIAS)
+        db = DatabaseConnection()
+
+        try:
+            return db.execute_rowcount(
+                """UPDATE Reserva SET Status = 'Expirada'
+                   WHERE Status = 'Ativa' AND DataReserva <= ?""",
+                (limite,))
+
+        except Exception as e:
+            print(f"Erro ao expirar reservas da fila: {e}")
+            return 0
+        finally:
+            db.close()
+
+    @staticmethod
+    def proximos_prazos(limite: int) -> tuple[list[tuple[datetime, int]], Optional[datetime]]:
+        """Os prazos mais próximos das reservas pendentes, como (prazo, id).
+
+        Lê no máximo limite reservas da fila e limite retiradas, cada uma
+        pelo seu índice filtrado (IX_Reserva_Ativa_Data e
+        IX_Reserva_Expiracao). O segundo valor é o horizonte: até ele a
+        lista está completa; None se nenhuma reserva ficou de fora.
+        """
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            ativas = db.execute_query(
+                """SELECT Id, DataReserva FROM Reserva
+                   WHERE Status = 'Ativa'
+                   ORDER BY DataReserva
+                   OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY""", (limite,)) or []
+            retiradas = db.execute_query(
+                """SELECT Id, DataExpiracao FROM Reserva
+                   WHERE Status = 'AguardandoRetirada'
+                   ORDER BY DataExpiracao
+                   OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY""", (limite,)) or []
+
+            espera = timedelta(days=Reserva.PRAZO_FILA_DIAS)
+            prazos_fila = [(row['DataReserva'] + espera, row['Id']) for row in ativas]
+            prazos_retirada = [(row['DataExpiracao'], row['Id']) for row in retiradas]
+
+            # Uma lista cheia pode ter deixado reservas de fora depois do
+            # seu último prazo
+            cortes = [prazos[-1][0] for prazos in (prazos_fila, prazos_retirada)
+                      if len(prazos) >= limite]
+            return prazos_fila + prazos_retirada, min(cortes) if cortes else None
+
+        finally:
+            db.close()
+
+    @staticmethod
+    def registrar_ouvinte(ouvinte: Callable[['Reserva'], None]) -> None:
+        if ouvinte not in Reserva._ouvintes:
+            Reserva._ouvintes.append(ouvinte)
+
+    @staticmethod
+    def remover_ouvinte(ouvinte: Callable[['Reserva'], None]) -> None:
+        if ouvinte in Reserva._ouvintes:
+            Reserva._ouvintes.remove(ouvinte)
+
+    @staticmethod
+    def _notificar(reservas: list['Reserva']) -> None:
+
+        for ouvinte in list(Reserva._ouvintes):
+            for reserva in reservas:
+                try:
+                    ouvinte(reserva)
+                except Exception as e:
+                    print(f"✗ Erro no ouvinte de reservas: {e}")
+
+    @staticmethod
+    def livros_aguardando_retirada(usuario_id: int) -> set[int]:
+        """Livros separados para o usuário retirar"""
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            result = db.execute_query(
+                """SELECT LivroId FROM Reserva
+                   WHERE UsuarioId = ? AND Status = 'AguardandoRetirada'""",
+                (usuario_id,))
+            return {row['LivroId'] for row in result or []}
+
+        except Exception as e:
+            print(f"Erro ao buscar reservas separadas: {e}")
+            return set()
+        finally:
+            db.close()
+
+    @staticmethod
+    def contar_separados_por_livro(livro_id: int) -> int:
+        """Exemplares do livro separados aguardando retirada"""
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            return db.execute_scalar(
+                """SELECT COUNT(*) FROM Reserva
+                   WHERE LivroId = ? AND Status = 'AguardandoRetirada'""",
+                (livro_id,)) or 0
+
+        except Exception as e:
+            print(f"Erro ao contar reservas separadas do livro {livro_id}: {e}")
+            return 0
+        finally:
+            db.close()
 
     def marcar_atendida(self) -> tuple[bool, str]:
         """Marca a reserva como atendida (quando o livro é emprestado ao usuário)."""
         if self.status != StatusReserva.ATIVA:
             return False, "Reserva não está ativa"
-        self.status = StatusReserva.ATENDIDA
-        return True, "Reserva atendida com sucesso"
+
+        sucesso, mensagem = self._sair_da_fila(StatusReserva.ATENDIDA)
+        return (True, "Reserva atendida com sucesso") if sucesso else (False, mensagem)
+
+    def _sair_da_fila(self, status: StatusReserva) -> tuple[bool, str]:
+        from Banco_de_dados.connection import DatabaseConnection
+
+        if not self.id:
+            self.status = status
+            return True, "Reserva atualizada"
+
+        db = DatabaseConnection()
+
+        try:
+            query = "UPDATE Reserva SET Status = ? WHERE Id = ? AND Status = 'Ativa'"
+            if db.execute_rowcount(query, (status.value, self.id)):
+                self.status = status
+                return True, "Reserva atualizada"
+            return False, "Reserva não está mais ativa no banco"
+
+        except Exception as e:
+            return False, f"Erro ao atualizar reserva: {e}"
+        finally:
+            db.close()
 
     @staticmethod
     def listar_por_livro(livro_id: int) -> List['Reserva']:
         """Lista todas as reservas (ativas, canceladas ou atendidas) de um livro."""
-        return Reserva.FILAS_POR_LIVRO.get(livro_id, [])
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            query = f"""
+                SELECT {Reserva._COLUNAS}
+                FROM Reserva
+                WHERE LivroId = ?
+                ORDER BY DataReserva ASC, Id ASC
+            """
+            result = db.execute_query(query, (livro_id,))
+            return [Reserva._from_db_row(row) for row in result or []]
+
+        except Exception as e:
+            print(f"Erro ao listar reservas do livro: {e}")
+            return []
+        finally:
+            db.close()
 
     @staticmethod
     def listar_ativas(livro_id: int) -> List['Reserva']:
-        """Lista apenas as reservas ativas do livro."""
-        try:
-            from Banco_de_dados.connection import DatabaseConnection
+        """Lista apenas as reservas ativas do livro, na ordem da fila."""
+        from Banco_de_dados.connection import DatabaseConnection
 
-            db = DatabaseConnection()
-            query = """
-                SELECT Id, UsuarioId, LivroId, DataReserva, Status
+        db = DatabaseConnection()
+
+        try:
+            query = f"""
+                SELECT {Reserva._COLUNAS}
                 FROM Reserva
                 WHERE LivroId = ? AND Status = 'Ativa'
-                ORDER BY DataReserva ASC
+                ORDER BY Prioridade, Id
             """
 
             result = db.execute_query(query, (livro_id,))
-            reservas = []
-
-            if result:
-                for row in result:
-                    reserva = Reserva(
-                        usuario_id=row['UsuarioId'],
-                        livro_id=row['LivroId'],
-                        data_reserva=row['DataReserva'],
-                        status=StatusReserva.ATIVA,
-                        id=row['Id']
-                    )
-                    reservas.append(reserva)
-
-            return reservas
+            return [Reserva._from_db_row(row) for row in result or []]
 
         except Exception as e:
             print(f"Erro ao listar reservas ativas: {e}")
             return []
+        finally:
+            db.close()
+
+    @staticmethod
+    def _from_db_row(row: dict) -> 'Reserva':
+
+        return Reserva(
+            usuario_id=row['UsuarioId'],
+            livro_id=row['LivroId'],
+            data_reserva=row['DataReserva'],
+            status=StatusReserva(row['Status']),
+            id=row['Id'],
+            prioridade=row['Prioridade'],
+            data_disponibilidade=row.get('DataDisponibilidade'),
+            data_expiracao=row.get('DataExpiracao')
+        )
 
     def __repr__(self):
         return f"Reserva(usuario={self.usuario_id}, livro={self.livro_id}, status={self.status.value})"
@@ -0,0 +1,152 @@
+"""Hash de senhas com sal por usuário e custo configurável.
+
+Formato gravado na coluna Senha (o identificador após o primeiro $ é a
+versão do formato):
+
+    $scrypt$n=16384,r=8,p=1$<sal>$<hash>
+    $pbkdf2-sha256$i=600000$<sal>$<hash>
+
+com sal e hash em base64. Senhas antigas (MD5 sem sal, 32 dígitos hex)
+continuam sendo aceitas e são regravadas no formato atual no próximo login
+(ver Usuario.autenticar). O custo vem do ambiente/.env:
+
+    SENHA_ALGORITMO=scrypt      # scrypt (padrão) ou pbkdf2-sha256
+    SENHA_SCRYPT_N=16384        # potência de 2; dobra tempo e memória
+    SENHA_SCRYPT_R=8
+    SENHA_SCRYPT_P=1
+    SENHA_PBKDF2_ITERACOES=600000
+
+Benchmarks/bench_senhas.py mede quanto cada custo leva por login.
+"""
+import base64
+import hashlib
+import hmac
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+SCRYPT = 'scrypt'
+PBKDF2 = 'pbkdf2-sha256'
+MD5 = 'md5'
+
+TAMANHO_SAL = 16
+TAMANHO_HASH = 32
+
+_CHAVES = {
+    SCRYPT: {'algoritmo', 'n', 'r', 'p'},
+    PBKDF2: {'algoritmo', 'i'},
+}
+
+
+def parametros_configurados() -> dict:
+    """Algoritmo e custo usados para gerar hashes novos"""
+
+    algoritmo = os.getenv('SENHA_ALGORITMO', SCRYPT).strip().lower()
+    if algoritmo == SCRYPT and not hasattr(hashlib, 'scrypt'):
+        # Python compilado com OpenSSL sem scrypt
+        algoritmo = PBKDF2
+
+    if algoritmo == SCRYPT:
+        return {
+            'algoritmo': SCRYPT,
+            'n': int(os.getenv('SENHA_SCRYPT_N', '16384')),
+            'r': int(os.getenv('SENHA_SCRYPT_R', '8')),
+            'p': int(os.getenv('SENHA_SCRYPT_P', '1')),
+        }
+    if algoritmo in (PBKDF2, 'pbkdf2'):
+        return {
+            'algoritmo': PBKDF2,
+            'i': int(os.getenv('SENHA_PBKDF2_ITERACOES', '600000')),
+        }
+    raise ValueError(f"SENHA_ALGORITMO desconhecido: {algoritmo!r}")
+
+
+def gerar_hash(senha: str, parametros: Optional[dict] = None) -> str:
+    """Hash da senha com sal novo, no formato versionado"""
+
+    parametros = parametros or parametros_configurados()
+    sal = os.urandom(TAMANHO_SAL)
+    derivado = _derivar(senha, sal, parametros)
+    custo = ','.join(f"{chave}={valor}" for chave, valor in parametros.items()
+                     if chave != 'algoritmo')
+    return f"${parametros['algoritmo']}${custo}${_b64(sal)}${_b64(derivado)}"
+
+
+def verificar_senha(senha: str, hash_senha: str) -> bool:
+    """Se senha corresponde ao hash gravado (qualquer formato aceito)"""
+
+    lido = _ler_hash(hash_senha)
+    if lido is None:
+        return False
+
+    parametros, sal, esperado = lido
+    if parametros['algoritmo'] == MD5:
+        calculado = hashlib.md5(senha.encode()).hexdigest().encode()
+    else:
+        calculado = _derivar(senha, sal, parametros)
+    return hmac.compare_digest(calculado, esperado)
+
+
+def precisa_rehash(hash_senha: str, parametros: Optional[dict] = None) -> bool:
+    """Se o hash foi gerado com algoritmo ou custo diferente do atual"""
+
+    lido = _ler_hash(hash_senha)
+    if lido is None:
+        return True
+    return lido[0] != (parametros or parametros_configurados())
+
+
+def eh_hash(valor: str) -> bool:
+    """Se valor já é um hash (e não uma senha em texto)"""
+    return _ler_hash(valor) is not None
+
+
+def _derivar(senha: str, sal: bytes, parametros: dict) -> bytes:
+
+    if parametros['algoritmo'] == SCRYPT:
+        n, r, p = parametros['n'], parametros['r'], parametros['p']
+        # O padrão do OpenSSL (32 MiB) não comporta n acima de 2**14
+        return hashlib.scrypt(senha.encode(), salt=sal, n=n, r=r, p=p,
+                              maxmem=256 * r * n * p + 1024 * 1024,
+                              dklen=TAMANHO_HASH)
+    if parametros['algoritmo'] == PBKDF2:
+        return hashlib.pbkdf2_hmac('sha256', senha.encode(), sal, parametros['i'],
+                                   dklen=TAMANHO_HASH)
+    raise ValueError(f"Algoritmo de senha desconhecido: {parametros['algoritmo']!r}")
+
+
+def _ler_hash(valor: str) -> Optional[tuple[dict, bytes, bytes]]:
+    """(parâmetros, sal, hash) de um valor gravado; None se não for hash"""
+
+    if not valor:
+        return None
+
+    if len(valor) == 32 and all(c in '0123456789abcdef' for c in valor.lower()):
+        return {'algoritmo': MD5}, b"", valor.lower().encode()
+
+    partes = valor.split('$')
+    if len(partes) != 5 or partes[0] != '' or partes[1] not in (SCRYPT, PBKDF2):
+        return None
+
+    try:
+        parametros: dict = {'algoritmo': partes[1]}
+        for item in partes[2].split(','):
+            chave, numero = item.split('=')
+            parametros[chave] = int(numero)
+        if set(parametros) != _CHAVES[partes[1]]:
+            return None
+        return parametros, _de_b64(partes[3]), _de_b64(partes[4])
+    except ValueError:
+        return None
+
+
+def _b64(dados: bytes) -> str:
+    return base64.b64encode(dados).decode().rstrip('=')
+
+
+def _de_b64(texto: str) -> bytes:
+    return base64.b64decode(texto + '=' * (-len(texto) % 4))
@@ -1,11 +1,42 @@
 from datetime import datetime
-from typing import Optional
-import hashlib
+from typing import Callable, Iterable, Optional
 from abc import ABC, abstractmethod
 
+from Backend import Senhas
+from Backend.CacheEntidades import CacheEntidades
+from Backend.Projecao import Projecao
+
+
+def criptografar_senha(senha: str) -> str:
+    """Hash gravado na coluna Senha (função de módulo para poder rodar em
+    outro processo na matrícula em lote)"""
+    return Senhas.gerar_hash(senha)
+
 
 class Usuario(ABC):
 
+    # buscar_por_id/buscar_por_email; invalidado ao atualizar, inativar e ativar
+    _cache = CacheEntidades('Usuario')
+
+    # Colunas lidas por buscar_*/listar_* e pelo login
+    _COLUNAS = ("Id, Nome, Email, Senha, TipoUsuario, Matricula, Curso, Departamento, "
+                "Ativo, DataCadastro, DataAtualizacao")
+
+    # Campos aceitos em campos= pelos buscar_*/listar_*; a senha fica de
+    # fora de propósito, só a entidade completa a carrega
+    _projecao = Projecao('Usuario', {
+        'id': 'Id',
+        'nome': 'Nome',
+        'email': 'Email',
+        'tipo_usuario': 'TipoUsuario',
+        'matricula': 'Matricula',
+        'curso': 'Curso',
+        'departamento': 'Departamento',
+        'ativo': 'Ativo',
+        'data_cadastro': 'DataCadastro',
+        'data_atualizacao': 'DataAtualizacao',
+    }, conversoes={'ativo': bool})
+
     def __init__(
         self, nome: str, email: str, senha: str, id: Optional[int] = None,
         ativo: bool = True, data_cadastro: Optional[datetime] = None,
@@ -98,15 +129,35 @@ class Usuario(ABC):
         return getattr(self, '_departamento', None)
 
     def _criptografar_senha(self, senha: str) -> str:
-        return hashlib.md5(senha.encode()).hexdigest()
+        return criptografar_senha(senha)
 
     def _eh_senha_criptografada(self, senha: str) -> bool:
-        return len(senha) == 32 and all(
-            c in '0123456789abcdef' for c in senha.lower())
+        return Senhas.eh_hash(senha)
 
     def verificar_senha(self, senha: str) -> bool:
-        senha_criptografada = self._criptografar_senha(senha)
-        return senha_criptografada == self.senha
+        return Senhas.verificar_senha(senha, self.senha)
+
+    @staticmethod
+    def _regravar_senha(usuario_id: int, senha: str, hash_atual: str) -> Optional[str]:
+        """Troca o hash gravado por um no formato/custo atual (senha já
+        conferida) e devolve o novo. O UPDATE só vale se ninguém trocou a
+        senha no meio."""
+        from Banco_de_dados.connection import DatabaseConnection
+
+        novo_hash = criptografar_senha(senha)
+        db = DatabaseConnection()
+
+        try:
+            if db.execute_rowcount(
+                    "UPDATE Usuario SET Senha = ? WHERE Id = ? AND Senha = ?",
+                    (novo_hash, usuario_id, hash_atual)):
+                Usuario._cache.invalidar(usuario_id)
+                return novo_hash
+
+        except Exception as e:
+            print(f"✗ Erro ao atualizar hash da senha: {e}")
+        finally:
+            db.close()
 
     def __str__(self) -> str:
         return f"Usuario(id={self.id}, nome='{self.nome}', tipo='{self.tipo_usuario}')"
@@ -144,10 +195,13 @@ class Usuario(ABC):
 
         db = DatabaseConnection()
 
-        if self.id is None:
-            return self._inserir(db)
-        else:
-            return self._atualizar(db)
+        try:
+            if self.id is None:
+                return self._inserir(db)
+            else:
+                return self._atualizar(db)
+        finally:
+            db.close()
 
     def _inserir(self, db) -> tuple[bool, str]:
         if self._email_existe(db, self.email):
@@ -183,16 +237,17 @@ class Usuario(ABC):
         if not self._existe_por_id(db, self.id):
             return False, f"Usuário com ID {self.id} não encontrado"
 
-        usuario_existente = self.buscar_por_email(self.email)
+        usuario_existente = self.buscar_por_email(self.email, campos=())
         if usuario_existente and usuario_existente.id != self.id:
             return False, f"Email {self.email} já está sendo usado por outro usuário"
 
         try:
             dados = self.obter_dados_para_banco()
-            query = "UPDATE Usuario SET Nome = ?, Email = ?, TipoUsuario = ?, Matricula = ?, Curso = ?, Departamento = ? WHERE Id = ?"
+            query = "UPDATE Usuario SET Nome = ?, Email = ?, Senha = ?, TipoUsuario = ?, Matricula = ?, Curso = ?, Departamento = ? WHERE Id = ?"
             params = (
                 dados['nome'],
                 dados['email'],
+                dados['senha'],
                 dados['tipo_usuario'],
                 dados.get('matricula'),
                 dados.get('curso'),
@@ -200,6 +255,7 @@ class Usuario(ABC):
                 self.id)
 
             if db.execute_non_query(query, params):
+                Usuario._cache.invalidar(self.id)
                 mensagem = f"Usuário '{self.nome}' atualizado com sucesso!"
                 return True, mensagem
             else:
@@ -221,12 +277,15 @@ class Usuario(ABC):
             query = "UPDATE Usuario SET Ativo = 0 WHERE Id = ?"
             if db.execute_non_query(query, (self.id,)):
                 self.ativo = False
+                Usuario._cache.invalidar(self.id)
                 return True, f"Usuário '{self.nome}' inativado com sucesso!"
             else:
                 return False, f"Falha ao inativar usuário '{self.nome}'"
 
         except Exception as e:
             return False, f"Erro ao inativar usuário: {e}"
+        finally:
+            db.close()
 
     def ativar(self) -> tuple[bool, str]:
         """Ativa o usuário"""
@@ -241,95 +300,269 @@ class Usuario(ABC):
             query = "UPDATE Usuario SET Ativo = 1 WHERE Id = ?"
             if db.execute_non_query(query, (self.id,)):
                 self.ativo = True
+                Usuario._cache.invalidar(self.id)
                 return True, f"Usuário '{self.nome}' ativado com sucesso!"
             else:
                 return False, f"Falha ao ativar usuário '{self.nome}'"
 
         except Exception as e:
             return False, f"Erro ao ativar usuário: {e}"
+        finally:
+            db.close()
 
     @staticmethod
     def autenticar(email: str,
                    senha: str) -> tuple[bool,
                                         Optional['Usuario'],
                                         str]:
-        usuario = Usuario.buscar_por_email(email)
+        """Confere email e senha e devolve o usuário completo.
+
+        Senha e Ativo vêm de uma leitura própria, sem o cache, para não
+        aceitar uma senha trocada ou um usuário inativado há pouco; o
+        usuário completo só é carregado depois que a senha confere.
+        """
+        credenciais = Usuario._credenciais(email)
 
-        if not usuario:
+        if not credenciais:
             return False, None, "Email não encontrado"
 
-        if not usuario.ativo:
+        if not credenciais['Ativo']:
             return False, None, "Usuário inativo"
 
-        if not usuario.verificar_senha(senha):
+        hash_senha = credenciais['Senha']
+        if not Senhas.verificar_senha(senha, hash_senha):
             return False, None, "Senha incorreta"
 
+        # Hash legado (MD5) ou de custo antigo: regrava com a senha que
+        # acabou de ser conferida
+        if Senhas.precisa_rehash(hash_senha):
+            hash_senha = Usuario._regravar_senha(
+                credenciais['Id'], senha, hash_senha) or hash_senha
+
+        usuario = Usuario.buscar_por_id(credenciais['Id'])
+        if usuario is not None and (usuario.senha != hash_senha
+                                    or usuario.tipo_usuario != credenciais['TipoUsuario']):
+            # Cópia do cache anterior a uma alteração feita em outra estação
+            Usuario._cache.invalidar(usuario.id)
+            usuario = Usuario.buscar_por_id(credenciais['Id'])
+
+        if usuario is None:
+            return False, None, "Email não encontrado"
+
         return True, usuario, "Login realizado com sucesso"
 
+    @staticmethod
+    def _credenciais(email: str) -> Optional[dict]:
+        """Id, Senha, Ativo e TipoUsuario lidos direto do banco (sem cache)"""
+        from Banco_de_dados.connection import DatabaseConnection
+
+        db = DatabaseConnection()
+
+        try:
+            resultados = db.execute_query(
+                "SELECT Id, Senha, Ativo, TipoUsuario FROM Usuario WHERE Email = ?",
+                (email,))
+            return resultados[0] if resultados else None
+
+        except Exception as e:
+            print(f"✗ Erro ao buscar credenciais: {e}")
+            return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def matricular_em_lote(
+            registros: Iterable[dict],
+            tamanho_lote: int = 1000,
+            processos: Optional[int] = None,
+            ao_progresso: Optional[Callable] = None):
+        """Cadastra alunos/professores a partir de dicts com nome, email,
+        senha, tipo_usuario, matricula e curso ou departamento.
+
+        Devolve o ResultadoImportacao com os totais e os erros por registro
+        (numerados a partir de 1). Detalhes em Backend/ImportacaoUsuarios.py.
+        """
+        from Backend.ImportacaoUsuarios import importar_usuarios
+
+        numerados = ((numero, dados, None) for numero, dados in enumerate(registros, start=1))
+        return importar_usuarios(
+            numerados, tamanho_lote=tamanho_lote,
+            processos=processos, ao_progresso=ao_progresso)
+
     @staticmethod
     def listar_todos(
             limite: int = 100,
-            incluir_inativos: bool = False) -> list['Usuario']:
+            incluir_inativos: bool = False,
+            campos: Optional[Iterable[str]] = None) -> list:
+        """Usuários em ordem de nome; com campos, resumos só com esses
+        campos (e o id) em vez de objetos Usuario"""
         from Banco_de_dados.connection import DatabaseConnection
 
+        colunas, montar = Usuario._leitura(campos)
         db = DatabaseConnection()
 
         try:
             if incluir_inativos:
-                query = "SELECT * FROM Usuario ORDER BY Nome OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
+                query = f"SELECT {colunas} FROM Usuario ORDER BY Nome OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
                 params = (limite,)
             else:
-                query = "SELECT * FROM Usuario WHERE Ativo = 1 ORDER BY Nome OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
+                query = f"SELECT {colunas} FROM Usuario WHERE Ativo = 1 ORDER BY Nome OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
                 params = (limite,)
 
             resultados = db.execute_query(query, params)
 
             if resultados:
-                return [Usuario._from_db_row(row) for row in resultados]
+                return [montar(row) for row in resultados]
             else:
                 return []
 
         except Exception as e:
             print(f"✗ Erro ao listar usuários: {e}")
             return []
+        finally:
+            db.close()
 
     @staticmethod
-    def buscar_por_email(email: str) -> Optional['Usuario']:
+    def listar_pagina(
+            cursor: Optional[str] = None,
+            limite: int = 50,
+            incluir_inativos: bool = False,
+            tipo_usuario: Optional[str] = None,
+            campos: Optional[Iterable[str]] = None,
+            matricula: Optional[str] = None) -> tuple[list, Optional[str]]:
+        """Página de usuários em ordem de nome e o cursor da próxima (None no fim).
+
+        matricula filtra pelas matrículas que contêm o texto; o filtro vai
+        para o WHERE, então o cursor percorre só os usuários filtrados.
+        Com campos, a página traz resumos só com esses campos (mais id e
+        nome, usados pelo cursor). Levanta ValueError se o cursor não veio
+        de uma chamada anterior.
+        """
+        from Backend.Paginacao import FILTRO_APOS_CURSOR, fechar_pagina, parametros_cursor
         from Banco_de_dados.connection import DatabaseConnection
 
+        cursor_params = parametros_cursor(cursor)
+        if campos is not None:
+            campos = ['nome', *campos]
+        colunas, montar = Usuario._leitura(campos)
+
+        filtros = []
+        params: tuple = ()
+        if not incluir_inativos:
+            filtros.append("Ativo = 1")
+        if tipo_usuario:
+            filtros.append("TipoUsuario = ?")
+            params += (tipo_usuario,)
+        if matricula:
+            filtros.append("Matricula LIKE ?")
+            params += (f"%{matricula}%",)
+        if cursor_params:
+            filtros.append(FILTRO_APOS_CURSOR)
+            params += cursor_params
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+
         db = DatabaseConnection()
 
         try:
-            query = "SELECT * FROM Usuario WHERE Email = ?"
+            query = f"""
+            SELECT {colunas} FROM Usuario
+            {where}
+            ORDER BY Nome, Id
+            OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+            """
+
+            resultados = db.execute_query(query, params + (limite + 1,))
+            usuarios = [montar(row) for row in resultados or []]
+            return fechar_pagina(usuarios, limite)
+
+        except Exception as e:
+            print(f"✗ Erro ao listar página de usuários: {e}")
+            return [], None
+        finally:
+            db.close()
+
+    @staticmethod
+    def buscar_por_email(email: str, campos: Optional[Iterable[str]] = None):
+        """Usuário completo ou, com campos, um resumo só com esses campos"""
+        from Banco_de_dados.connection import DatabaseConnection
+
+        usuario = Usuario._cache.obter(('email', email))
+        if usuario is not None:
+            return usuario if campos is None else Usuario._projecao.de_entidade(campos, usuario)
+
+        colunas, montar = Usuario._leitura(campos)
+        db = DatabaseConnection()
+
+        try:
+            query = f"SELECT {colunas} FROM Usuario WHERE Email = ?"
             resultados = db.execute_query(query, (email,))
 
             if resultados:
-                return Usuario._from_db_row(resultados[0])
+                if campos is not None:
+                    return montar(resultados[0])
+                usuario = montar(resultados[0])
+                Usuario._guardar_no_cache(usuario)
+                return usuario
             else:
                 return None
 
         except Exception as e:
             print(f"✗ Erro ao buscar usuário por email: {e}")
             return None
+        finally:
+            db.close()
 
     @staticmethod
-    def buscar_por_id(usuario_id: int) -> Optional['Usuario']:
+    def buscar_por_id(usuario_id: int, campos: Optional[Iterable[str]] = None):
+        """Usuário completo ou, com campos, um resumo só com esses campos"""
         from Banco_de_dados.connection import DatabaseConnection
 
+        usuario = Usuario._cache.obter(('id', usuario_id))
+        if usuario is not None:
+            return usuario if campos is None else Usuario._projecao.de_entidade(campos, usuario)
+
+        colunas, montar = Usuario._leitura(campos)
         db = DatabaseConnection()
 
         try:
-            query = "SELECT * FROM Usuario WHERE Id = ?"
+            query = f"SELECT {colunas} FROM Usuario WHERE Id = ?"
             resultados = db.execute_query(query, (usuario_id,))
 
             if resultados:
-                return Usuario._from_db_row(resultados[0])
+                if campos is not None:
+                    return montar(resultados[0])
+                usuario = montar(resultados[0])
+                Usuario._guardar_no_cache(usuario)
+                return usuario
             else:
                 return None
 
         except Exception as e:
             print(f"✗ Erro ao buscar usuário por ID: {e}")
             return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def _leitura(campos: Optional[Iterable[str]]):
+        """Colunas do SELECT e montagem das linhas: Usuario completo sem
+        campos, resumo com eles"""
+        if campos is None:
+            return Usuario._COLUNAS, Usuario._from_db_row
+        return Usuario._projecao.preparar(campos)
+
+    @staticmethod
+    def _guardar_no_cache(usuario: 'Usuario') -> None:
+        Usuario._cache.guardar(usuario, ('id', usuario.id), ('email', usuario.email))
+
+    @staticmethod
+    def estatisticas_cache() -> dict:
+        """Acertos, falhas e ocupação do cache de buscar_por_id/email"""
+        return Usuario._cache.estatisticas()
+
+    @staticmethod
+    def limpar_cache() -> None:
+        Usuario._cache.limpar()
 
     @staticmethod
     def _from_db_row(row) -> 'Usuario':
@@ -391,8 +624,6 @@ class Usuario(ABC):
 
     def _buscar_ultimo_id(self, db) -> Optional[int]:
         try:
-            query = "SELECT SCOPE_IDENTITY()"
-            resultado = db.execute_query(query)
-            return int(resultado[0][0]) if resultado else None
+            return db.last_insert_id()
         except BaseException:
             return None
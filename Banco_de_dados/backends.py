@@ -0,0 +1,238 @@
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, date
+from functools import lru_cache
+from typing import Any, Optional
+
+
+class DatabaseBackend(ABC):
+    """Motor de armazenamento usado por DatabaseConnection.
+
+    As consultas dos modelos são escritas em T-SQL; cada backend abre as
+    conexões físicas e traduz o que for específico do dialeto.
+    """
+
+    name: str = ''
+    identity_query: str = ''
+
+    @property
+    @abstractmethod
+    def errors(self) -> tuple:
+        pass
+
+    @abstractmethod
+    def connect(self) -> Any:
+        pass
+
+    def translate(self, query: str) -> str:
+        return query
+
+    def begin_write(self, connection) -> None:
+        """Abre a transação de escrita antes de um comando que lê e grava"""
+
+    def prepare_bulk_cursor(self, cursor) -> None:
+        """Ajusta o cursor antes de um executemany com muitas linhas"""
+
+    def is_disconnect_error(self, error: Exception) -> bool:
+        return False
+
+
+class SQLServerBackend(DatabaseBackend):
+
+    name = 'sqlserver'
+    identity_query = "SELECT @@IDENTITY"
+
+    def __init__(self):
+
+        self.server = os.getenv('DB_SERVER', 'localhost,1433')
+        self.database = os.getenv('DB_DATABASE', 'SistemaBiblioteca')
+        self.username = os.getenv('DB_USERNAME', 'sa')
+        self.password = os.getenv('DB_PASSWORD', 'BibliotecaFort3!')
+        self.driver = os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')
+
+    @property
+    def errors(self) -> tuple:
+        try:
+            import pyodbc
+        except ImportError:
+            return ()
+        return (pyodbc.Error,)
+
+    def connection_string(self) -> str:
+
+        return (
+            f"DRIVER={{{self.driver}}};"
+            f"SERVER={self.server};"
+            f"DATABASE={self.database};"
+            f"UID={self.username};"
+            f"PWD={self.password};"
+            f"TrustServerCertificate=yes;"
+        )
+
+    def connect(self) -> Any:
+        import pyodbc
+        return pyodbc.connect(self.connection_string())
+
+    def prepare_bulk_cursor(self, cursor) -> None:
+        # Envia os parâmetros em arrays num único round-trip em vez de um
+        # EXEC por linha
+        cursor.fast_executemany = True
+
+    def is_disconnect_error(self, error: Exception) -> bool:
+
+        sqlstate = error.args[0] if error.args else ''
+        return isinstance(sqlstate, str) and sqlstate.startswith('08')
+
+
+def _adapt_datetime(valor: datetime) -> str:
+    return valor.isoformat(" ")
+
+
+def _convert_datetime(valor: bytes) -> datetime:
+    return datetime.fromisoformat(valor.decode())
+
+
+def _convert_date(valor: bytes) -> date:
+    return date.fromisoformat(valor.decode()[:10])
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(date, lambda valor: valor.isoformat())
+sqlite3.register_converter("TIMESTAMP", _convert_datetime)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_converter("DATE", _convert_date)
+
+
+_SQLITE_REWRITES = [
+    (re.compile(r"OFFSET\s+(\S+)\s+ROWS\s+FETCH\s+NEXT\s+(\S+)\s+ROWS\s+ONLY",
+                re.IGNORECASE), r"LIMIT \1, \2"),
+    (re.compile(r"SCOPE_IDENTITY\(\)|@@IDENTITY", re.IGNORECASE),
+     "last_insert_rowid()"),
+    (re.compile(r"\bISNULL\(", re.IGNORECASE), "IFNULL("),
+    (re.compile(r"\bGETDATE\(\)", re.IGNORECASE),
+     "datetime('now', 'localtime')"),
+    # Dias de calendário entre as datas, como o DATEDIFF do SQL Server;
+    # os argumentos são colunas ou parâmetros, sem chamadas aninhadas
+    (re.compile(r"\bDATEDIFF\(\s*day\s*,\s*([^,()]+?)\s*,\s*([^,()]+?)\s*\)",
+                re.IGNORECASE),
+     r"CAST(julianday(date(\2)) - julianday(date(\1)) AS INTEGER)"),
+    (re.compile(r"\s+WITH\s*\((?:\s*(?:UPDLOCK|HOLDLOCK|ROWLOCK|READPAST)\s*,?)+\)",
+                re.IGNORECASE), ""),
+]
+
+_OUTPUT_INSERTED = re.compile(
+    r"\s+OUTPUT\s+(INSERTED\.\w+(?:\s*,\s*INSERTED\.\w+)*)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def _translate_sqlite(query: str) -> str:
+
+    for pattern, replacement in _SQLITE_REWRITES:
+        query = pattern.sub(replacement, query)
+
+    output = _OUTPUT_INSERTED.search(query)
+    if output:
+        colunas = re.sub(r"INSERTED\.", "", output.group(1), flags=re.IGNORECASE)
+        query = _OUTPUT_INSERTED.sub("", query, count=1).rstrip().rstrip(';')
+        query = f"{query} RETURNING {colunas}"
+
+    return query
+
+
+class SQLiteBackend(DatabaseBackend):
+    """Banco embarcado, sem rede, para testes de carga e quiosques"""
+
+    name = 'sqlite'
+    identity_query = "SELECT last_insert_rowid()"
+
+    def __init__(self, path: Optional[str] = None):
+
+        padrao = os.path.join(os.path.dirname(__file__), 'biblioteca.db')
+        self.path = path or os.getenv('DB_SQLITE_PATH', padrao)
+        self.schema_path = os.path.join(
+            os.path.dirname(__file__), 'init-biblioteca-sqlite.sql')
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    @property
+    def errors(self) -> tuple:
+        return (sqlite3.Error,)
+
+    def connect(self) -> Any:
+
+        connection = sqlite3.connect(
+            self.path,
+            timeout=30,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            uri=self.path.startswith('file:'))
+        connection.execute("PRAGMA foreign_keys = ON")
+        if self.path != ':memory:' and 'mode=memory' not in self.path:
+            connection.execute("PRAGMA journal_mode = WAL")
+
+        self._ensure_schema(connection)
+        return connection
+
+    def translate(self, query: str) -> str:
+        return _translate_sqlite(query)
+
+    def begin_write(self, connection) -> None:
+        # Sem o lock de escrita já no início, duas transações podem ler o
+        # mesmo estoque e a segunda falharia com SQLITE_BUSY_SNAPSHOT
+        if not connection.in_transaction:
+            connection.execute("BEGIN IMMEDIATE")
+
+    def _ensure_schema(self, connection) -> None:
+
+        if self._schema_ready:
+            return
+
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+
+            existe = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Livro'"
+            ).fetchone()
+            if not existe:
+                with open(self.schema_path, encoding='utf-8') as arquivo:
+                    connection.executescript(arquivo.read())
+
+            self._schema_ready = True
+
+
+_BACKENDS = {
+    'sqlserver': SQLServerBackend,
+    'sqlite': SQLiteBackend,
+}
+
+_backend: Optional[DatabaseBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> DatabaseBackend:
+    """Backend selecionado pela variável de ambiente DB_BACKEND"""
+
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                nome = os.getenv('DB_BACKEND', 'sqlserver').strip().lower()
+                if nome not in _BACKENDS:
+                    raise ValueError(
+                        f"DB_BACKEND '{nome}' inválido. Opções: {', '.join(_BACKENDS)}")
+                _backend = _BACKENDS[nome]()
+
+    return _backend
+
+
+def reset_backend() -> None:
+
+    global _backend
+
+    with _backend_lock:
+        _backend = None
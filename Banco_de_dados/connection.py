@@ -1,39 +1,233 @@
-
-import pyodbc
 import os
-from typing import Optional, Any
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Any, Callable
 from dotenv import load_dotenv
 
+from Banco_de_dados.backends import DatabaseBackend, get_backend
+
 load_dotenv()
 
 
+class PoolTimeoutError(Exception):
+    """Nenhuma conexão ficou livre dentro do tempo limite do pool"""
+
+
+class PooledConnection:
+
+    __slots__ = ('raw', 'created_at', 'last_used', 'broken')
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.broken = False
+
+
+class ConnectionPool:
+    """Pool limitado e thread-safe de conexões reutilizáveis.
+
+    Conexões ociosas há mais de ``max_idle`` segundos são descartadas e
+    conexões com mais de ``max_lifetime`` segundos são recicladas, para que
+    sessões antigas no servidor não se acumulem.
+    """
+
+    def __init__(
+            self,
+            factory: Callable[[], Any],
+            max_size: int = 10,
+            timeout: float = 30.0,
+            max_idle: float = 300.0,
+            max_lifetime: float = 1800.0):
+
+        if max_size < 1:
+            raise ValueError("max_size deve ser maior que zero")
+
+        self._factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+
+        self._idle: deque[PooledConnection] = deque()
+        self._waiters: deque[object] = deque()
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'checkouts': 0,
+            'returns': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'evicted_idle': 0,
+            'recycled': 0,
+            'discarded': 0,
+        }
+
+    def acquire(self) -> PooledConnection:
+
+        deadline = time.monotonic() + self.timeout
+        to_close = []
+        ticket = object()
+
+        try:
+            with self._cond:
+                self._waiters.append(ticket)
+                try:
+                    while True:
+                        if self._closed:
+                            raise RuntimeError("Pool de conexões foi fechado")
+
+                        now = time.monotonic()
+                        if self._waiters[0] is ticket:
+                            to_close.extend(self._evict_locked(now))
+
+                            while self._idle:
+                                pooled = self._idle.pop()
+                                if self._expired(pooled, now):
+                                    self._stats['recycled'] += 1
+                                    to_close.append(pooled)
+                                    continue
+
+                                self._in_use += 1
+                                self._stats['checkouts'] += 1
+                                self._stats['reused'] += 1
+                                return pooled
+
+                            if self._in_use < self.max_size:
+                                self._in_use += 1
+                                break
+
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            self._stats['timeouts'] += 1
+                            raise PoolTimeoutError(
+                                f"Nenhuma conexão disponível após {self.timeout}s "
+                                f"({self.max_size} em uso)")
+
+                        self._stats['waits'] += 1
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiters.remove(ticket)
+                    self._cond.notify_all()
+        finally:
+            self._close_all(to_close)
+
+        try:
+            pooled = PooledConnection(self._factory())
+        except BaseException:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._stats['created'] += 1
+            self._stats['checkouts'] += 1
+        return pooled
+
+    def release(self, pooled: PooledConnection) -> None:
+
+        if not pooled.broken:
+            try:
+                pooled.raw.rollback()
+            except Exception:
+                pooled.broken = True
+
+        to_close = []
+        with self._cond:
+            self._in_use -= 1
+            self._stats['returns'] += 1
+            now = time.monotonic()
+
+            if self._closed or pooled.broken:
+                self._stats['discarded'] += 1
+                to_close.append(pooled)
+            elif self._expired(pooled, now):
+                self._stats['recycled'] += 1
+                to_close.append(pooled)
+            else:
+                pooled.last_used = now
+                self._idle.append(pooled)
+
+            to_close.extend(self._evict_locked(now))
+            self._cond.notify_all()
+
+        self._close_all(to_close)
+
+    def evict_idle(self) -> int:
+        """Fecha imediatamente as conexões ociosas vencidas"""
+        with self._cond:
+            to_close = self._evict_locked(time.monotonic())
+        self._close_all(to_close)
+        return len(to_close)
+
+    def close(self) -> None:
+
+        with self._cond:
+            self._closed = True
+            to_close = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_all(to_close)
+
+    def stats(self) -> dict:
+
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'size': self._in_use + len(self._idle),
+            })
+        return stats
+
+    def _expired(self, pooled: PooledConnection, now: float) -> bool:
+        return now - pooled.created_at >= self.max_lifetime
+
+    def _evict_locked(self, now: float) -> list:
+
+        evicted = []
+        while self._idle and now - self._idle[0].last_used >= self.max_idle:
+            evicted.append(self._idle.popleft())
+            self._stats['evicted_idle'] += 1
+        return evicted
+
+    @staticmethod
+    def _close_all(pooled_list: list) -> None:
+
+        for pooled in pooled_list:
+            try:
+                pooled.raw.close()
+            except Exception:
+                pass
+
+
 class DatabaseConnection:
 
     def __init__(self):
 
-        self.server = os.getenv('DB_SERVER', 'localhost,1433')
-        self.database = os.getenv('DB_DATABASE', 'SistemaBiblioteca')
-        self.username = os.getenv('DB_USERNAME', 'sa')
-        self.password = os.getenv('DB_PASSWORD', 'BibliotecaFort3!')
-        self.driver = os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')
-        self.connection: Optional[pyodbc.Connection] = None
+        self.backend: DatabaseBackend = get_backend()
+        self.connection: Optional[Any] = None
+        self._pooled: Optional[PooledConnection] = None
+        self._in_transaction = False
 
     def connect(self) -> bool:
 
+        if self._pooled:
+            return True
+
         try:
-            connection_string = (
-                f"DRIVER={{{self.driver}}};"
-                f"SERVER={self.server};"
-                f"DATABASE={self.database};"
-                f"UID={self.username};"
-                f"PWD={self.password};"
-                f"TrustServerCertificate=yes;"
-            )
-
-            self.connection = pyodbc.connect(connection_string)
+            self._pooled = get_pool().acquire()
+            self.connection = self._pooled.raw
             return True
 
-        except pyodbc.Error as e:
+        except self.backend.errors as e:
             print(f"✗ Erro ao conectar ao banco: {e}")
             return False
         except Exception as e:
@@ -41,11 +235,57 @@ class DatabaseConnection:
             return False
 
     def disconnect(self) -> None:
+        """Devolve a conexão ao pool"""
+        pooled, self._pooled = self._pooled, None
+        self.connection = None
+        if pooled:
+            get_pool().release(pooled)
+
+    def close(self) -> None:
+        self.disconnect()
+
+    def _mark_broken(self, error: Exception) -> None:
+
+        if self._pooled and self.backend.is_disconnect_error(error):
+            self._pooled.broken = True
+
+    def _commit(self) -> None:
 
+        if not self._in_transaction:
+            self.connection.commit()
+
+    def _rollback(self) -> None:
+        # Dentro de transaction() o erro sobe e o rollback fica para o bloco
+        if self._in_transaction:
+            raise
         if self.connection:
-            self.connection.close()
-            self.connection = None
-            print("✓ Desconectado do banco de dados")
+            self.connection.rollback()
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa vários comandos em uma única transação.
+
+        Os execute_* deixam de fazer commit a cada comando e passam a
+        propagar os erros; o commit acontece na saída do bloco e qualquer
+        exceção desfaz tudo.
+        """
+        if self._in_transaction:
+            yield self
+            return
+
+        if not self.connection and not self.connect():
+            raise RuntimeError("Não foi possível conectar ao banco de dados")
+
+        self.backend.begin_write(self.connection)
+        self._in_transaction = True
+        try:
+            yield self
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        finally:
+            self._in_transaction = False
 
     def execute_query(self, query: str, params: tuple = ()) -> Optional[list]:
 
@@ -55,7 +295,7 @@ class DatabaseConnection:
 
         try:
             cursor = self.connection.cursor()
-            cursor.execute(query, params)
+            cursor.execute(self.backend.translate(query), params)
 
             columns = [column[0]
                        for column in cursor.description] if cursor.description else []
@@ -72,11 +312,16 @@ class DatabaseConnection:
             cursor.close()
             return result
 
-        except pyodbc.Error as e:
+        except self.backend.errors as e:
+            self._mark_broken(e)
             print(f"✗ Erro ao executar consulta: {e}")
+            if self._in_transaction:
+                raise
             return None
         except Exception as e:
             print(f"✗ Erro inesperado: {e}")
+            if self._in_transaction:
+                raise
             return None
 
     def execute_non_query(self, query: str, params: tuple = ()) -> bool:
@@ -87,22 +332,76 @@ class DatabaseConnection:
 
         try:
             cursor = self.connection.cursor()
-            cursor.execute(query, params)
-            self.connection.commit()
+            cursor.execute(self.backend.translate(query), params)
+            self._commit()
             cursor.close()
             return True
 
-        except pyodbc.Error as e:
+        except self.backend.errors as e:
+            self._mark_broken(e)
             print(f"✗ Erro ao executar operação: {e}")
-            if self.connection:
-                self.connection.rollback()
+            self._rollback()
             return False
         except Exception as e:
             print(f"✗ Erro inesperado: {e}")
-            if self.connection:
-                self.connection.rollback()
+            self._rollback()
             return False
 
+    def execute_rowcount(self, query: str, params: tuple = ()) -> int:
+        """Executa um comando de escrita e devolve quantas linhas ele afetou"""
+
+        if not self.connection:
+            if not self.connect():
+                return 0
+
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(self.backend.translate(query), params)
+            rowcount = cursor.rowcount
+            self._commit()
+            cursor.close()
+            return max(rowcount, 0)
+
+        except self.backend.errors as e:
+            self._mark_broken(e)
+            print(f"✗ Erro ao executar operação: {e}")
+            self._rollback()
+            return 0
+        except Exception as e:
+            print(f"✗ Erro inesperado: {e}")
+            self._rollback()
+            return 0
+
+    def execute_many(self, query: str, params_list: list) -> int:
+        """Executa o mesmo comando para cada tupla de params_list (executemany)
+        e devolve quantas linhas foram afetadas"""
+
+        if not params_list:
+            return 0
+
+        if not self.connection:
+            if not self.connect():
+                return 0
+
+        try:
+            cursor = self.connection.cursor()
+            self.backend.prepare_bulk_cursor(cursor)
+            cursor.executemany(self.backend.translate(query), params_list)
+            rowcount = cursor.rowcount
+            self._commit()
+            cursor.close()
+            return rowcount if rowcount >= 0 else len(params_list)
+
+        except self.backend.errors as e:
+            self._mark_broken(e)
+            print(f"✗ Erro ao executar operação em lote: {e}")
+            self._rollback()
+            return 0
+        except Exception as e:
+            print(f"✗ Erro inesperado: {e}")
+            self._rollback()
+            return 0
+
     def execute_scalar(self, query: str, params: tuple = ()) -> Any:
 
         if not self.connection:
@@ -111,19 +410,56 @@ class DatabaseConnection:
 
         try:
             cursor = self.connection.cursor()
-            cursor.execute(query, params)
+            cursor.execute(self.backend.translate(query), params)
             result = cursor.fetchone()
             cursor.close()
 
             return result[0] if result else None
 
-        except pyodbc.Error as e:
+        except self.backend.errors as e:
+            self._mark_broken(e)
             print(f"✗ Erro ao executar consulta escalar: {e}")
+            if self._in_transaction:
+                raise
+            return None
+        except Exception as e:
+            print(f"✗ Erro inesperado: {e}")
+            if self._in_transaction:
+                raise
+            return None
+
+    def execute_returning(self, query: str, params: tuple = ()) -> Any:
+        """Executa um comando de escrita com OUTPUT e devolve o primeiro valor retornado"""
+
+        if not self.connection:
+            if not self.connect():
+                return None
+
+        try:
+            self.backend.begin_write(self.connection)
+            cursor = self.connection.cursor()
+            cursor.execute(self.backend.translate(query), params)
+            result = cursor.fetchone()
+            cursor.close()
+            self._commit()
+
+            return result[0] if result else None
+
+        except self.backend.errors as e:
+            self._mark_broken(e)
+            print(f"✗ Erro ao executar operação: {e}")
+            self._rollback()
             return None
         except Exception as e:
             print(f"✗ Erro inesperado: {e}")
+            self._rollback()
             return None
 
+    def last_insert_id(self) -> Optional[int]:
+        """Id gerado pelo último INSERT feito nesta conexão"""
+        resultado = self.execute_scalar(self.backend.identity_query)
+        return int(resultado) if resultado is not None else None
+
     def test_connection(self) -> bool:
 
         try:
@@ -141,6 +477,49 @@ class DatabaseConnection:
 
         self.disconnect()
 
+    def __del__(self):
+
+        try:
+            self.disconnect()
+        except Exception:
+            pass
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    get_backend().connect,
+                    max_size=int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+                    timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+                    max_idle=float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+                    max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')))
+
+    return _pool
+
+
+def pool_stats() -> dict:
+    return get_pool().stats()
+
+
+def close_pool() -> None:
+
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+
+    if pool:
+        pool.close()
+
 
 _db_connection = None
 
@@ -153,6 +532,7 @@ def get_connection():
         _db_connection = DatabaseConnection()
 
     if not _db_connection.connection or not _db_connection.test_connection():
+        _db_connection.disconnect()
         if not _db_connection.connect():
             raise Exception("Não foi possível conectar ao banco de dados")
 
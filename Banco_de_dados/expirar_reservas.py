@@ -0,0 +1,49 @@
+"""Expira reservas na hora do prazo, com o agendador rodando em primeiro plano.
+
+Uso:
+    python Banco_de_dados/expirar_reservas.py [--relatorio SEGUNDOS] [--janela N]
+
+Monta o heap de prazos a partir do banco e expira as reservas da fila e as
+retiradas vencidas conforme os prazos chegam, até ser interrompido (Ctrl+C).
+A cada --relatorio segundos imprime a profundidade do heap e o atraso em
+relação aos prazos.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from Backend.AgendadorExpiracoes import AgendadorExpiracoes
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--relatorio', type=float, default=60.0,
+                        help='segundos entre relatórios (padrão: 60)')
+    parser.add_argument('--janela', type=int, default=10_000,
+                        help='prazos lidos do banco por tipo de reserva (padrão: 10000)')
+    args = parser.parse_args()
+
+    agendador = AgendadorExpiracoes(janela=args.janela)
+    agendador.iniciar()
+
+    try:
+        while True:
+            time.sleep(args.relatorio)
+            dados = agendador.estatisticas()
+            print(f"✓ {dados['profundidade']} prazo(s) no heap, próximo em "
+                  f"{dados['proximo_prazo'] or '-'}; atraso último={dados['atraso_ultimo']}s "
+                  f"máximo={dados['atraso_maximo']}s; expiradas: "
+                  f"{dados['reservas_expiradas']} na fila, {dados['retiradas_expiradas']} "
+                  f"retiradas, {dados['promovidas']} repassadas")
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        agendador.parar()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Cadastra livros em lote a partir de um arquivo CSV ou JSON Lines.
+
+Uso:
+    python Banco_de_dados/importar_livros.py livros.csv [--lote 1000]
+
+CSV com cabeçalho nome,autor,isbn,genero[,quantidade] (separador ',' ou
+';'); JSON Lines com um objeto por linha e as mesmas chaves. Linhas
+inválidas ou com ISBN já cadastrado são listadas e puladas. Sai com
+código 1 se alguma linha foi rejeitada.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from Backend.ImportacaoLivros import TAMANHO_LOTE_PADRAO, importar_arquivo
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('arquivo', help='arquivo .csv ou .jsonl')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PADRAO,
+                        help='livros gravados por transação')
+    args = parser.parse_args()
+
+    def progresso(resultado):
+        print(f"… {resultado.resumo()}", end='\r', flush=True)
+
+    try:
+        resultado = importar_arquivo(
+            args.arquivo, tamanho_lote=args.lote, ao_progresso=progresso)
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 2
+
+    print()
+    for linha, mensagem in sorted(resultado.erros):
+        print(f"✗ Linha {linha}: {mensagem}")
+    if len(resultado.erros) < resultado.rejeitados:
+        print(f"… e mais {resultado.rejeitados - len(resultado.erros)} erros")
+
+    print(f"✓ {resultado.resumo()} em {resultado.segundos:.2f}s")
+    return 1 if resultado.rejeitados else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
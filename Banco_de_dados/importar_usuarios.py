@@ -0,0 +1,53 @@
+"""Matricula alunos e professores em lote a partir de CSV ou JSON Lines.
+
+Uso:
+    python Banco_de_dados/importar_usuarios.py matriculas.csv [--lote 1000] [--processos N]
+
+Colunas/chaves: nome, email, senha, tipo_usuario (Aluno ou Professor),
+matricula e curso (aluno) ou departamento (professor). Linhas inválidas,
+emails e matrículas repetidos são listados e pulados. Sai com código 1
+se alguma linha foi rejeitada.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from Backend.Importacao import TAMANHO_LOTE_PADRAO
+from Backend.ImportacaoUsuarios import importar_arquivo
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('arquivo', help='arquivo .csv ou .jsonl')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PADRAO,
+                        help='usuários gravados por transação')
+    parser.add_argument('--processos', type=int, default=None,
+                        help='processos para criptografar senhas (padrão: núcleos da CPU)')
+    args = parser.parse_args()
+
+    def progresso(resultado):
+        print(f"… {resultado.resumo()}", end='\r', flush=True)
+
+    try:
+        resultado = importar_arquivo(
+            args.arquivo, tamanho_lote=args.lote,
+            processos=args.processos, ao_progresso=progresso)
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 2
+
+    print()
+    for linha, mensagem in sorted(resultado.erros):
+        print(f"✗ Linha {linha}: {mensagem}")
+    if len(resultado.erros) < resultado.rejeitados:
+        print(f"… e mais {resultado.rejeitados - len(resultado.erros)} erros")
+
+    print(f"✓ {resultado.resumo()} em {resultado.segundos:.2f}s")
+    return 1 if resultado.rejeitados else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
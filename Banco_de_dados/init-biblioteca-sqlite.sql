@@ -0,0 +1,213 @@
+-- Esquema equivalente ao init-biblioteca.sql para o backend SQLite (DB_BACKEND=sqlite)
+
+CREATE TABLE Livro (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Nome TEXT NOT NULL,
+    Autor TEXT NOT NULL,
+    ISBN TEXT NOT NULL UNIQUE,
+    Genero TEXT NOT NULL,
+    Quantidade INTEGER NOT NULL DEFAULT 5,
+    QuantidadeEmprestada INTEGER NOT NULL DEFAULT 0,
+    DataCadastro TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    DataAtualizacao TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    Ativo INTEGER DEFAULT 1,
+    CONSTRAINT CK_Livro_Estoque CHECK (QuantidadeEmprestada BETWEEN 0 AND Quantidade)
+);
+
+
+CREATE TABLE Usuario (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Nome TEXT NOT NULL,
+    Email TEXT NOT NULL UNIQUE,
+    Senha TEXT NOT NULL,
+    TipoUsuario TEXT NOT NULL CHECK (TipoUsuario IN ('Bibliotecario', 'Aluno', 'Professor')),
+    Matricula TEXT NULL,
+    Curso TEXT NULL,
+    Departamento TEXT NULL,
+    Ativo INTEGER DEFAULT 1,
+    DataCadastro TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    DataAtualizacao TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+
+CREATE TABLE Aluno (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Nome TEXT NOT NULL,
+    Matricula TEXT NOT NULL UNIQUE,
+    Curso TEXT NOT NULL,
+    DataCadastro TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+
+CREATE TABLE Emprestimo (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    UsuarioId INTEGER NOT NULL REFERENCES Usuario(Id),
+    LivroId INTEGER NOT NULL REFERENCES Livro(Id),
+    DataEmprestimo TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime')),
+    DataPrevistaDevolucao TIMESTAMP NOT NULL,
+    DataDevolucao TIMESTAMP NULL,
+    Status TEXT NOT NULL DEFAULT 'Emprestado'
+        CHECK (Status IN ('Emprestado', 'Devolvido', 'Atrasado', 'Renovado', 'Cancelado')),
+    ValorMulta REAL NOT NULL DEFAULT 0,
+    Observacoes TEXT NULL
+);
+
+
+CREATE TABLE Reserva (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    UsuarioId INTEGER NOT NULL REFERENCES Usuario(Id),
+    LivroId INTEGER NOT NULL REFERENCES Livro(Id),
+    DataReserva TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime')),
+    Status TEXT NOT NULL DEFAULT 'Ativa'
+        CHECK (Status IN ('Ativa', 'AguardandoRetirada', 'Atendida', 'Cancelada', 'Expirada')),
+    -- Faixa da fila de espera: 0 = professor, 1 = demais
+    Prioridade INTEGER NOT NULL DEFAULT 1,
+    -- Preenchidas quando um exemplar é separado para a reserva
+    DataDisponibilidade TIMESTAMP NULL,
+    DataExpiracao TIMESTAMP NULL
+);
+
+
+CREATE TABLE Avaliacao (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    LivroId INTEGER NOT NULL REFERENCES Livro(Id),
+    UsuarioId INTEGER NOT NULL REFERENCES Usuario(Id),
+    Nota INTEGER NOT NULL CHECK (Nota BETWEEN 1 AND 5),
+    Comentario TEXT NULL,
+    DataAvaliacao TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    Ativa INTEGER DEFAULT 1,
+    EmprestimoId INTEGER NULL REFERENCES Emprestimo(Id)
+);
+
+
+CREATE TABLE AvaliacaoResumo (
+    LivroId INTEGER PRIMARY KEY REFERENCES Livro(Id),
+    SomaNotas INTEGER NOT NULL DEFAULT 0,
+    TotalAvaliacoes INTEGER NOT NULL DEFAULT 0,
+    Estrelas1 INTEGER NOT NULL DEFAULT 0,
+    Estrelas2 INTEGER NOT NULL DEFAULT 0,
+    Estrelas3 INTEGER NOT NULL DEFAULT 0,
+    Estrelas4 INTEGER NOT NULL DEFAULT 0,
+    Estrelas5 INTEGER NOT NULL DEFAULT 0
+);
+
+
+CREATE TABLE Notificacao (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    UsuarioId INTEGER NOT NULL REFERENCES Usuario(Id),
+    Tipo TEXT NOT NULL,
+    Titulo TEXT NOT NULL,
+    Mensagem TEXT NOT NULL,
+    Status TEXT NOT NULL DEFAULT 'NAO_LIDA',
+    DataCriacao TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    DataLeitura TIMESTAMP NULL,
+    Ativa INTEGER DEFAULT 1,
+    LivroId INTEGER NULL REFERENCES Livro(Id),
+    Chave TEXT NULL
+);
+
+
+CREATE VIEW VW_EstoqueLivros AS
+SELECT
+    l.Id,
+    l.Nome,
+    l.Autor,
+    l.ISBN,
+    l.Genero,
+    l.Quantidade AS QuantidadeTotal,
+    l.QuantidadeEmprestada,
+    l.Quantidade - l.QuantidadeEmprestada AS QuantidadeDisponivel,
+    l.Ativo,
+    l.DataCadastro
+FROM Livro l;
+
+
+INSERT INTO Livro (Nome, Autor, ISBN, Genero) VALUES
+('Dom Casmurro', 'Machado de Assis', '978-85-359-0277-5', 'Literatura Brasileira'),
+('O Cortiço', 'Aluísio Azevedo', '978-85-359-0278-2', 'Literatura Brasileira'),
+('Clean Code', 'Robert C. Martin', '978-0-13-235088-4', 'Tecnologia'),
+('Design Patterns', 'Gang of Four', '978-0-20163-361-0', 'Tecnologia'),
+('1984', 'George Orwell', '978-0-452-28423-4', 'Ficção Científica'),
+('Algoritmos e Estruturas de Dados', 'Thomas H. Cormen', '978-85-352-3699-6', 'Computação');
+
+
+INSERT INTO Usuario (Nome, Email, Senha, TipoUsuario, Matricula, Curso, Departamento) VALUES
+('Ana Costa', 'ana.costa@biblioteca.com', 'e3afed0047b08059d0fada10f400c1e5', 'Bibliotecario', 'BIB001', NULL, NULL),
+('João Silva', 'joao.silva@estudante.com', 'c33367701511b4f6020ec61ded352059', 'Aluno', '2023001', 'Ciência da Computação', NULL),
+('Maria Santos', 'maria.santos@estudante.com', 'c33367701511b4f6020ec61ded352059', 'Aluno', '2023002', 'Engenharia de Software', NULL),
+('Dr. Pedro Oliveira', 'pedro.oliveira@professor.com', 'f25a2fc72690b780b2a14e140ef6a9e0', 'Professor', 'PROF001', NULL, 'Computação'),
+('Dra. Carla Lima', 'carla.lima@professor.com', 'f25a2fc72690b780b2a14e140ef6a9e0', 'Professor', 'PROF002', NULL, 'Matemática');
+
+
+INSERT INTO Aluno (Nome, Matricula, Curso) VALUES
+('João Silva', '2023001', 'Ciência da Computação'),
+('Maria Santos', '2023002', 'Engenharia de Software'),
+('Pedro Oliveira', '2023003', 'Sistemas de Informação'),
+('Ana Costa', '2023004', 'Análise e Desenvolvimento de Sistemas');
+
+
+CREATE INDEX IX_Livro_Autor ON Livro(Autor);
+CREATE INDEX IX_Livro_Genero ON Livro(Genero);
+CREATE INDEX IX_Livro_Nome ON Livro(Nome, Id);
+CREATE INDEX IX_Usuario_TipoUsuario ON Usuario(TipoUsuario);
+CREATE INDEX IX_Usuario_Nome ON Usuario(Nome, Id);
+CREATE INDEX IX_Usuario_Tipo_Nome ON Usuario(TipoUsuario, Nome, Id);
+CREATE INDEX IX_Usuario_Matricula ON Usuario(Matricula);
+CREATE INDEX IX_Emprestimo_Usuario_Status ON Emprestimo(UsuarioId, Status);
+CREATE INDEX IX_Emprestimo_Livro_Status ON Emprestimo(LivroId, Status);
+CREATE INDEX IX_Emprestimo_Status_Prevista ON Emprestimo(Status, DataPrevistaDevolucao, Id);
+CREATE INDEX IX_Reserva_Livro_Status ON Reserva(LivroId, Status, DataReserva);
+CREATE INDEX IX_Reserva_Fila ON Reserva(LivroId, Prioridade, Id) WHERE Status = 'Ativa';
+CREATE UNIQUE INDEX UX_Reserva_Usuario_Livro_Ativa ON Reserva(UsuarioId, LivroId) WHERE Status IN ('Ativa', 'AguardandoRetirada');
+CREATE INDEX IX_Reserva_Expiracao ON Reserva(DataExpiracao) WHERE Status = 'AguardandoRetirada';
+CREATE INDEX IX_Reserva_Ativa_Data ON Reserva(DataReserva) WHERE Status = 'Ativa';
+CREATE INDEX IX_Avaliacao_Livro ON Avaliacao(LivroId, Ativa, DataAvaliacao DESC, Id DESC);
+CREATE INDEX IX_Notificacao_Usuario ON Notificacao(UsuarioId, Ativa, Status);
+CREATE INDEX IX_Notificacao_Usuario_Id ON Notificacao(UsuarioId, Id);
+CREATE UNIQUE INDEX UX_Notificacao_Chave ON Notificacao(Chave) WHERE Chave IS NOT NULL;
+
+
+CREATE TRIGGER TR_Livro_UpdateTimestamp
+AFTER UPDATE ON Livro
+FOR EACH ROW
+WHEN NEW.DataAtualizacao IS OLD.DataAtualizacao
+BEGIN
+    UPDATE Livro
+    SET DataAtualizacao = datetime('now', 'localtime')
+    WHERE Id = NEW.Id;
+END;
+
+
+-- Busca textual: índice FTS5 sobre Livro, sem acento e sem caixa
+CREATE VIRTUAL TABLE LivroBusca USING fts5(
+    Nome, Autor, ISBN, Genero,
+    content = 'Livro',
+    content_rowid = 'Id',
+    tokenize = "unicode61 remove_diacritics 2 tokenchars '-'",
+    prefix = '2 3'
+);
+
+CREATE TRIGGER TR_Livro_Busca_Insert
+AFTER INSERT ON Livro
+BEGIN
+    INSERT INTO LivroBusca (rowid, Nome, Autor, ISBN, Genero)
+    VALUES (NEW.Id, NEW.Nome, NEW.Autor, NEW.ISBN, NEW.Genero);
+END;
+
+CREATE TRIGGER TR_Livro_Busca_Delete
+AFTER DELETE ON Livro
+BEGIN
+    INSERT INTO LivroBusca (LivroBusca, rowid, Nome, Autor, ISBN, Genero)
+    VALUES ('delete', OLD.Id, OLD.Nome, OLD.Autor, OLD.ISBN, OLD.Genero);
+END;
+
+CREATE TRIGGER TR_Livro_Busca_Update
+AFTER UPDATE OF Nome, Autor, ISBN, Genero ON Livro
+BEGIN
+    INSERT INTO LivroBusca (LivroBusca, rowid, Nome, Autor, ISBN, Genero)
+    VALUES ('delete', OLD.Id, OLD.Nome, OLD.Autor, OLD.ISBN, OLD.Genero);
+    INSERT INTO LivroBusca (rowid, Nome, Autor, ISBN, Genero)
+    VALUES (NEW.Id, NEW.Nome, NEW.Autor, NEW.ISBN, NEW.Genero);
+END;
+
+INSERT INTO LivroBusca (LivroBusca) VALUES ('rebuild');
@@ -8,14 +8,17 @@ GO
 
 
 CREATE TABLE Livro (
-    Id INT IDENTITY(1,1) PRIMARY KEY,
+    Id INT IDENTITY(1,1) CONSTRAINT PK_Livro PRIMARY KEY,
     Nome NVARCHAR(255) NOT NULL,
     Autor NVARCHAR(255) NOT NULL,
     ISBN NVARCHAR(20) NOT NULL UNIQUE,
     Genero NVARCHAR(100) NOT NULL,
+    Quantidade INT NOT NULL DEFAULT 5,
+    QuantidadeEmprestada INT NOT NULL DEFAULT 0,
     DataCadastro DATETIME2 DEFAULT GETDATE(),
     DataAtualizacao DATETIME2 DEFAULT GETDATE(),
-    Ativo BIT DEFAULT 1
+    Ativo BIT DEFAULT 1,
+    CONSTRAINT CK_Livro_Estoque CHECK (QuantidadeEmprestada BETWEEN 0 AND Quantidade)
 );
 GO
 
@@ -49,6 +52,95 @@ END
 GO
 
 
+CREATE TABLE Emprestimo (
+    Id INT IDENTITY(1,1) PRIMARY KEY,
+    UsuarioId INT NOT NULL REFERENCES Usuario(Id),
+    LivroId INT NOT NULL REFERENCES Livro(Id),
+    DataEmprestimo DATETIME2 NOT NULL DEFAULT GETDATE(),
+    DataPrevistaDevolucao DATETIME2 NOT NULL,
+    DataDevolucao DATETIME2 NULL,
+    Status NVARCHAR(20) NOT NULL DEFAULT 'Emprestado'
+        CHECK (Status IN ('Emprestado', 'Devolvido', 'Atrasado', 'Renovado', 'Cancelado')),
+    ValorMulta DECIMAL(10,2) NOT NULL DEFAULT 0,
+    Observacoes NVARCHAR(MAX) NULL
+);
+GO
+
+
+CREATE TABLE Reserva (
+    Id INT IDENTITY(1,1) PRIMARY KEY,
+    UsuarioId INT NOT NULL REFERENCES Usuario(Id),
+    LivroId INT NOT NULL REFERENCES Livro(Id),
+    DataReserva DATETIME2 NOT NULL DEFAULT GETDATE(),
+    Status NVARCHAR(20) NOT NULL DEFAULT 'Ativa'
+        CHECK (Status IN ('Ativa', 'AguardandoRetirada', 'Atendida', 'Cancelada', 'Expirada')),
+    -- Faixa da fila de espera: 0 = professor, 1 = demais
+    Prioridade TINYINT NOT NULL DEFAULT 1,
+    -- Preenchidas quando um exemplar é separado para a reserva
+    DataDisponibilidade DATETIME2 NULL,
+    DataExpiracao DATETIME2 NULL
+);
+GO
+
+
+CREATE TABLE Avaliacao (
+    Id INT IDENTITY(1,1) PRIMARY KEY,
+    LivroId INT NOT NULL REFERENCES Livro(Id),
+    UsuarioId INT NOT NULL REFERENCES Usuario(Id),
+    Nota INT NOT NULL CHECK (Nota BETWEEN 1 AND 5),
+    Comentario NVARCHAR(1000) NULL,
+    DataAvaliacao DATETIME2 DEFAULT GETDATE(),
+    Ativa BIT DEFAULT 1,
+    EmprestimoId INT NULL REFERENCES Emprestimo(Id)
+);
+GO
+
+
+CREATE TABLE AvaliacaoResumo (
+    LivroId INT PRIMARY KEY REFERENCES Livro(Id),
+    SomaNotas INT NOT NULL DEFAULT 0,
+    TotalAvaliacoes INT NOT NULL DEFAULT 0,
+    Estrelas1 INT NOT NULL DEFAULT 0,
+    Estrelas2 INT NOT NULL DEFAULT 0,
+    Estrelas3 INT NOT NULL DEFAULT 0,
+    Estrelas4 INT NOT NULL DEFAULT 0,
+    Estrelas5 INT NOT NULL DEFAULT 0
+);
+GO
+
+
+CREATE TABLE Notificacao (
+    Id INT IDENTITY(1,1) PRIMARY KEY,
+    UsuarioId INT NOT NULL REFERENCES Usuario(Id),
+    Tipo NVARCHAR(20) NOT NULL,
+    Titulo NVARCHAR(100) NOT NULL,
+    Mensagem NVARCHAR(1000) NOT NULL,
+    Status NVARCHAR(20) NOT NULL DEFAULT 'NAO_LIDA',
+    DataCriacao DATETIME2 DEFAULT GETDATE(),
+    DataLeitura DATETIME2 NULL,
+    Ativa BIT DEFAULT 1,
+    LivroId INT NULL REFERENCES Livro(Id),
+    Chave NVARCHAR(100) NULL
+);
+GO
+
+
+CREATE VIEW VW_EstoqueLivros AS
+SELECT
+    l.Id,
+    l.Nome,
+    l.Autor,
+    l.ISBN,
+    l.Genero,
+    l.Quantidade AS QuantidadeTotal,
+    l.QuantidadeEmprestada,
+    l.Quantidade - l.QuantidadeEmprestada AS QuantidadeDisponivel,
+    l.Ativo,
+    l.DataCadastro
+FROM Livro l;
+GO
+
+
 INSERT INTO Livro (Nome, Autor, ISBN, Genero) VALUES
 ('Dom Casmurro', 'Machado de Assis', '978-85-359-0277-5', 'Literatura Brasileira'),
 ('O Cortiço', 'Aluísio Azevedo', '978-85-359-0278-2', 'Literatura Brasileira'),
@@ -83,9 +175,25 @@ GO
 CREATE INDEX IX_Livro_ISBN ON Livro(ISBN);
 CREATE INDEX IX_Livro_Autor ON Livro(Autor);
 CREATE INDEX IX_Livro_Genero ON Livro(Genero);
+CREATE INDEX IX_Livro_Nome ON Livro(Nome, Id);
 CREATE INDEX IX_Aluno_Matricula ON Aluno(Matricula);
 CREATE INDEX IX_Usuario_Email ON Usuario(Email);
 CREATE INDEX IX_Usuario_TipoUsuario ON Usuario(TipoUsuario);
+CREATE INDEX IX_Usuario_Nome ON Usuario(Nome, Id);
+CREATE INDEX IX_Usuario_Tipo_Nome ON Usuario(TipoUsuario, Nome, Id);
+CREATE INDEX IX_Usuario_Matricula ON Usuario(Matricula);
+CREATE INDEX IX_Emprestimo_Usuario_Status ON Emprestimo(UsuarioId, Status);
+CREATE INDEX IX_Emprestimo_Livro_Status ON Emprestimo(LivroId, Status);
+CREATE INDEX IX_Emprestimo_Status_Prevista ON Emprestimo(Status, DataPrevistaDevolucao, Id);
+CREATE INDEX IX_Reserva_Livro_Status ON Reserva(LivroId, Status, DataReserva);
+CREATE INDEX IX_Reserva_Fila ON Reserva(LivroId, Prioridade, Id) WHERE Status = 'Ativa';
+CREATE UNIQUE INDEX UX_Reserva_Usuario_Livro_Ativa ON Reserva(UsuarioId, LivroId) WHERE Status IN ('Ativa', 'AguardandoRetirada');
+CREATE INDEX IX_Reserva_Expiracao ON Reserva(DataExpiracao) WHERE Status = 'AguardandoRetirada';
+CREATE INDEX IX_Reserva_Ativa_Data ON Reserva(DataReserva) WHERE Status = 'Ativa';
+CREATE INDEX IX_Avaliacao_Livro ON Avaliacao(LivroId, Ativa, DataAvaliacao DESC, Id DESC);
+CREATE INDEX IX_Notificacao_Usuario ON Notificacao(UsuarioId, Ativa, Status);
+CREATE INDEX IX_Notificacao_Usuario_Id ON Notificacao(UsuarioId, Id);
+CREATE UNIQUE INDEX UX_Notificacao_Chave ON Notificacao(Chave) WHERE Chave IS NOT NULL;
 GO
 
 
@@ -102,7 +210,24 @@ BEGIN
 END
 GO
 
+-- Busca textual (Livro.buscar). A imagem padrão do SQL Server no Docker não
+-- traz o Full-Text Search; sem ele a busca usa LIKE sem acento.
+IF FULLTEXTSERVICEPROPERTY('IsFullTextInstalled') = 1
+BEGIN
+    CREATE FULLTEXT CATALOG FTC_Biblioteca WITH ACCENT_SENSITIVITY = OFF;
+
+    CREATE FULLTEXT INDEX ON Livro (
+        Nome LANGUAGE 1046,
+        Autor LANGUAGE 1046,
+        ISBN LANGUAGE 1046,
+        Genero LANGUAGE 1046
+    )
+    KEY INDEX PK_Livro ON FTC_Biblioteca
+    WITH CHANGE_TRACKING AUTO;
+END
+GO
+
 PRINT 'Banco de dados SistemaBiblioteca criado com sucesso!';
-PRINT 'Tabelas criadas: Livro, Aluno';
+PRINT 'Tabelas criadas: Livro, Usuario, Aluno, Emprestimo, Reserva, Avaliacao, AvaliacaoResumo, Notificacao';
 PRINT 'Dados de exemplo inseridos!';
 GO
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""Confere (e opcionalmente corrige) os contadores de estoque dos livros.
+
+Uso:
+    python Banco_de_dados/reconciliar_estoque.py [--corrigir]
+
+Pensado para rodar periodicamente (cron/agendador) ou depois de uma carga
+manual na tabela Emprestimo. Sai com código 1 se houver divergência não
+corrigida.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from Backend.Livro import Livro
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corrigir', action='store_true',
+                        help='regrava os contadores divergentes')
+    args = parser.parse_args()
+
+    divergencias = Livro.reconciliar_estoque(corrigir=args.corrigir)
+
+    if not divergencias:
+        print("✓ Contadores de estoque conferem com os empréstimos ativos")
+        return 0
+
+    for item in divergencias:
+        print(f"✗ Livro {item['livro_id']} ({item['nome']}): "
+              f"contador={item['contador']} real={item['real']}")
+
+    return 0 if args.corrigir else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
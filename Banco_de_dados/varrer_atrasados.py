@@ -0,0 +1,53 @@
+"""Marca empréstimos vencidos como Atrasado, atualiza as multas, avisa os usuários e expira reservas vencidas.
+
+Uso:
+    python Banco_de_dados/varrer_atrasados.py [--intervalo MINUTOS]
+
+Sem --intervalo roda uma vez (para cron/agendador); com ele repete a
+varredura a cada MINUTOS até ser interrompido. Cada empréstimo atrasado
+recebe no máximo um aviso por dia, então repetir a varredura não duplica
+notificações. Reservas que passaram do prazo na fila e reservas separadas
+e não retiradas expiram; o exemplar passa para o próximo da fila de
+espera. Para expirar as reservas na hora exata do prazo, use
+expirar_reservas.py.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from Backend.Emprestimo import Emprestimo
+from Backend.Notificacao import Notificacao
+from Backend.Reserva import Reserva
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--intervalo', type=float, default=None,
+                        help='minutos entre varreduras (padrão: roda uma vez)')
+    args = parser.parse_args()
+
+    while True:
+        inicio = time.perf_counter()
+        alterados = Emprestimo.varrer_atrasados()
+        avisos = Notificacao.gerar_alertas_atraso()
+        expiradas = Reserva.expirar_reservas_vencidas()
+        retiradas, promovidas = Reserva.expirar_retiradas_vencidas()
+        print(f"✓ {alterados} empréstimo(s) atualizados como atrasados, "
+              f"{avisos} aviso(s) criados, {expiradas + retiradas} reserva(s) expiradas e "
+              f"{promovidas} repassadas em {time.perf_counter() - inicio:.2f}s")
+
+        if args.intervalo is None:
+            return 0
+
+        try:
+            time.sleep(args.intervalo * 60)
+        except KeyboardInterrupt:
+            return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
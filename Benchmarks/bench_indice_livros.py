@@ -0,0 +1,102 @@
+"""Mede o índice invertido em memória (Backend/IndiceLivros.py) com um acervo grande.
+
+Gera livros sintéticos (sem banco), mede o tempo de construção, a latência
+de buscas típicas de "busca enquanto digita" e das atualizações
+incrementais.
+
+Uso:
+    python Benchmarks/bench_indice_livros.py [--livros 100000]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from Backend.IndiceLivros import IndiceLivros
+from Backend.Livro import Livro
+
+
+PALAVRAS = [
+    "amor", "memórias", "póstumas", "cortiço", "coração", "sertão", "veredas",
+    "história", "ciência", "computação", "algoritmos", "dados", "estruturas",
+    "programação", "música", "noite", "mar", "céu", "cidade", "ilusão", "ação",
+    "tempo", "guerra", "paz", "vida", "morte", "sonho", "viagem", "família",
+    "poesia", "crônicas", "contos", "país", "sol", "lua", "caminho", "jardim",
+]
+NOMES = ["Machado", "Clarice", "Jorge", "Cecília", "Graciliano", "Érico",
+         "Rachel", "Guimarães", "Lygia", "Adélia", "Conceição", "Aluísio"]
+SOBRENOMES = ["Assis", "Lispector", "Amado", "Meireles", "Ramos", "Veríssimo",
+              "Queiroz", "Rosa", "Telles", "Prado", "Evaristo", "Azevedo"]
+GENEROS = ["Romance", "Poesia", "Tecnologia", "História", "Ficção Científica",
+           "Literatura Brasileira", "Computação", "Ensaio", "Biografia"]
+
+CONSULTAS = ["c", "co", "cor", "coracao", "memo", "machado assis", "assis mem",
+             "978-85-1", "9788512", "ficcao cien", "xyz"]
+
+
+def gerar_livros(total: int) -> list[Livro]:
+
+    aleatorio = random.Random(7)
+    livros = []
+    for i in range(1, total + 1):
+        titulo = " ".join(aleatorio.sample(PALAVRAS, aleatorio.randint(2, 5))).title()
+        autor = f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}"
+        isbn = f"978-85-{aleatorio.randint(100, 999)}-{i:05d}-{i % 10}"
+        livros.append(Livro(titulo, autor, isbn, aleatorio.choice(GENEROS), id=i))
+    return livros
+
+
+def medir(funcao, repeticoes: int) -> list[float]:
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1_000_000)
+    return tempos
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--livros', type=int, default=100_000)
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+
+    livros = gerar_livros(args.livros)
+
+    inicio = time.perf_counter()
+    indice = IndiceLivros(livros)
+    construcao = time.perf_counter() - inicio
+
+    print(f"Livros: {len(indice)} | construção: {construcao:.2f}s")
+    print(f"{'consulta':<16}{'resultados':>11}{'mediana (µs)':>15}{'p95 (µs)':>12}")
+
+    for consulta in CONSULTAS:
+        resultados = indice.buscar(consulta, limite=20)
+        tempos = sorted(medir(lambda: indice.buscar(consulta, limite=20), args.repeticoes))
+        p95 = tempos[int(len(tempos) * 0.95) - 1]
+        print(f"{consulta:<16}{len(resultados):>11}{statistics.median(tempos):>15.0f}{p95:>12.0f}")
+
+    aleatorio = random.Random(11)
+    alvos = aleatorio.sample(livros, min(1000, len(livros)))
+
+    def atualizar():
+        livro = alvos[aleatorio.randrange(len(alvos))]
+        livro.nome = f"{livro.nome.split(' ')[0]} Revisado"
+        indice.adicionar(livro)
+
+    tempos = medir(atualizar, 1000)
+    print(f"Atualização incremental: mediana {statistics.median(tempos):.0f} µs")
+
+    tempos = medir(lambda: indice.remover(alvos[aleatorio.randrange(len(alvos))].id), 1000)
+    print(f"Remoção incremental: mediana {statistics.median(tempos):.0f} µs")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Mede a matrícula em lote de alunos/professores contra Usuario.salvar().
+
+Gera os registros em memória (um professor a cada 20), matricula todos
+com Usuario.matricular_em_lote e compara com uma amostra cadastrada um a
+um por salvar(). O tempo é dominado pelo hash das senhas (dezenas de ms
+cada com o custo padrão de Backend/Senhas.py): para medir só a gravação,
+rode com SENHA_ALGORITMO=pbkdf2-sha256 SENHA_PBKDF2_ITERACOES=1.
+
+Uso:
+    python Benchmarks/bench_matricula_lote.py [--usuarios 100000] [--lote 1000] [--processos N]
+
+Sem DB_BACKEND definido, roda contra um SQLite temporário.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def preparar_ambiente() -> None:
+
+    if not os.getenv('DB_BACKEND'):
+        os.environ['DB_BACKEND'] = 'sqlite'
+        os.environ['DB_SQLITE_PATH'] = os.path.join(
+            tempfile.mkdtemp(prefix='bench_matricula_'), 'biblioteca.db')
+
+
+def gerar_registros(quantidade: int, prefixo: str):
+
+    for i in range(quantidade):
+        if i % 20 == 0:
+            yield {
+                'nome': f'Professor {i}', 'email': f'{prefixo}.prof{i}@universidade.edu',
+                'senha': f'senha-{i}', 'tipo_usuario': 'Professor',
+                'matricula': f'{prefixo}P{i:07d}', 'departamento': 'Computação'}
+        else:
+            yield {
+                'nome': f'Aluno {i}', 'email': f'{prefixo}.aluno{i}@universidade.edu',
+                'senha': f'senha-{i}', 'tipo_usuario': 'Aluno',
+                'matricula': f'{prefixo}A{i:07d}', 'curso': 'Sistemas de Informação'}
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--usuarios', type=int, default=100_000)
+    parser.add_argument('--lote', type=int, default=1000)
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--amostra-salvar', type=int, default=500,
+                        help='usuários cadastrados um a um para comparação')
+    args = parser.parse_args()
+
+    preparar_ambiente()
+
+    from Backend.Aluno import Aluno
+    from Backend.Usuario import Usuario
+
+    prefixo = f'b{int(time.time())}'
+
+    resultado = Usuario.matricular_em_lote(
+        gerar_registros(args.usuarios, prefixo),
+        tamanho_lote=args.lote, processos=args.processos)
+
+    print(f"Em lote : {resultado.resumo()} em {resultado.segundos:.2f}s")
+
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(args.amostra_salvar):
+            Aluno(nome=f'Aluno {i}', email=f'{prefixo}.um{i}@universidade.edu',
+                  senha=f'senha-{i}', matricula=f'{prefixo}U{i:07d}',
+                  curso='Sistemas de Informação').salvar()
+    tempo_salvar = time.perf_counter() - inicio
+    por_segundo = args.amostra_salvar / tempo_salvar if tempo_salvar else 0.0
+
+    print(f"salvar(): {args.amostra_salvar} usuários em {tempo_salvar:.2f}s "
+          f"({por_segundo:.0f} usuários/s)")
+
+    meta = resultado.segundos < 60 or args.usuarios < 100_000
+    print(f"{'✓' if meta else '✗'} {args.usuarios} usuários em {resultado.segundos:.1f}s")
+    return 0 if meta and not resultado.rejeitados else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
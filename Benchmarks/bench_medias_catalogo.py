@@ -0,0 +1,143 @@
+"""Compara o número de consultas do catálogo antes e depois das médias em lote.
+
+Antes: Avaliacao.calcular_media_livro por livro na ordenação do professor e
+de novo em cada linha (2 consultas por livro). Depois: uma única consulta
+em Avaliacao.medias_por_livro, que lê a tabela AvaliacaoResumo. Também
+mede o AVG agrupado direto sobre Avaliacao, que o resumo substitui.
+
+Uso:
+    python Benchmarks/bench_medias_catalogo.py [--livros 1000] [--avaliacoes 5000]
+
+Sem DB_BACKEND definido, roda contra um SQLite temporário.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def preparar_ambiente() -> None:
+
+    if not os.getenv('DB_BACKEND'):
+        os.environ['DB_BACKEND'] = 'sqlite'
+        os.environ['DB_SQLITE_PATH'] = os.path.join(
+            tempfile.mkdtemp(prefix='bench_medias_'), 'biblioteca.db')
+
+
+def criar_massa(db, livros: int, avaliacoes: int) -> list[int]:
+
+    sufixo = str(int(time.time() * 1000))
+    cursor = db.connection.cursor()
+    cursor.executemany(
+        db.backend.translate(
+            "INSERT INTO Livro (Nome, Autor, ISBN, Genero) VALUES (?, ?, ?, ?)"),
+        [(f'Livro {i:05d}', f'Autor {i % 97}', f'BENCH-{sufixo}-{i}', 'Teste')
+         for i in range(livros)])
+    db.connection.commit()
+
+    ids = [row['Id'] for row in db.execute_query(
+        "SELECT Id FROM Livro WHERE ISBN LIKE ?", (f'BENCH-{sufixo}-%',))]
+
+    aleatorio = random.Random(42)
+    cursor.executemany(
+        db.backend.translate(
+            "INSERT INTO Avaliacao (LivroId, UsuarioId, Nota) VALUES (?, ?, ?)"),
+        [(aleatorio.choice(ids), aleatorio.randint(1, 5), aleatorio.randint(1, 5))
+         for _ in range(avaliacoes)])
+    db.connection.commit()
+    cursor.close()
+
+    return ids
+
+
+class ContadorConsultas:
+    """Conta os comandos enviados ao banco interceptando a tradução do backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.total = 0
+        self._original = backend.translate
+
+    def __enter__(self):
+        def traduzir(query):
+            self.total += 1
+            return self._original(query)
+        self.backend.translate = traduzir
+        return self
+
+    def __exit__(self, *exc):
+        self.backend.translate = self._original
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--livros', type=int, default=1000)
+    parser.add_argument('--avaliacoes', type=int, default=5000)
+    args = parser.parse_args()
+
+    preparar_ambiente()
+
+    from Backend.Avaliacao import Avaliacao
+    from Banco_de_dados.backends import get_backend
+    from Banco_de_dados.connection import DatabaseConnection
+
+    db = DatabaseConnection()
+    try:
+        db.connect()
+        ids = criar_massa(db, args.livros, args.avaliacoes)
+    finally:
+        db.close()
+
+    # A massa entra direto na tabela, sem passar por Avaliacao.salvar
+    Avaliacao.reconstruir_resumos()
+
+    backend = get_backend()
+
+    with ContadorConsultas(backend) as antes:
+        inicio = time.perf_counter()
+        ordenacao = {livro_id: Avaliacao.calcular_media_livro(livro_id) for livro_id in ids}
+        linhas = [Avaliacao.calcular_media_livro(livro_id) for livro_id in ids]
+        tempo_antes = time.perf_counter() - inicio
+
+    with ContadorConsultas(backend) as depois:
+        inicio = time.perf_counter()
+        resumos = Avaliacao.medias_por_livro(ids)
+        tempo_depois = time.perf_counter() - inicio
+
+    db = DatabaseConnection()
+    try:
+        inicio = time.perf_counter()
+        agregado = {row['LivroId']: round(float(row['Media']), 1) for row in db.execute_query("""
+            SELECT LivroId, AVG(CAST(Nota AS FLOAT)) as Media
+            FROM Avaliacao WHERE Ativa = 1 GROUP BY LivroId
+            """)}
+        tempo_agregado = time.perf_counter() - inicio
+    finally:
+        db.close()
+
+    divergentes = [livro_id for livro_id in ids
+                   if not (ordenacao[livro_id]
+                           == resumos.get(livro_id, {}).get('media', 0.0)
+                           == agregado.get(livro_id, 0.0))]
+
+    print(f"Backend: {os.environ['DB_BACKEND']} | livros: {len(ids)} | avaliações: {args.avaliacoes}")
+    print(f"Antes  (calcular_media_livro x2 por livro): {antes.total:5d} consultas em {tempo_antes * 1000:8.1f} ms")
+    print(f"Depois (medias_por_livro):                  {depois.total:5d} consultas em {tempo_depois * 1000:8.1f} ms")
+    print(f"AVG agrupado direto sobre Avaliacao:            1 consulta  em {tempo_agregado * 1000:8.1f} ms")
+
+    if divergentes or len(linhas) != len(ids):
+        print(f"✗ {len(divergentes)} médias divergentes")
+        return 1
+
+    print("✓ Mesmas médias em todos os caminhos")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
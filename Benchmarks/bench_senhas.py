@@ -0,0 +1,83 @@
+"""Mede o custo de cada configuração de hash de senha e dimensiona a CPU do pico de logins.
+
+Para cada custo (scrypt com n de 2**13 a 2**16 e PBKDF2 de 100 mil a 1,2
+milhão de iterações) gera e confere hashes como o login faz e estima
+quantos logins por segundo um núcleo aguenta e quantos núcleos o pico
+pedido precisa. A linha marcada com * é a configuração atual
+(SENHA_ALGORITMO / SENHA_SCRYPT_N / SENHA_PBKDF2_ITERACOES).
+
+Uso:
+    python Benchmarks/bench_senhas.py [--pico 3000] [--amostras 10]
+
+--pico é o número de logins por minuto no horário de maior movimento
+(início das aulas da manhã). Não usa o banco.
+"""
+import argparse
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from Backend import Senhas
+
+
+CUSTOS = [
+    {'algoritmo': Senhas.SCRYPT, 'n': 2 ** 13, 'r': 8, 'p': 1},
+    {'algoritmo': Senhas.SCRYPT, 'n': 2 ** 14, 'r': 8, 'p': 1},
+    {'algoritmo': Senhas.SCRYPT, 'n': 2 ** 15, 'r': 8, 'p': 1},
+    {'algoritmo': Senhas.SCRYPT, 'n': 2 ** 16, 'r': 8, 'p': 1},
+    {'algoritmo': Senhas.PBKDF2, 'i': 100_000},
+    {'algoritmo': Senhas.PBKDF2, 'i': 600_000},
+    {'algoritmo': Senhas.PBKDF2, 'i': 1_200_000},
+]
+
+
+def medir(parametros: dict, amostras: int) -> float:
+    """Mediana, em segundos, de uma verificação de senha com esse custo"""
+
+    hash_senha = Senhas.gerar_hash('senha-de-teste', parametros)
+    tempos = []
+    for _ in range(amostras):
+        inicio = time.perf_counter()
+        if not Senhas.verificar_senha('senha-de-teste', hash_senha):
+            raise RuntimeError(f"Hash não confere para {parametros}")
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def descrever(parametros: dict) -> str:
+    if parametros['algoritmo'] == Senhas.SCRYPT:
+        memoria = 128 * parametros['r'] * parametros['n'] / (1024 * 1024)
+        return f"scrypt n=2**{int(math.log2(parametros['n']))} ({memoria:.0f} MiB)"
+    return f"pbkdf2-sha256 i={parametros['i']:,}".replace(',', '.')
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pico', type=int, default=3000,
+                        help='logins por minuto no pico (padrão: 3000)')
+    parser.add_argument('--amostras', type=int, default=10)
+    args = parser.parse_args()
+
+    atual = Senhas.parametros_configurados()
+    custos = CUSTOS if atual in CUSTOS else CUSTOS + [atual]
+    por_segundo = args.pico / 60
+
+    print(f"Pico: {args.pico} logins/min ({por_segundo:.1f}/s)")
+    print(f"  {'configuração':<30} {'ms/login':>9} {'logins/s/núcleo':>16} {'núcleos':>8}")
+    for parametros in custos:
+        segundos = medir(parametros, args.amostras)
+        nucleos = math.ceil(por_segundo * segundos) or 1
+        marca = '*' if parametros == atual else ' '
+        print(f"{marca} {descrever(parametros):<30} {segundos * 1000:9.1f} "
+              f"{1 / segundos:16.1f} {nucleos:8d}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Teste de estresse da retirada atômica de empréstimos.
+
+Dispara muitas retiradas simultâneas do mesmo livro e confere que o estoque
+nunca é ultrapassado e que nenhum usuário passa do limite de empréstimos.
+
+Uso:
+    python Benchmarks/stress_emprestimo.py [--threads 64] [--usuarios 200] [--copias 5]
+
+Sem DB_BACKEND definido, roda contra um SQLite temporário.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def preparar_ambiente(threads: int) -> None:
+
+    if not os.getenv('DB_BACKEND'):
+        os.environ['DB_BACKEND'] = 'sqlite'
+        os.environ['DB_SQLITE_PATH'] = os.path.join(
+            tempfile.mkdtemp(prefix='stress_emprestimo_'), 'biblioteca.db')
+
+    os.environ.setdefault('DB_POOL_MAX_SIZE', str(threads))
+
+
+def criar_massa(db, usuarios: int, copias: int) -> tuple[int, list[int]]:
+
+    sufixo = str(int(time.time() * 1000))
+    db.execute_non_query(
+        "INSERT INTO Livro (Nome, Autor, ISBN, Genero, Quantidade) VALUES (?, ?, ?, ?, ?)",
+        ('Livro Disputado', 'Autor Estresse', f'STRESS-{sufixo}', 'Teste', copias))
+    livro_id = db.last_insert_id()
+
+    usuario_ids = []
+    for i in range(usuarios):
+        db.execute_non_query(
+            "INSERT INTO Usuario (Nome, Email, Senha, TipoUsuario, Matricula) VALUES (?, ?, ?, ?, ?)",
+            (f'Aluno Estresse {i}', f'stress{i}.{sufixo}@estudante.com',
+             'x', 'Aluno', f'ST{i}'))
+        usuario_ids.append(db.last_insert_id())
+
+    return livro_id, usuario_ids
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--usuarios', type=int, default=200)
+    parser.add_argument('--copias', type=int, default=5)
+    parser.add_argument('--tentativas-por-usuario', type=int, default=5)
+    args = parser.parse_args()
+
+    preparar_ambiente(args.threads)
+
+    from Backend.Emprestimo import Emprestimo
+    from Banco_de_dados.connection import DatabaseConnection, pool_stats
+
+    db = DatabaseConnection()
+    try:
+        livro_id, usuario_ids = criar_massa(db, args.usuarios, args.copias)
+    finally:
+        db.close()
+
+    # Cada usuário tenta pegar o mesmo livro várias vezes, além de outros
+    # livros do acervo, para exercitar o limite por usuário ao mesmo tempo
+    tarefas = []
+    for usuario_id in usuario_ids:
+        for tentativa in range(args.tentativas_por_usuario):
+            tarefas.append((usuario_id, livro_id if tentativa % 2 == 0 else 1 + tentativa % 6))
+
+    resultados = {'sucesso': 0, 'recusado': 0}
+    trava = threading.Lock()
+    largada = threading.Barrier(args.threads)
+    fila = iter(tarefas)
+    fila_trava = threading.Lock()
+
+    def trabalhador():
+        largada.wait()
+        while True:
+            with fila_trava:
+                tarefa = next(fila, None)
+            if tarefa is None:
+                return
+            usuario_id, alvo = tarefa
+            sucesso, _ = Emprestimo(usuario_id=usuario_id, livro_id=alvo, biblioteca_id=1).salvar()
+            with trava:
+                resultados['sucesso' if sucesso else 'recusado'] += 1
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=trabalhador) for _ in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracao = time.perf_counter() - inicio
+
+    db = DatabaseConnection()
+    try:
+        emprestados = db.execute_scalar(
+            "SELECT COUNT(*) FROM Emprestimo WHERE LivroId = ? AND Status IN ('Emprestado', 'Atrasado')",
+            (livro_id,))
+        contador = db.execute_scalar(
+            "SELECT QuantidadeEmprestada FROM Livro WHERE Id = ?", (livro_id,))
+        maior_por_usuario = db.execute_scalar("""
+            SELECT ISNULL(MAX(Total), 0) FROM (
+                SELECT UsuarioId, COUNT(*) as Total FROM Emprestimo
+                WHERE Status IN ('Emprestado', 'Atrasado')
+                GROUP BY UsuarioId) t
+            """)
+    finally:
+        db.close()
+
+    print(f"Backend: {os.environ['DB_BACKEND']} | threads: {args.threads} | tentativas: {len(tarefas)}")
+    print(f"Concluído em {duracao:.2f}s ({len(tarefas) / duracao:.0f} retiradas/s)")
+    print(f"Aceitas: {resultados['sucesso']} | recusadas: {resultados['recusado']}")
+    print(f"Livro disputado: {emprestados}/{args.copias} cópias emprestadas (contador: {contador})")
+    print(f"Maior número de empréstimos ativos por usuário: {maior_por_usuario}")
+    print(f"Pool: {pool_stats()}")
+
+    ok = (emprestados == args.copias == contador
+          and maior_por_usuario <= Emprestimo.LIMITE_EMPRESTIMOS)
+    print("✓ Nenhum excesso de empréstimo" if ok else "✗ Estoque ou limite ultrapassado!")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from Frontend.tarefas_ui import ExecutorTarefas
+
+
+class BuscaIncremental:
+    """Busca enquanto o usuário digita, sem ir ao banco a cada tecla.
+
+    - Debounce: agendar(texto) só dispara a busca depois de atraso_ms sem
+      novas teclas.
+    - Cancelamento: cada busca usa a mesma chave no ExecutorTarefas, então
+      uma busca nova descarta o resultado da anterior que ainda estiver
+      rodando.
+    - Cache por prefixo: os resultados ficam guardados pela consulta. Se o
+      texto novo apenas estende uma consulta já respondida por completo
+      ("dom" -> "dom casm"), o resultado é filtrado localmente com
+      filtrar(itens, texto) em vez de consultar o banco de novo; se
+      filtrar devolver None, a consulta vai ao banco.
+
+    buscar(texto) roda fora da thread do Tk; exibir(texto, itens) e
+    ao_limpar() rodam nela.
+    """
+
+    def __init__(
+            self,
+            root,
+            tarefas: ExecutorTarefas,
+            buscar: Callable[[str], list],
+            exibir: Callable[[str, list], None],
+            filtrar: Optional[Callable[[list, str], list]] = None,
+            ao_limpar: Optional[Callable[[], None]] = None,
+            atraso_ms: int = 250,
+            limite: Optional[int] = None,
+            chave: str = "busca",
+            max_consultas: int = 32):
+
+        self._root = root
+        self._tarefas = tarefas
+        self._buscar = buscar
+        self._exibir = exibir
+        self._filtrar = filtrar
+        self._ao_limpar = ao_limpar
+        self.atraso_ms = atraso_ms
+        self._limite = limite
+        self._chave = chave
+        self._max_consultas = max_consultas
+
+        # consulta -> (itens, completo); completo indica que o resultado não
+        # foi cortado pelo limite e pode servir de base para filtrar
+        self._cache: OrderedDict[str, tuple[list, bool]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._versao = 0
+        self._agendamento = None
+        self.consultas_banco = 0
+        self.filtragens_locais = 0
+
+    @staticmethod
+    def normalizar_consulta(texto: str) -> str:
+        return " ".join((texto or "").split()).casefold()
+
+    def agendar(self, texto: str) -> None:
+        """Reinicia a contagem do debounce com o texto atual"""
+
+        self._cancelar_agendamento()
+        self._agendamento = self._root.after(
+            self.atraso_ms, lambda: self.buscar_agora(texto))
+
+    def buscar_agora(self, texto: str) -> None:
+
+        self._cancelar_agendamento()
+        consulta = self.normalizar_consulta(texto)
+
+        if not consulta:
+            self._tarefas.cancelar(self._chave)
+            if self._ao_limpar is not None:
+                self._ao_limpar()
+            return
+
+        local = self._resolver_localmente(consulta)
+        if local is not None:
+            # Uma busca anterior ainda em andamento não deve sobrescrever esta
+            self._tarefas.cancelar(self._chave)
+            self._exibir(texto, local)
+            return
+
+        versao = self._versao
+
+        def concluir(itens):
+            # Se o cache foi invalidado durante a consulta, o resultado
+            # ainda é exibido, mas não serve de base para as próximas
+            if versao == self._versao:
+                self._guardar(consulta, itens, self._completo(itens))
+            self._exibir(texto, itens)
+
+        self.consultas_banco += 1
+        self._tarefas.executar(
+            self._buscar, consulta,
+            ao_concluir=concluir,
+            ao_falhar=lambda e: print(f"✗ Erro na busca: {e}"),
+            chave=self._chave)
+
+    def cancelar(self) -> None:
+        """Descarta a busca agendada ou em andamento"""
+
+        self._cancelar_agendamento()
+        self._tarefas.cancelar(self._chave)
+
+    def invalidar(self) -> None:
+        """Esquece os resultados guardados (dados mudaram no banco).
+
+        Pode ser chamado de qualquer thread.
+        """
+        with self._lock:
+            self._versao += 1
+            self._cache.clear()
+
+    def _cancelar_agendamento(self) -> None:
+        if self._agendamento is not None:
+            self._root.after_cancel(self._agendamento)
+            self._agendamento = None
+
+    def _completo(self, itens: list) -> bool:
+        return self._limite is None or len(itens) < self._limite
+
+    def _resolver_localmente(self, consulta: str) -> Optional[list]:
+        """Resultado exato do cache ou filtrado da maior consulta anterior
+        da qual esta é continuação"""
+
+        with self._lock:
+            if consulta in self._cache:
+                self._cache.move_to_end(consulta)
+                return list(self._cache[consulta][0])
+
+            if self._filtrar is None:
+                return None
+
+            base = None
+            for anterior, (itens, completo) in self._cache.items():
+                if completo and consulta.startswith(anterior):
+                    if base is None or len(anterior) > len(base[0]):
+                        base = (anterior, itens)
+
+        if base is None:
+            return None
+
+        itens = self._filtrar(base[1], consulta)
+        if itens is None:
+            return None
+        self.filtragens_locais += 1
+        self._guardar(consulta, itens, True)
+        return list(itens)
+
+    def _guardar(self, consulta: str, itens: list, completo: bool) -> None:
+
+        with self._lock:
+            self._cache[consulta] = (list(itens), completo)
+            self._cache.move_to_end(consulta)
+            while len(self._cache) > self._max_consultas:
+                self._cache.popitem(last=False)
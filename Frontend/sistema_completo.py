@@ -4,9 +4,12 @@ import os
 from pathlib import Path
 from tkinter import messagebox, simpledialog
 from typing import Optional, List
-import threading
 sys.path.append(str(Path(__file__).parent.parent))
 
+from Frontend.tabela_virtual import TabelaVirtual
+from Frontend.tarefas_ui import ExecutorTarefas
+from Frontend.busca_incremental import BuscaIncremental
+
 
 ctk.set_appearance_mode("light")
 ctk.set_default_color_theme("blue")
@@ -21,6 +24,7 @@ try:
     from Backend.Avaliacao import Avaliacao
     from Backend.Reserva import Reserva, StatusReserva
     from Backend.Emprestimo import Emprestimo
+    from Backend.AgendadorExpiracoes import obter_agendador, parar_agendador
     BACKEND_DISPONIVEL = True
     print("✅ Backend disponível - Modo integrado completo")
 except ImportError as e:
@@ -47,6 +51,19 @@ class SistemaBibliotecaCompleto:
     - Interfaces específicas por tipo de usuário
     """
 
+    # Livros/usuários trazidos do banco a cada "Carregar mais"
+    TAMANHO_PAGINA = 50
+    # Avaliações exibidas por vez no modal do livro
+    TAMANHO_PAGINA_AVALIACOES = 20
+    # Intervalo entre as varreduras de empréstimos atrasados
+    INTERVALO_VARREDURA_MS = 60 * 60 * 1000
+    # Intervalo entre as consultas de notificações novas (contador do sino)
+    INTERVALO_NOTIFICACOES_MS = 5000
+    # Campos lidos pelas listas (o resto só ao abrir/editar um item)
+    CAMPOS_LISTA_USUARIOS = ('nome', 'email', 'tipo_usuario', 'matricula',
+                             'curso', 'departamento', 'ativo')
+    CAMPOS_CATALOGO = ('nome', 'autor', 'isbn', 'genero', 'quantidade_disponivel')
+
     def __init__(self):
         self.root = ctk.CTk()
         self.root.title("Sistema de Biblioteca - Completo e Integrado")
@@ -55,7 +72,39 @@ class SistemaBibliotecaCompleto:
 
         self.usuario_logado: Optional[Usuario] = None
         self.livros_atuais: List[Livro] = []
+        self.cursor_livros: Optional[str] = None
         self.incluir_inativos = False
+        self.notificacoes_btn = None
+        self.ultima_notificacao_id = 0
+        # Livros separados pela fila de espera para o usuário logado retirar
+        self.retiradas_pendentes: set = set()
+        self.agendamento_notificacoes = None
+
+        # Chamadas ao banco disparadas pelos botões rodam fora da thread do Tk
+        self.tarefas = ExecutorTarefas(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar_janela)
+
+        self.busca_livros = BuscaIncremental(
+            self.root, self.tarefas,
+            buscar=self.consultar_livros,
+            exibir=self.exibir_busca_livros,
+            filtrar=self.filtrar_livros if BACKEND_DISPONIVEL else None,
+            ao_limpar=self.carregar_livros_completo,
+            limite=200,
+            chave="busca_livros")
+        self.busca_catalogo = BuscaIncremental(
+            self.root, self.tarefas,
+            buscar=self.consultar_catalogo,
+            exibir=self.exibir_busca_catalogo,
+            filtrar=self.filtrar_catalogo if BACKEND_DISPONIVEL else None,
+            ao_limpar=self.carregar_catalogo_livros,
+            limite=100,
+            chave="busca_catalogo")
+        if BACKEND_DISPONIVEL:
+            Livro.registrar_ouvinte(self.ao_alterar_livro)
+            self.varrer_atrasados()
+            # Expira reservas e retiradas vencidas no prazo, em segundo plano
+            obter_agendador().iniciar()
 
         self.criar_tela_selecao_usuario()
 
@@ -232,7 +281,7 @@ class SistemaBibliotecaCompleto:
         )
         self.senha_entry.pack(pady=(0, 25))
 
-        login_btn = ctk.CTkButton(
+        self.login_btn = ctk.CTkButton(
             login_frame,
             text=f"🚀 Entrar como {self.tipo_usuario_selecionado}",
             command=self.fazer_login,
@@ -242,7 +291,7 @@ class SistemaBibliotecaCompleto:
             fg_color=cores[self.tipo_usuario_selecionado],
             hover_color=cores[self.tipo_usuario_selecionado]
         )
-        login_btn.pack(pady=(0, 30))
+        self.login_btn.pack(pady=(0, 30))
 
         self.root.bind('<Return>', lambda event: self.fazer_login())
 
@@ -255,8 +304,8 @@ class SistemaBibliotecaCompleto:
 
             if self.tipo_usuario_selecionado in emails:
 
-                threading.Timer(0.5, lambda: self.email_entry.insert(
-                    0, emails[self.tipo_usuario_selecionado])).start()
+                self.root.after(500, lambda: self.email_entry.insert(
+                    0, emails[self.tipo_usuario_selecionado]))
 
     def fazer_login(self):
         """Realiza o login com autenticação real ou simulada"""
@@ -269,24 +318,34 @@ class SistemaBibliotecaCompleto:
 
         if BACKEND_DISPONIVEL:
 
-            sucesso, usuario, mensagem = Usuario.autenticar(email, senha)
+            self.tarefas.executar(
+                Usuario.autenticar, email, senha,
+                ao_concluir=self.concluir_login,
+                ao_falhar=lambda e: messagebox.showerror(
+                    "Erro de Login", f"Erro ao autenticar: {str(e)}"),
+                chave="login",
+                desabilitar=[self.login_btn])
+        else:
 
-            if sucesso and usuario:
+            self.fazer_login_simulado(email, senha)
 
-                if usuario.tipo_usuario != self.tipo_usuario_selecionado:
-                    messagebox.showerror(
-                        "Erro de Tipo",
-                        f"Este usuário é do tipo '{usuario.tipo_usuario}', mas você selecionou '{self.tipo_usuario_selecionado}'.\n\nPor favor, selecione o tipo correto."
-                    )
-                    return
+    def concluir_login(self, resultado):
+        """Trata o retorno de Usuario.autenticar na thread da interface"""
+        sucesso, usuario, mensagem = resultado
 
-                self.usuario_logado = usuario
-                self.redirecionar_por_tipo_usuario()
-            else:
-                messagebox.showerror("Erro de Login", mensagem)
-        else:
+        if sucesso and usuario:
 
-            self.fazer_login_simulado(email, senha)
+            if usuario.tipo_usuario != self.tipo_usuario_selecionado:
+                messagebox.showerror(
+                    "Erro de Tipo",
+                    f"Este usuário é do tipo '{usuario.tipo_usuario}', mas você selecionou '{self.tipo_usuario_selecionado}'.\n\nPor favor, selecione o tipo correto."
+                )
+                return
+
+            self.usuario_logado = usuario
+            self.redirecionar_por_tipo_usuario()
+        else:
+            messagebox.showerror("Erro de Login", mensagem)
 
     def fazer_login_simulado(self, email: str, senha: str):
         """Simula login para modo sem backend"""
@@ -471,7 +530,8 @@ class SistemaBibliotecaCompleto:
             width=300)
         self.search_entry_livros.pack(side="left", padx=(0, 10), pady=10)
         self.search_entry_livros.bind(
-            "<KeyRelease>", lambda e: self.buscar_livros())
+            "<KeyRelease>",
+            lambda e: self.busca_livros.agendar(self.search_entry_livros.get()))
 
         ctk.CTkButton(
             search_frame,
@@ -503,194 +563,192 @@ class SistemaBibliotecaCompleto:
             header_frame.grid_columnconfigure(
                 i, weight=1 if i in [0, 1] else 0)
 
-        self.livros_content_frame = ctk.CTkScrollableFrame(
-            list_frame, height=300)
-        self.livros_content_frame.pack(
-            fill="both", expand=True, padx=5, pady=5)
+        self.tabela_livros = TabelaVirtual(
+            list_frame,
+            criar_linha=self.criar_linha_livro,
+            preencher_linha=self.preencher_linha_livro,
+            ao_selecionar=self.selecionar_livro,
+            height=300)
+        self.tabela_livros.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.btn_carregar_mais_livros = ctk.CTkButton(
+            list_frame,
+            text="⬇️ Carregar mais",
+            command=self.carregar_mais_livros,
+            width=200,
+            fg_color="#6C757D",
+            hover_color="#545B62")
 
         self.livro_selecionado = None
-        self.linha_selecionada = None
 
     def toggle_livros_inativos(self):
         """Alterna a exibição de livros inativos"""
         self.incluir_inativos = self.switch_inativos.get()
+        self.busca_livros.invalidar()
         self.carregar_livros_completo()
 
     def carregar_livros_completo(self):
         """Carrega e exibe a lista completa de livros"""
 
-        self.linha_selecionada = None
         self.livro_selecionado = None
 
         if hasattr(self, 'btn_toggle_status'):
             self.atualizar_botao_status()
 
-        for widget in self.livros_content_frame.winfo_children():
-            widget.destroy()
+        self.cursor_livros = None
 
         if BACKEND_DISPONIVEL:
+            self.livros_atuais = []
+            self.tabela_livros.definir_itens(
+                [], mensagem_vazia="📭 Nenhum livro cadastrado")
+            self.carregar_mais_livros()
+        else:
+            self.livros_atuais = self.obter_livros_simulados()
+            self.tabela_livros.definir_itens(self.livros_atuais)
+            self.atualizar_stats_livros()
+
+    def carregar_mais_livros(self):
+        """Busca a próxima página de livros e acrescenta à lista"""
+
+        def concluir(resultado):
+            pagina, self.cursor_livros = resultado
 
-            self.livros_atuais = Livro.listar_todos(
-                limite=1000, incluir_inativos=self.incluir_inativos)
+            self.tabela_livros.acrescentar_itens(pagina)
+            self.livros_atuais = self.tabela_livros.itens
+
+            self.atualizar_stats_livros()
+            self.atualizar_botao_carregar_mais_livros()
+
+        # Mesma chave: recarregar a lista descarta a página ainda pendente
+        self.tarefas.executar(
+            Livro.listar_pagina, self.cursor_livros,
+            limite=self.TAMANHO_PAGINA,
+            incluir_inativos=self.incluir_inativos,
+            ao_concluir=concluir,
+            ao_falhar=lambda e: print(f"Erro ao carregar livros: {e}"),
+            chave="pagina_livros",
+            desabilitar=[self.btn_carregar_mais_livros])
+
+    def atualizar_botao_carregar_mais_livros(self):
+
+        if self.cursor_livros:
+            self.btn_carregar_mais_livros.pack(pady=(0, 10))
         else:
+            self.btn_carregar_mais_livros.pack_forget()
 
-            self.livros_atuais = self.obter_livros_simulados()
+    def atualizar_stats_livros(self):
 
         total_livros = len(self.livros_atuais)
         ativos = len(
             [l for l in self.livros_atuais if getattr(l, 'ativo', True)])
         inativos = total_livros - ativos
 
-        stats_texto = f"📊 Total: {total_livros} | ✅ Ativos: {ativos} | ❌ Inativos: {inativos}"
+        rotulo = "Exibidos" if self.cursor_livros else "Total"
+        stats_texto = f"📊 {rotulo}: {total_livros} | ✅ Ativos: {ativos} | ❌ Inativos: {inativos}"
         self.stats_label.configure(text=stats_texto)
 
-        for i, livro in enumerate(self.livros_atuais):
-            self.criar_linha_livro(livro, i)
-
-    def criar_linha_livro(self, livro: Livro, index: int):
-        """Cria uma linha na tabela de livros com seleção visual"""
-        row_frame = ctk.CTkFrame(self.livros_content_frame)
-        row_frame.pack(fill="x", pady=1, padx=2)
+    def criar_linha_livro(self, row_frame) -> dict:
+        """Cria os widgets de uma linha da tabela de livros (reaproveitada na rolagem)"""
 
         for j in range(9):
             row_frame.grid_columnconfigure(j, weight=1 if j in [0, 1] else 0)
 
-        ativo = getattr(livro, 'ativo', True)
-        cor_status = "#28A745" if ativo else "#DC3545"
-        status_texto = "✅ Ativo" if ativo else "❌ Inativo"
-
-        row_frame.bind("<Button-1>", lambda e, l=livro,
-                       f=row_frame: self.selecionar_livro_visual(l, f))
-
-        titulo_texto = livro.nome[:35] + \
-            "..." if len(livro.nome) > 35 else livro.nome
-        titulo_label = ctk.CTkLabel(
-            row_frame, text=titulo_texto, font=ctk.CTkFont(weight="bold"))
-        titulo_label.grid(row=0, column=0, padx=5, pady=8, sticky="w")
-        titulo_label.bind("<Button-1>", lambda e, l=livro,
-                          f=row_frame: self.selecionar_livro_visual(l, f))
-
-        autor_label = ctk.CTkLabel(row_frame, text=livro.autor)
-        autor_label.grid(row=0, column=1, padx=5, pady=8)
-        autor_label.bind("<Button-1>", lambda e, l=livro,
-                         f=row_frame: self.selecionar_livro_visual(l, f))
-
-        isbn_label = ctk.CTkLabel(row_frame, text=livro.isbn)
-        isbn_label.grid(row=0, column=2, padx=5, pady=8)
-        isbn_label.bind("<Button-1>", lambda e, l=livro,
-                        f=row_frame: self.selecionar_livro_visual(l, f))
-
-        genero_label = ctk.CTkLabel(row_frame, text=livro.genero)
-        genero_label.grid(row=0, column=3, padx=5, pady=8)
-        genero_label.bind("<Button-1>", lambda e, l=livro,
-                          f=row_frame: self.selecionar_livro_visual(l, f))
-
-        quantidade_total = getattr(livro, 'quantidade_total', 5)
-        quantidade_disponivel = getattr(
-            livro, 'quantidade_disponivel', quantidade_total)
-        quantidade_emprestada = getattr(livro, 'quantidade_emprestada', 0)
-
-        quantidade_label = ctk.CTkLabel(
-            row_frame,
-            text=str(quantidade_total),
-            font=ctk.CTkFont(
-                weight="bold"))
-        quantidade_label.grid(row=0, column=4, padx=5, pady=8)
-        quantidade_label.bind("<Button-1>", lambda e, l=livro,
-                              f=row_frame: self.selecionar_livro_visual(l, f))
-
-        disponiveis_label = ctk.CTkLabel(
-            row_frame,
-            text=str(quantidade_disponivel),
-            text_color="#28A745")
-        disponiveis_label.grid(row=0, column=5, padx=5, pady=8)
-        disponiveis_label.bind("<Button-1>", lambda e, l=livro,
-                               f=row_frame: self.selecionar_livro_visual(l, f))
-
-        emprestados_label = ctk.CTkLabel(
-            row_frame,
-            text=str(quantidade_emprestada),
-            text_color="#DC3545")
-        emprestados_label.grid(row=0, column=6, padx=5, pady=8)
-        emprestados_label.bind("<Button-1>", lambda e, l=livro,
-                               f=row_frame: self.selecionar_livro_visual(l, f))
+        linha = {
+            'titulo': ctk.CTkLabel(row_frame, text="", font=ctk.CTkFont(weight="bold")),
+            'autor': ctk.CTkLabel(row_frame, text=""),
+            'isbn': ctk.CTkLabel(row_frame, text=""),
+            'genero': ctk.CTkLabel(row_frame, text=""),
+            'quantidade': ctk.CTkLabel(row_frame, text="", font=ctk.CTkFont(weight="bold")),
+            'disponiveis': ctk.CTkLabel(row_frame, text="", text_color="#28A745"),
+            'emprestados': ctk.CTkLabel(row_frame, text="", text_color="#DC3545"),
+            'status': ctk.CTkLabel(row_frame, text="", font=ctk.CTkFont(weight="bold")),
+        }
 
-        status_label = ctk.CTkLabel(
-            row_frame,
-            text=status_texto,
-            text_color=cor_status,
-            font=ctk.CTkFont(
-                weight="bold"))
-        status_label.grid(row=0, column=7, padx=5, pady=8)
-        status_label.bind("<Button-1>", lambda e, l=livro,
-                          f=row_frame: self.selecionar_livro_visual(l, f))
+        linha['titulo'].grid(row=0, column=0, padx=5, pady=8, sticky="w")
+        for coluna, chave in enumerate(
+                ['autor', 'isbn', 'genero', 'quantidade', 'disponiveis', 'emprestados', 'status'],
+                start=1):
+            linha[chave].grid(row=0, column=coluna, padx=5, pady=8)
 
         actions_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
         actions_frame.grid(row=0, column=8, padx=5, pady=4)
 
-        ctk.CTkButton(
+        linha['detalhes'] = ctk.CTkButton(
             actions_frame,
             text="👁️",
-            command=lambda: self.mostrar_detalhes_livro(livro),
             width=30,
             height=25,
             fg_color="#17A2B8",
             hover_color="#117A8B"
-        ).pack(side="left", padx=2)
+        )
+        linha['detalhes'].pack(side="left", padx=2)
 
-        ctk.CTkButton(
+        linha['editar'] = ctk.CTkButton(
             actions_frame,
             text="✏️",
-            command=lambda: self.mostrar_formulario_livro(livro),
             width=30,
             height=25,
             fg_color="#FFC107",
             hover_color="#E0A800"
-        ).pack(side="left", padx=2)
+        )
+        linha['editar'].pack(side="left", padx=2)
+
+        linha['status_btn'] = ctk.CTkButton(
+            actions_frame,
+            text="",
+            width=30,
+            height=25
+        )
+        linha['status_btn'].pack(side="left", padx=2)
+
+        return linha
+
+    def preencher_linha_livro(self, linha: dict, livro: Livro, index: int):
+        """Exibe o livro numa linha já criada da tabela"""
+
+        ativo = getattr(livro, 'ativo', True)
+        cor_status = "#28A745" if ativo else "#DC3545"
+        status_texto = "✅ Ativo" if ativo else "❌ Inativo"
+
+        titulo_texto = livro.nome[:35] + \
+            "..." if len(livro.nome) > 35 else livro.nome
+
+        quantidade_total = getattr(livro, 'quantidade_total', 5)
+        quantidade_disponivel = getattr(
+            livro, 'quantidade_disponivel', quantidade_total)
+        quantidade_emprestada = getattr(livro, 'quantidade_emprestada', 0)
+
+        linha['titulo'].configure(text=titulo_texto)
+        linha['autor'].configure(text=livro.autor)
+        linha['isbn'].configure(text=livro.isbn)
+        linha['genero'].configure(text=livro.genero)
+        linha['quantidade'].configure(text=str(quantidade_total))
+        linha['disponiveis'].configure(text=str(quantidade_disponivel))
+        linha['emprestados'].configure(text=str(quantidade_emprestada))
+        linha['status'].configure(text=status_texto, text_color=cor_status)
+
+        linha['detalhes'].configure(
+            command=lambda: self.mostrar_detalhes_livro(livro))
+        linha['editar'].configure(
+            command=lambda: self.mostrar_formulario_livro(livro))
 
         if ativo:
-            ctk.CTkButton(
-                actions_frame,
+            linha['status_btn'].configure(
                 text="❌",
                 command=lambda: self.inativar_livro(livro),
-                width=30,
-                height=25,
                 fg_color="#DC3545",
-                hover_color="#C82333"
-            ).pack(side="left", padx=2)
+                hover_color="#C82333")
         else:
-            ctk.CTkButton(
-                actions_frame,
+            linha['status_btn'].configure(
                 text="✅",
                 command=lambda: self.ativar_livro(livro),
-                width=30,
-                height=25,
                 fg_color="#28A745",
-                hover_color="#1E7E34"
-            ).pack(side="left", padx=2)
+                hover_color="#1E7E34")
 
-    def selecionar_livro_visual(self, livro: Livro, row_frame):
-        """Seleciona um livro com destaque visual"""
-        try:
-
-            if hasattr(self, 'linha_selecionada') and self.linha_selecionada:
-                try:
-                    self.linha_selecionada.configure(
-                        fg_color=["gray92", "gray14"])
-                except Exception:
-                    pass
-
-            row_frame.configure(fg_color=["#E3F2FD", "#1E3A8A"])
-
-            self.livro_selecionado = livro
-            self.linha_selecionada = row_frame
-
-            self.atualizar_botao_status()
-        except Exception as e:
-            print(f"Erro na seleção visual: {e}")
-
-            self.linha_selecionada = None
-            self.livro_selecionado = None
+    def selecionar_livro(self, livro: Livro):
+        """Chamado pela tabela ao clicar numa linha (o destaque fica com ela)"""
+        self.livro_selecionado = livro
+        self.atualizar_botao_status()
 
     def selecionar_usuario_visual(self, usuario, row_frame):
         """Seleciona um usuário com destaque visual"""
@@ -717,32 +775,39 @@ class SistemaBibliotecaCompleto:
 
     def buscar_livros(self):
         """Filtra livros com base no texto de busca"""
-        texto_busca = self.search_entry_livros.get().strip().lower()
-
-        for widget in self.livros_content_frame.winfo_children():
-            widget.destroy()
-
-        if not texto_busca:
+        self.busca_livros.buscar_agora(self.search_entry_livros.get())
 
-            self.carregar_livros_completo()
-            return
+    def consultar_livros(self, texto_busca: str) -> list:
+        """Consulta da busca de livros (roda fora da thread do Tk)"""
 
         if BACKEND_DISPONIVEL:
-            self.livros_atuais = Livro.listar_todos(
-                limite=1000, incluir_inativos=self.incluir_inativos)
-        else:
-            self.livros_atuais = self.obter_livros_simulados()
+            return Livro.buscar(
+                texto_busca, limite=200, incluir_inativos=self.incluir_inativos)
 
         livros_filtrados = []
-        for livro in self.livros_atuais:
+        for livro in self.obter_livros_simulados():
 
             if (texto_busca in livro.nome.lower() or
                 texto_busca in livro.autor.lower() or
                 texto_busca in livro.isbn.lower() or
                     texto_busca in livro.genero.lower()):
                 livros_filtrados.append(livro)
+        return livros_filtrados
+
+    @staticmethod
+    def filtrar_livros(livros: list, texto_busca: str) -> list:
+        """Refina localmente o resultado de uma busca anterior (None: consultar o banco)"""
+        return Livro.filtrar_busca(livros, texto_busca)
+
+    def exibir_busca_livros(self, texto_busca: str, livros_filtrados: list):
+        """Mostra o resultado da busca na tabela de livros"""
+
+        if not hasattr(self, 'tabela_livros') or not self.tabela_livros.winfo_exists():
+            return
 
         self.livros_atuais = livros_filtrados
+        self.cursor_livros = None
+        self.atualizar_botao_carregar_mais_livros()
 
         total_livros = len(self.livros_atuais)
         ativos = len(
@@ -752,19 +817,20 @@ class SistemaBibliotecaCompleto:
         stats_texto = f"📊 Filtrado: {total_livros} | ✅ Ativos: {ativos} | ❌ Inativos: {inativos}"
         self.stats_label.configure(text=stats_texto)
 
-        if not livros_filtrados:
-            no_data_label = ctk.CTkLabel(
-                self.livros_content_frame,
-                text="📭 Nenhum livro encontrado com os critérios de busca",
-                font=ctk.CTkFont(size=14)
-            )
-            no_data_label.pack(pady=50)
-        else:
-            for i, livro in enumerate(livros_filtrados):
-                self.criar_linha_livro(livro, i)
+        self.livro_selecionado = None
+        self.atualizar_botao_status()
+        self.tabela_livros.definir_itens(
+            livros_filtrados,
+            mensagem_vazia="📭 Nenhum livro encontrado com os critérios de busca")
+
+    def ao_alterar_livro(self, evento: str, livro):
+        """Ouvinte de Livro: resultados de busca guardados ficam obsoletos"""
+        self.busca_livros.invalidar()
+        self.busca_catalogo.invalidar()
 
     def limpar_busca_livros(self):
         """Limpa a busca e recarrega todos os livros"""
+        self.busca_livros.cancelar()
         self.search_entry_livros.delete(0, 'end')
         self.carregar_livros_completo()
 
@@ -906,8 +972,7 @@ class SistemaBibliotecaCompleto:
             messagebox.showerror("Erro", "Backend não disponível!")
             return
 
-        try:
-            livro = Livro.buscar_por_id(self.livro_selecionado.id)
+        def confirmar(livro):
             if not livro:
                 messagebox.showerror("Erro", "Livro não encontrado!")
                 return
@@ -919,17 +984,19 @@ class SistemaBibliotecaCompleto:
             if not resultado:
                 return
 
-            # Usar o método reativar() da classe Livro
-            sucesso, mensagem = livro.reativar()
-            
-            if sucesso:
-                self.carregar_livros_completo()
-                messagebox.showinfo("Sucesso", mensagem)
-            else:
-                messagebox.showerror("Erro", mensagem)
+            self.tarefas.executar(
+                livro.reativar,
+                ao_concluir=self.concluir_alteracao_livro,
+                ao_falhar=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao ativar livro: {str(e)}"),
+                chave="alterar_livro")
 
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao ativar livro: {str(e)}")
+        self.tarefas.executar(
+            Livro.buscar_por_id, self.livro_selecionado.id,
+            ao_concluir=confirmar,
+            ao_falhar=lambda e: messagebox.showerror(
+                "Erro", f"Erro ao ativar livro: {str(e)}"),
+            chave="livro_selecionado")
 
     def inativar_livro_selecionado(self):
         """Inativa o livro selecionado"""
@@ -942,9 +1009,27 @@ class SistemaBibliotecaCompleto:
             messagebox.showerror("Erro", "Backend não disponível!")
             return
 
-        try:
-            # Buscar o livro pelo ID usando a classe Livro
-            livro = Livro.buscar_por_id(self.livro_selecionado.id)
+        def inativar(livro):
+            from Backend.Emprestimo import Emprestimo
+            from Backend.Reserva import Reserva
+
+            # Com exemplares emprestados ou separados o livro não pode ser inativado
+            emprestimos_ativos = Emprestimo.contar_emprestimos_ativos_por_livro(livro.id)
+            if emprestimos_ativos > 0:
+                return False, (
+                    f"Não é possível inativar este livro pois há {emprestimos_ativos} empréstimo(s) ativo(s)!\n\n"
+                    "Aguarde a devolução dos exemplares emprestados.")
+
+            separados = Reserva.contar_separados_por_livro(livro.id)
+            if separados > 0:
+                return False, (
+                    f"Não é possível inativar este livro pois há {separados} exemplar(es) separado(s) para reserva!\n\n"
+                    "Aguarde a retirada ou a expiração das reservas.")
+
+            # excluir() da classe Livro na verdade inativa
+            return livro.excluir()
+
+        def confirmar(livro):
             if not livro:
                 messagebox.showerror("Erro", "Livro não encontrado!")
                 return
@@ -957,28 +1042,29 @@ class SistemaBibliotecaCompleto:
             if not resultado:
                 return
 
-            # Verificar empréstimos ativos usando a classe Emprestimo
-            from Backend.Emprestimo import Emprestimo
-            emprestimos_ativos = Emprestimo.contar_emprestimos_ativos_por_livro(livro.id)
-            
-            if emprestimos_ativos > 0:
-                messagebox.showwarning(
-                    "Atenção",
-                    f"Não é possível inativar este livro pois há {emprestimos_ativos} empréstimo(s) ativo(s)!\n\n"
-                    "Aguarde a devolução dos exemplares emprestados.")
-                return
-
-            # Usar o método excluir() da classe Livro (que na verdade inativa)
-            sucesso, mensagem = livro.excluir()
-            
-            if sucesso:
-                self.carregar_livros_completo()
-                messagebox.showinfo("Sucesso", mensagem)
-            else:
-                messagebox.showerror("Erro", mensagem)
-
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao inativar livro: {str(e)}")
+            self.tarefas.executar(
+                inativar, livro,
+                ao_concluir=self.concluir_alteracao_livro,
+                ao_falhar=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao inativar livro: {str(e)}"),
+                chave="alterar_livro")
+
+        self.tarefas.executar(
+            Livro.buscar_por_id, self.livro_selecionado.id,
+            ao_concluir=confirmar,
+            ao_falhar=lambda e: messagebox.showerror(
+                "Erro", f"Erro ao inativar livro: {str(e)}"),
+            chave="livro_selecionado")
+
+    def concluir_alteracao_livro(self, resultado):
+        """Mostra o resultado de salvar/inativar/ativar e recarrega a lista"""
+
+        sucesso, mensagem = resultado
+        if sucesso:
+            self.carregar_livros_completo()
+            messagebox.showinfo("Sucesso", mensagem)
+        else:
+            messagebox.showerror("Erro", mensagem)
 
     def janela_livro(self, modo: str, livro: Optional[Livro] = None):
         """Janela unificada para adicionar/editar livro"""
@@ -1056,38 +1142,34 @@ class SistemaBibliotecaCompleto:
                 return
 
             if BACKEND_DISPONIVEL:
-                try:
-                    if modo == "adicionar":
-                        novo_livro = Livro(
-                            nome=nome, autor=autor, isbn=isbn, genero=genero)
-                        sucesso, mensagem = novo_livro.salvar()
-                    else:
-                        livro_atualizado = Livro(
-                            id=getattr(livro, 'id', None),
-                            nome=nome,
-                            autor=autor,
-                            isbn=isbn,
-                            genero=genero
-                        )
-                        sucesso, mensagem = livro_atualizado.salvar()
+                livro_salvo = Livro(
+                    id=getattr(livro, 'id', None) if modo != "adicionar" else None,
+                    nome=nome,
+                    autor=autor,
+                    isbn=isbn,
+                    genero=genero
+                )
 
+                def concluir(resultado):
+                    sucesso, mensagem = resultado
                     if sucesso:
-                        messagebox.showinfo("Sucesso", mensagem)
                         janela.destroy()
-                        self.carregar_livros_completo()
-                    else:
-                        messagebox.showerror("Erro", mensagem)
-
-                except Exception as e:
-                    messagebox.showerror(
-                        "Erro", f"Erro ao salvar livro: {str(e)}")
+                    self.concluir_alteracao_livro(resultado)
+
+                self.tarefas.executar(
+                    livro_salvo.salvar,
+                    ao_concluir=concluir,
+                    ao_falhar=lambda e: messagebox.showerror(
+                        "Erro", f"Erro ao salvar livro: {str(e)}"),
+                    chave="salvar_livro",
+                    desabilitar=[botao_salvar])
             else:
                 messagebox.showinfo(
                     "Simulação",
                     f"Livro {'adicionado' if modo == 'adicionar' else 'editado'} com sucesso (modo simulação)")
                 janela.destroy()
 
-        ctk.CTkButton(
+        botao_salvar = ctk.CTkButton(
             botoes_frame,
             text=f"💾 {'Adicionar' if modo == 'adicionar' else 'Salvar Alterações'}",
             command=salvar_livro,
@@ -1097,9 +1179,8 @@ class SistemaBibliotecaCompleto:
                 size=14,
                 weight="bold"),
             fg_color="#28A745",
-            hover_color="#1E7E34").pack(
-            side="left",
-            padx=10)
+            hover_color="#1E7E34")
+        botao_salvar.pack(side="left", padx=10)
 
         ctk.CTkButton(
             botoes_frame,
@@ -1128,16 +1209,17 @@ class SistemaBibliotecaCompleto:
 
         if resposta:
             if BACKEND_DISPONIVEL:
-                sucesso, mensagem = livro_alvo.excluir()
-
-                if sucesso:
-                    messagebox.showinfo("Sucesso", mensagem)
-                    self.carregar_livros_completo()
-                    if livro_alvo == self.livro_selecionado:
+                def concluir(resultado):
+                    if resultado[0] and livro_alvo == self.livro_selecionado:
                         self.livro_selecionado = None
-                        self.linha_selecionada = None
-                else:
-                    messagebox.showerror("Erro", mensagem)
+                    self.concluir_alteracao_livro(resultado)
+
+                self.tarefas.executar(
+                    livro_alvo.excluir,
+                    ao_concluir=concluir,
+                    ao_falhar=lambda e: messagebox.showerror(
+                        "Erro", f"Erro ao inativar livro: {str(e)}"),
+                    chave="alterar_livro")
             else:
                 messagebox.showinfo("Operação Realizada",
                                     "Livro inativado com sucesso")
@@ -1162,16 +1244,17 @@ class SistemaBibliotecaCompleto:
 
         if resposta:
             if BACKEND_DISPONIVEL:
-                sucesso, mensagem = livro_alvo.reativar()
-
-                if sucesso:
-                    messagebox.showinfo("Sucesso", mensagem)
-                    self.carregar_livros_completo()
-                    if livro_alvo == self.livro_selecionado:
+                def concluir(resultado):
+                    if resultado[0] and livro_alvo == self.livro_selecionado:
                         self.livro_selecionado = None
-                        self.linha_selecionada = None
-                else:
-                    messagebox.showerror("Erro", mensagem)
+                    self.concluir_alteracao_livro(resultado)
+
+                self.tarefas.executar(
+                    livro_alvo.reativar,
+                    ao_concluir=concluir,
+                    ao_falhar=lambda e: messagebox.showerror(
+                        "Erro", f"Erro ao reativar livro: {str(e)}"),
+                    chave="alterar_livro")
             else:
                 messagebox.showinfo("Operação Realizada",
                                     "Livro reativado com sucesso")
@@ -1332,23 +1415,26 @@ class SistemaBibliotecaCompleto:
             header_frame.grid_columnconfigure(
                 i, weight=1 if i in [0, 1] else 0)
 
-        content_attr = f"usuarios_{tipo_usuario.lower()}_content_frame"
-        setattr(
-            self,
-            content_attr,
-            ctk.CTkScrollableFrame(
-                list_frame,
-                height=300))
-        getattr(
-            self,
-            content_attr).pack(
-            fill="both",
-            expand=True,
-            padx=5,
-            pady=5)
+        tabela = TabelaVirtual(
+            list_frame,
+            criar_linha=lambda row_frame: self.criar_linha_usuario_tipo(
+                row_frame, tipo_usuario),
+            preencher_linha=lambda linha, usuario, index: self.preencher_linha_usuario_tipo(
+                linha, usuario, tipo_usuario),
+            mensagem_vazia=f"📭 Nenhum {tipo_usuario.lower()} encontrado",
+            height=300)
+        tabela.pack(fill="both", expand=True, padx=5, pady=5)
+        setattr(self, f"tabela_usuarios_{tipo_usuario.lower()}", tabela)
+
+        setattr(self, f"btn_carregar_mais_{tipo_usuario.lower()}", ctk.CTkButton(
+            list_frame,
+            text="⬇️ Carregar mais",
+            command=lambda: self.carregar_mais_usuarios(tipo_usuario),
+            width=200,
+            fg_color="#6C757D",
+            hover_color="#545B62"))
 
         setattr(self, f"usuario_selecionado_{tipo_usuario.lower()}", None)
-        setattr(self, f"linha_selecionada_{tipo_usuario.lower()}", None)
 
         self.carregar_usuarios_tipo(tipo_usuario)
 
@@ -1357,147 +1443,152 @@ class SistemaBibliotecaCompleto:
         if not BACKEND_DISPONIVEL:
             return
 
-        try:
-            content_frame = getattr(
-                self, f"usuarios_{tipo_usuario.lower()}_content_frame")
+        tabela = getattr(self, f"tabela_usuarios_{tipo_usuario.lower()}")
+        tabela.definir_itens([])
 
-            for widget in content_frame.winfo_children():
-                widget.destroy()
+        setattr(self, f"cursor_usuarios_{tipo_usuario.lower()}", None)
 
-            todos_usuarios = Usuario.listar_todos()
-            usuarios_filtrados = [
-                u for u in todos_usuarios if u.tipo_usuario == tipo_usuario]
+        self.carregar_mais_usuarios(tipo_usuario)
 
-            if hasattr(
-                    self,
-                    'busca_matricula_var') and self.busca_matricula_var.get().strip():
-                busca = self.busca_matricula_var.get().strip().lower()
-                usuarios_filtrados = [u for u in usuarios_filtrados if hasattr(
-                    u, 'matricula') and u.matricula and busca in u.matricula.lower()]
-
-            if not usuarios_filtrados:
-                no_data_label = ctk.CTkLabel(
-                    content_frame,
-                    text=f"📭 Nenhum {tipo_usuario.lower()} encontrado",
-                    font=ctk.CTkFont(size=14)
-                )
-                no_data_label.pack(pady=50)
-                return
+    def carregar_mais_usuarios(self, tipo_usuario):
+        """Acrescenta a próxima página de usuários do tipo"""
 
-            for usuario in usuarios_filtrados:
-                self.criar_linha_usuario_tipo(
-                    usuario, tipo_usuario, content_frame)
+        tabela = getattr(self, f"tabela_usuarios_{tipo_usuario.lower()}")
+        botao = getattr(self, f"btn_carregar_mais_{tipo_usuario.lower()}")
+        cursor_attr = f"cursor_usuarios_{tipo_usuario.lower()}"
 
-        except Exception as e:
-            print(f"Erro ao carregar usuários {tipo_usuario}: {e}")
+        busca_matricula = None
+        if hasattr(self, 'busca_matricula_var'):
+            busca_matricula = self.busca_matricula_var.get().strip() or None
 
-    def criar_linha_usuario_tipo(self, usuario, tipo_usuario, content_frame):
-        """Cria uma linha na tabela de usuários por tipo específico"""
-        row_frame = ctk.CTkFrame(content_frame)
-        row_frame.pack(fill="x", pady=1, padx=2)
+        def concluir(resultado):
+            usuarios, cursor = resultado
+            setattr(self, cursor_attr, cursor)
+
+            tabela.acrescentar_itens(usuarios)
+
+            if cursor:
+                botao.pack(pady=(0, 10))
+            else:
+                botao.pack_forget()
+
+        # Mesma chave: recarregar a lista descarta a página ainda pendente
+        self.tarefas.executar(
+            Usuario.listar_pagina, getattr(self, cursor_attr, None),
+            limite=self.TAMANHO_PAGINA,
+            tipo_usuario=tipo_usuario,
+            campos=self.CAMPOS_LISTA_USUARIOS,
+            matricula=busca_matricula,
+            ao_concluir=concluir,
+            ao_falhar=lambda e: print(f"Erro ao carregar usuários {tipo_usuario}: {e}"),
+            chave=f"pagina_usuarios_{tipo_usuario.lower()}",
+            desabilitar=[botao])
+
+    def criar_linha_usuario_tipo(self, row_frame, tipo_usuario) -> dict:
+        """Cria os widgets de uma linha da tabela de usuários por tipo específico"""
 
         num_colunas = 4 if tipo_usuario == "Bibliotecario" else 6
         for j in range(num_colunas):
             row_frame.grid_columnconfigure(j, weight=1 if j in [0, 1] else 0)
 
-        ativo = getattr(usuario, 'ativo', True)
-        cor_status = "#28A745" if ativo else "#DC3545"
-        status_texto = "✅ Ativo" if ativo else "❌ Inativo"
-
-        nome_texto = usuario.nome[:25] + \
-            "..." if len(usuario.nome) > 25 else usuario.nome
-        nome_label = ctk.CTkLabel(
-            row_frame,
-            text=nome_texto,
-            font=ctk.CTkFont(
-                weight="bold"))
-        nome_label.grid(row=0, column=0, padx=5, pady=8, sticky="w")
-
-        email_texto = usuario.email[:30] + \
-            "..." if len(usuario.email) > 30 else usuario.email
-        email_label = ctk.CTkLabel(row_frame, text=email_texto)
-        email_label.grid(row=0, column=1, padx=5, pady=8, sticky="w")
+        linha = {
+            'nome': ctk.CTkLabel(row_frame, text="", font=ctk.CTkFont(weight="bold")),
+            'email': ctk.CTkLabel(row_frame, text=""),
+        }
+        linha['nome'].grid(row=0, column=0, padx=5, pady=8, sticky="w")
+        linha['email'].grid(row=0, column=1, padx=5, pady=8, sticky="w")
 
         col_index = 2
 
-        if tipo_usuario == "Aluno":
-
-            matricula_label = ctk.CTkLabel(
-                row_frame, text=usuario.matricula or "-")
-            matricula_label.grid(row=0, column=col_index, padx=5, pady=8)
-            col_index += 1
-
-            curso_label = ctk.CTkLabel(row_frame, text=usuario.curso or "-")
-            curso_label.grid(row=0, column=col_index, padx=5, pady=8)
-            col_index += 1
-
-        elif tipo_usuario == "Professor":
-
-            matricula_label = ctk.CTkLabel(
-                row_frame, text=usuario.matricula or "-")
-            matricula_label.grid(row=0, column=col_index, padx=5, pady=8)
+        if tipo_usuario in ("Aluno", "Professor"):
+            linha['matricula'] = ctk.CTkLabel(row_frame, text="")
+            linha['matricula'].grid(row=0, column=col_index, padx=5, pady=8)
             col_index += 1
 
-            depto_label = ctk.CTkLabel(
-                row_frame, text=usuario.departamento or "-")
-            depto_label.grid(row=0, column=col_index, padx=5, pady=8)
+            linha['extra'] = ctk.CTkLabel(row_frame, text="")
+            linha['extra'].grid(row=0, column=col_index, padx=5, pady=8)
             col_index += 1
 
-        status_label = ctk.CTkLabel(
-            row_frame,
-            text=status_texto,
-            text_color=cor_status,
-            font=ctk.CTkFont(
-                weight="bold"))
-        status_label.grid(row=0, column=col_index, padx=5, pady=8)
+        linha['status'] = ctk.CTkLabel(
+            row_frame, text="", font=ctk.CTkFont(weight="bold"))
+        linha['status'].grid(row=0, column=col_index, padx=5, pady=8)
         col_index += 1
 
         actions_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
         actions_frame.grid(row=0, column=col_index, padx=5, pady=4)
 
-        ctk.CTkButton(
+        linha['detalhes'] = ctk.CTkButton(
             actions_frame,
             text="👁️",
-            command=lambda: self.mostrar_detalhes_usuario(usuario),
             width=30,
             height=25,
             fg_color="#17A2B8",
             hover_color="#117A8B"
-        ).pack(side="left", padx=2)
+        )
+        linha['detalhes'].pack(side="left", padx=2)
 
-        ctk.CTkButton(
+        linha['editar'] = ctk.CTkButton(
             actions_frame,
             text="✏️",
-            command=lambda: self.mostrar_formulario_usuario(
-                usuario,
-                tipo_usuario),
             width=30,
             height=25,
             fg_color="#FFC107",
-            hover_color="#E0A800").pack(
-            side="left",
-            padx=2)
+            hover_color="#E0A800")
+        linha['editar'].pack(side="left", padx=2)
+
+        linha['status_btn'] = ctk.CTkButton(
+            actions_frame,
+            text="",
+            width=30,
+            height=25
+        )
+        linha['status_btn'].pack(side="left", padx=2)
+
+        return linha
+
+    def preencher_linha_usuario_tipo(self, linha: dict, usuario, tipo_usuario):
+        """Exibe o usuário numa linha já criada da tabela"""
+
+        ativo = getattr(usuario, 'ativo', True)
+        cor_status = "#28A745" if ativo else "#DC3545"
+        status_texto = "✅ Ativo" if ativo else "❌ Inativo"
+
+        nome_texto = usuario.nome[:25] + \
+            "..." if len(usuario.nome) > 25 else usuario.nome
+        email_texto = usuario.email[:30] + \
+            "..." if len(usuario.email) > 30 else usuario.email
+
+        linha['nome'].configure(text=nome_texto)
+        linha['email'].configure(text=email_texto)
+
+        if tipo_usuario == "Aluno":
+            linha['matricula'].configure(text=usuario.matricula or "-")
+            linha['extra'].configure(text=usuario.curso or "-")
+        elif tipo_usuario == "Professor":
+            linha['matricula'].configure(text=usuario.matricula or "-")
+            linha['extra'].configure(text=usuario.departamento or "-")
+
+        linha['status'].configure(text=status_texto, text_color=cor_status)
+
+        linha['detalhes'].configure(
+            command=lambda: self.mostrar_detalhes_usuario(usuario))
+        linha['editar'].configure(
+            command=lambda: self.mostrar_formulario_usuario(
+                usuario,
+                tipo_usuario))
 
         if ativo:
-            ctk.CTkButton(
-                actions_frame,
+            linha['status_btn'].configure(
                 text="❌",
                 command=lambda: self.inativar_usuario(usuario, tipo_usuario),
-                width=30,
-                height=25,
                 fg_color="#DC3545",
-                hover_color="#C82333"
-            ).pack(side="left", padx=2)
+                hover_color="#C82333")
         else:
-            ctk.CTkButton(
-                actions_frame,
+            linha['status_btn'].configure(
                 text="✅",
                 command=lambda: self.ativar_usuario(usuario, tipo_usuario),
-                width=30,
-                height=25,
                 fg_color="#28A745",
-                hover_color="#1E7E34"
-            ).pack(side="left", padx=2)
+                hover_color="#1E7E34")
 
     def carregar_usuarios(self):
         """Carrega e exibe a lista de usuários"""
@@ -1509,8 +1600,12 @@ class SistemaBibliotecaCompleto:
             for widget in self.usuarios_content_frame.winfo_children():
                 widget.destroy()
 
-            usuarios = Usuario.listar_todos(incluir_inativos=True)
+        except Exception as e:
+            messagebox.showerror(
+                "Erro", f"Erro ao carregar usuários: {str(e)}")
+            return
 
+        def exibir(usuarios):
             if not usuarios:
                 no_data_frame = ctk.CTkFrame(self.scroll_frame_usuarios)
                 no_data_frame.pack(fill="x", pady=20)
@@ -1524,9 +1619,13 @@ class SistemaBibliotecaCompleto:
             for usuario in usuarios:
                 self.criar_linha_usuario(usuario)
 
-        except Exception as e:
-            messagebox.showerror(
-                "Erro", f"Erro ao carregar usuários: {str(e)}")
+        self.tarefas.executar(
+            Usuario.listar_todos,
+            incluir_inativos=True, campos=self.CAMPOS_LISTA_USUARIOS,
+            ao_concluir=exibir,
+            ao_falhar=lambda e: messagebox.showerror(
+                "Erro", f"Erro ao carregar usuários: {str(e)}"),
+            chave="lista_usuarios")
 
     def criar_linha_usuario(self, usuario):
         """Cria uma linha na tabela de usuários com seleção visual"""
@@ -1644,8 +1743,31 @@ class SistemaBibliotecaCompleto:
                 hover_color="#1E7E34"
             ).pack(side="left", padx=2)
 
+    def carregar_usuario_completo(self, usuario, ao_carregar):
+        """Busca fora da thread do Tk o Usuario completo de uma linha das
+        listas (que trazem só os campos exibidos) e o entrega a
+        ao_carregar; avisa se ele não existe mais"""
+
+        def concluir(completo):
+            if completo is None:
+                messagebox.showerror("Erro", "Usuário não encontrado!")
+            else:
+                ao_carregar(completo)
+
+        self.tarefas.executar(
+            Usuario.buscar_por_id, usuario.id,
+            ao_concluir=concluir,
+            ao_falhar=lambda e: messagebox.showerror(
+                "Erro", f"Erro ao carregar usuário: {str(e)}"),
+            chave="usuario_completo")
+
     def mostrar_formulario_usuario(self, usuario=None, tipo_predefinido=None):
         """Mostra o formulário para adicionar/editar usuário"""
+        if usuario is not None and not isinstance(usuario, Usuario):
+            self.carregar_usuario_completo(
+                usuario, lambda completo: self.mostrar_formulario_usuario(
+                    completo, tipo_predefinido))
+            return
 
         modal = ctk.CTkToplevel(self.root)
         modal.title(
@@ -1862,44 +1984,62 @@ class SistemaBibliotecaCompleto:
                         "Erro", "Professor deve ter departamento")
                     return
 
+                dados = {
+                    'nome': nome_var.get().strip(),
+                    'email': email_var.get().strip(),
+                    'senha': senha_var.get().strip(),
+                    'matricula': matricula_var.get().strip(),
+                    'curso': curso_var.get().strip(),
+                    'departamento': departamento_var.get().strip(),
+                }
+
+            except Exception as e:
+                messagebox.showerror(
+                    "Erro", f"Erro ao salvar usuário: {str(e)}")
+                return
+
+            def gravar():
+                # O hash da senha é caro de propósito: fica fora da thread do Tk
                 if usuario:
 
-                    usuario.nome = nome_var.get().strip()
-                    usuario.email = email_var.get().strip()
-                    if senha_var.get().strip():
-                        usuario.senha = senha_var.get().strip()
+                    usuario.nome = dados['nome']
+                    usuario.email = dados['email']
+                    if dados['senha']:
+                        usuario.senha = dados['senha']
                     usuario._tipo_usuario = tipo_selecionado
-                    usuario.matricula = matricula_var.get().strip() or None
-                    usuario.curso = curso_var.get().strip() or None
-                    usuario.departamento = departamento_var.get().strip() or None
+                    usuario.matricula = dados['matricula'] or None
+                    usuario.curso = dados['curso'] or None
+                    usuario.departamento = dados['departamento'] or None
+
+                    return usuario.salvar()
+
+                if tipo_selecionado == "Aluno":
+                    novo_usuario = Aluno(
+                        nome=dados['nome'],
+                        email=dados['email'],
+                        senha=dados['senha'],
+                        matricula=dados['matricula'],
+                        curso=dados['curso']
+                    )
+                elif tipo_selecionado == "Professor":
+                    novo_usuario = Professor(
+                        nome=dados['nome'],
+                        email=dados['email'],
+                        senha=dados['senha'],
+                        matricula=dados['matricula'],
+                        departamento=dados['departamento']
+                    )
+                elif tipo_selecionado == "Bibliotecario":
+                    novo_usuario = Bibliotecario(
+                        nome=dados['nome'],
+                        email=dados['email'],
+                        senha=dados['senha']
+                    )
 
-                    sucesso, mensagem = usuario.salvar()
-                else:
+                return novo_usuario.salvar()
 
-                    if tipo_selecionado == "Aluno":
-                        novo_usuario = Aluno(
-                            nome=nome_var.get().strip(),
-                            email=email_var.get().strip(),
-                            senha=senha_var.get().strip(),
-                            matricula=matricula_var.get().strip(),
-                            curso=curso_var.get().strip()
-                        )
-                    elif tipo_selecionado == "Professor":
-                        novo_usuario = Professor(
-                            nome=nome_var.get().strip(),
-                            email=email_var.get().strip(),
-                            senha=senha_var.get().strip(),
-                            matricula=matricula_var.get().strip(),
-                            departamento=departamento_var.get().strip()
-                        )
-                    elif tipo_selecionado == "Bibliotecario":
-                        novo_usuario = Bibliotecario(
-                            nome=nome_var.get().strip(),
-                            email=email_var.get().strip(),
-                            senha=senha_var.get().strip()
-                        )
-
-                    sucesso, mensagem = novo_usuario.salvar()
+            def concluir(resultado):
+                sucesso, mensagem = resultado
 
                 if sucesso:
                     messagebox.showinfo("Sucesso", mensagem)
@@ -1908,11 +2048,15 @@ class SistemaBibliotecaCompleto:
                 else:
                     messagebox.showerror("Erro", mensagem)
 
-            except Exception as e:
-                messagebox.showerror(
-                    "Erro", f"Erro ao salvar usuário: {str(e)}")
+            self.tarefas.executar(
+                gravar,
+                ao_concluir=concluir,
+                ao_falhar=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao salvar usuário: {str(e)}"),
+                chave="salvar_usuario",
+                desabilitar=[botao_salvar])
 
-        ctk.CTkButton(
+        botao_salvar = ctk.CTkButton(
             buttons_frame,
             text="💾 Salvar",
             command=salvar_usuario,
@@ -1920,7 +2064,8 @@ class SistemaBibliotecaCompleto:
             height=35,
             fg_color="#28A745",
             hover_color="#1E7E34"
-        ).pack(side="right", padx=(10, 0))
+        )
+        botao_salvar.pack(side="right", padx=(10, 0))
 
         ctk.CTkButton(
             buttons_frame,
@@ -1936,6 +2081,9 @@ class SistemaBibliotecaCompleto:
 
     def mostrar_detalhes_usuario(self, usuario):
         """Mostra os detalhes completos do usuário"""
+        if not isinstance(usuario, Usuario):
+            self.carregar_usuario_completo(usuario, self.mostrar_detalhes_usuario)
+            return
 
         modal = ctk.CTkToplevel(self.root)
         modal.title(f"👁️ Detalhes do Usuário: {usuario.nome}")
@@ -2031,27 +2179,23 @@ class SistemaBibliotecaCompleto:
 
     def inativar_usuario(self, usuario, tipo_usuario=None):
         """Inativa um usuário"""
+        if not isinstance(usuario, Usuario):
+            self.carregar_usuario_completo(
+                usuario, lambda completo: self.inativar_usuario(completo, tipo_usuario))
+            return
         resposta = messagebox.askyesno(
             "Confirmar Inativação",
             f"Tem certeza que deseja inativar o usuário:\n\n{usuario.nome}\n{usuario.email}\n\nO usuário não poderá mais fazer login."
         )
 
         if resposta:
-            try:
-                sucesso, mensagem = usuario.excluir()
-
-                if sucesso:
-                    messagebox.showinfo("Sucesso", mensagem)
-                    if tipo_usuario:
-                        self.carregar_usuarios_tipo(tipo_usuario)
-                    else:
-                        self.carregar_usuarios()
-                else:
-                    messagebox.showerror("Erro", mensagem)
-
-            except Exception as e:
-                messagebox.showerror(
-                    "Erro", f"Erro ao inativar usuário: {str(e)}")
+            self.tarefas.executar(
+                usuario.excluir,
+                ao_concluir=lambda resultado: self.concluir_alteracao_usuario(
+                    resultado, tipo_usuario),
+                ao_falhar=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao inativar usuário: {str(e)}"),
+                chave="alterar_usuario")
 
     def ativar_usuario(self, usuario, tipo_usuario=None):
         """Ativa um usuário inativo"""
@@ -2059,26 +2203,36 @@ class SistemaBibliotecaCompleto:
             messagebox.showerror("Erro", "Backend não disponível!")
             return
 
+        if not isinstance(usuario, Usuario):
+            self.carregar_usuario_completo(
+                usuario, lambda completo: self.ativar_usuario(completo, tipo_usuario))
+            return
+
         resposta = messagebox.askyesno(
             "Confirmar Ativação",
             f"Tem certeza que deseja ativar o usuário:\n\n{usuario.nome}\n{usuario.email}")
 
         if resposta:
-            try:
-                sucesso, mensagem = usuario.ativar()
-                
-                if sucesso:
-                    messagebox.showinfo("Sucesso", mensagem)
-                    if tipo_usuario:
-                        self.carregar_usuarios_tipo(tipo_usuario)
-                    else:
-                        self.carregar_usuarios()
-                else:
-                    messagebox.showerror("Erro", mensagem)
-
-            except Exception as e:
-                messagebox.showerror(
-                    "Erro", f"Erro ao ativar usuário: {str(e)}")
+            self.tarefas.executar(
+                usuario.ativar,
+                ao_concluir=lambda resultado: self.concluir_alteracao_usuario(
+                    resultado, tipo_usuario),
+                ao_falhar=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao ativar usuário: {str(e)}"),
+                chave="alterar_usuario")
+
+    def concluir_alteracao_usuario(self, resultado, tipo_usuario=None):
+        """Mostra o resultado de inativar/ativar e recarrega a lista"""
+
+        sucesso, mensagem = resultado
+        if sucesso:
+            messagebox.showinfo("Sucesso", mensagem)
+            if tipo_usuario:
+                self.carregar_usuarios_tipo(tipo_usuario)
+            else:
+                self.carregar_usuarios()
+        else:
+            messagebox.showerror("Erro", mensagem)
 
     def tela_aluno(self):
         """Interface específica do aluno"""
@@ -2115,8 +2269,20 @@ class SistemaBibliotecaCompleto:
             hover_color="#C82333"
         ).pack(side="right", padx=20, pady=15)
 
+        self.notificacoes_btn = ctk.CTkButton(
+            header_frame,
+            text="🔔 Notificações",
+            command=self.mostrar_notificacoes,
+            width=150,
+            fg_color="#6C757D",
+            hover_color="#545B62"
+        )
+        self.notificacoes_btn.pack(side="right", pady=15)
+
         if BACKEND_DISPONIVEL:
             self.verificar_mostrar_alertas_atraso()
+            self.ultima_notificacao_id = 0
+            self.atualizar_contador_notificacoes()
 
         notebook = ctk.CTkTabview(main_frame)
         notebook.pack(fill="both", expand=True, padx=10, pady=10)
@@ -2135,26 +2301,11 @@ class SistemaBibliotecaCompleto:
         if not BACKEND_DISPONIVEL:
             return
 
-        try:
-            from Backend.Emprestimo import Emprestimo
-            from Backend.Notificacao import Notificacao, TipoNotificacao
-
-            emprestimos_atrasados = Emprestimo.verificar_emprestimos_atrasados(
-                self.usuario_logado.id)
+        from Backend.Emprestimo import Emprestimo
 
+        def exibir(emprestimos_atrasados):
             if emprestimos_atrasados:
 
-                for emp in emprestimos_atrasados:
-                    titulo = f"📚 Livro em Atraso: {emp['livro_titulo']}"
-                    mensagem = f"O livro '{emp['livro_titulo']}' do autor {emp['livro_autor']} está {emp['dias_atraso']} dia(s) em atraso. Por favor, devolva o quanto antes para evitar multas."
-
-                    Notificacao.criar_notificacao_sistema(
-                        usuario_id=self.usuario_logado.id,
-                        titulo=titulo,
-                        mensagem=mensagem,
-                        livro_id=None
-                    )
-
                 total_atraso = len(emprestimos_atrasados)
                 livros_atrasados = ", ".join(
                     [f"'{emp['livro_titulo']}'" for emp in emprestimos_atrasados[:3]])
@@ -2166,8 +2317,14 @@ class SistemaBibliotecaCompleto:
                     f"Você possui {total_atraso} empréstimo(s) em atraso:\n\n{livros_atrasados}\n\nPor favor, proceda com as devoluções o quanto antes para evitar multas."
                 )
 
-        except Exception as e:
-            print(f"Erro ao verificar alertas de atraso: {e}")
+        # Os avisos de atraso são criados pela varredura periódica
+        # (varrer_atrasados); aqui só o alerta na tela
+        self.tarefas.executar(
+            Emprestimo.verificar_emprestimos_atrasados, self.usuario_logado.id,
+            ao_concluir=exibir,
+            ao_falhar=lambda e: print(f"Erro ao verificar alertas de atraso: {e}"),
+            chave="alertas_atraso",
+            silenciosa=True)
 
     def criar_aba_meus_emprestimos(self, parent):
         """Cria aba com histórico de empréstimos do usuário"""
@@ -2187,7 +2344,7 @@ class SistemaBibliotecaCompleto:
         ctk.CTkButton(
             titulo_frame,
             text="🔄 Atualizar",
-            command=lambda: self.carregar_historico_emprestimos(content_frame),
+            command=self.carregar_historico_emprestimos,
             width=100,
             fg_color="#6C757D",
             hover_color="#545B62"
@@ -2223,104 +2380,96 @@ class SistemaBibliotecaCompleto:
             label.grid(row=0, column=i, padx=5, pady=5, sticky="ew")
             header_frame.grid_columnconfigure(i, weight=1)
 
-        content_frame = ctk.CTkScrollableFrame(list_frame, height=350)
-        content_frame.pack(fill="both", expand=True, padx=5, pady=5)
+        self.stats_historico_label = ctk.CTkLabel(
+            list_frame,
+            text="",
+            font=ctk.CTkFont(
+                size=12,
+                weight="bold"))
+        self.stats_historico_label.pack(pady=(0, 5))
 
-        self.carregar_historico_emprestimos(content_frame)
+        self.tabela_historico = TabelaVirtual(
+            list_frame,
+            criar_linha=self.criar_linha_emprestimo_usuario,
+            preencher_linha=self.preencher_linha_emprestimo_usuario,
+            height=350)
+        self.tabela_historico.pack(fill="both", expand=True, padx=5, pady=5)
 
-    def carregar_historico_emprestimos(self, content_frame):
-        """Carrega e exibe o histórico de empréstimos do usuário - APENAS dados reais"""
+        self.carregar_historico_emprestimos()
 
-        for widget in content_frame.winfo_children():
-            widget.destroy()
+    def carregar_historico_emprestimos(self):
+        """Carrega e exibe o histórico de empréstimos do usuário - APENAS dados reais"""
 
         if not BACKEND_DISPONIVEL:
-            ctk.CTkLabel(
-                content_frame,
-                text="❌ Sistema offline - Backend não disponível",
-                font=ctk.CTkFont(size=14),
-                text_color="#DC3545"
-            ).pack(pady=50)
+            self.tabela_historico.definir_itens(
+                [], mensagem_vazia="❌ Sistema offline - Backend não disponível")
             return
 
-        try:
-            from Backend.Emprestimo import Emprestimo
-
-            historico = Emprestimo.obter_historico_usuario_completo(
-                self.usuario_logado.id)
-
-            if not historico:
-
-                info_frame = ctk.CTkFrame(content_frame)
-                info_frame.pack(pady=50, padx=20, fill="x")
-
-                ctk.CTkLabel(
-                    info_frame,
-                    text="� Nenhum Empréstimo Encontrado",
-                    font=ctk.CTkFont(size=18, weight="bold")
-                ).pack(pady=(20, 10))
-
-                ctk.CTkLabel(
-                    info_frame,
-                    text="Você ainda não possui empréstimos registrados.\nVisite a aba 'Catálogo de Livros' para fazer reservas!",
-                    font=ctk.CTkFont(
-                        size=14),
-                    justify="center").pack(
-                    pady=(
-                        0,
-                        20))
-                return
+        from Backend.Emprestimo import Emprestimo
 
+        def exibir(historico):
             total = len(historico)
             ativos = len([h for h in historico if h['status'] != 'Devolvido'])
             devolvidos = total - ativos
             atrasados = len(
                 [h for h in historico if h['status_visual'] == 'atrasado'])
 
-            stats_frame = ctk.CTkFrame(content_frame)
-            stats_frame.pack(fill="x", pady=(0, 10), padx=5)
+            self.stats_historico_label.configure(
+                text=f"📊 Total: {total} | 📚 Ativos: {ativos} | ✅ Devolvidos: {devolvidos} | 🔴 Atrasados: {atrasados}"
+                if historico else "")
 
-            ctk.CTkLabel(
-                stats_frame,
-                text=f"📊 Total: {total} | 📚 Ativos: {ativos} | ✅ Devolvidos: {devolvidos} | 🔴 Atrasados: {atrasados}",
-                font=ctk.CTkFont(
-                    size=12,
-                    weight="bold")).pack(
-                pady=10)
+            self.tabela_historico.definir_itens(
+                historico,
+                mensagem_vazia="📭 Nenhum Empréstimo Encontrado\n\n"
+                "Você ainda não possui empréstimos registrados.\n"
+                "Visite a aba 'Catálogo de Livros' para fazer reservas!")
 
-            for emprestimo in historico:
-                self.criar_linha_emprestimo_usuario(content_frame, emprestimo)
-
-        except Exception as e:
+        def falhar(e):
             print(f"❌ Erro ao carregar histórico: {e}")
-            ctk.CTkLabel(
-                content_frame,
-                text=f"❌ Erro ao conectar com banco de dados\nDetalhes: {str(e)}",
-                font=ctk.CTkFont(
-                    size=14),
-                text_color="#DC3545").pack(
-                pady=50)
+            self.stats_historico_label.configure(text="")
+            self.tabela_historico.definir_itens(
+                [], mensagem_vazia=f"❌ Erro ao conectar com banco de dados\nDetalhes: {str(e)}")
 
-    def criar_linha_emprestimo_usuario(self, parent, emprestimo):
-        """Cria uma linha do histórico de empréstimos"""
+        self.tarefas.executar(
+            Emprestimo.obter_historico_usuario_completo, self.usuario_logado.id,
+            ao_concluir=exibir,
+            ao_falhar=falhar,
+            chave="historico_emprestimos")
 
-        row_frame = ctk.CTkFrame(parent)
-        row_frame.pack(fill="x", pady=2, padx=2)
+    def criar_linha_emprestimo_usuario(self, row_frame) -> dict:
+        """Cria os widgets de uma linha do histórico de empréstimos"""
 
         for i in range(6):
             row_frame.grid_columnconfigure(i, weight=1 if i < 2 else 0)
 
-        titulo_label = ctk.CTkLabel(row_frame, text=emprestimo['livro_titulo'][:30] + "..." if len(
-            emprestimo['livro_titulo']) > 30 else emprestimo['livro_titulo'], font=ctk.CTkFont(weight="bold"))
-        titulo_label.grid(row=0, column=0, padx=5, pady=8, sticky="w")
+        linha = {
+            'titulo': ctk.CTkLabel(row_frame, text="", font=ctk.CTkFont(weight="bold")),
+            'autor': ctk.CTkLabel(row_frame, text=""),
+            'data_emprestimo': ctk.CTkLabel(row_frame, text=""),
+            'data_devolucao': ctk.CTkLabel(row_frame, text=""),
+            'status': ctk.CTkLabel(row_frame, text="", font=ctk.CTkFont(weight="bold")),
+            'acao': ctk.CTkButton(row_frame, text="", width=80, height=25),
+        }
+
+        linha['titulo'].grid(row=0, column=0, padx=5, pady=8, sticky="w")
+        linha['autor'].grid(row=0, column=1, padx=5, pady=8, sticky="w")
+        linha['data_emprestimo'].grid(row=0, column=2, padx=5, pady=8)
+        linha['data_devolucao'].grid(row=0, column=3, padx=5, pady=8)
+        linha['status'].grid(row=0, column=4, padx=5, pady=8)
+        linha['acao'].grid(row=0, column=5, padx=5, pady=4)
+
+        return linha
+
+    def preencher_linha_emprestimo_usuario(self, linha: dict, emprestimo, index: int):
+        """Exibe um empréstimo do histórico numa linha já criada"""
 
-        autor_label = ctk.CTkLabel(row_frame, text=emprestimo['livro_autor'])
-        autor_label.grid(row=0, column=1, padx=5, pady=8, sticky="w")
+        linha['titulo'].configure(text=emprestimo['livro_titulo'][:30] + "..." if len(
+            emprestimo['livro_titulo']) > 30 else emprestimo['livro_titulo'])
+        linha['autor'].configure(text=emprestimo['livro_autor'])
 
         data_emp = emprestimo['data_emprestimo'].strftime(
             "%d/%m/%Y") if emprestimo['data_emprestimo'] else "-"
-        data_emp_label = ctk.CTkLabel(row_frame, text=data_emp)
-        data_emp_label.grid(row=0, column=2, padx=5, pady=8)
+        linha['data_emprestimo'].configure(text=data_emp)
 
         if emprestimo['data_devolucao']:
             data_dev = emprestimo['data_devolucao'].strftime("%d/%m/%Y")
@@ -2328,8 +2477,7 @@ class SistemaBibliotecaCompleto:
             data_dev = f"Até {emprestimo['data_devolucao_prevista'].strftime('%d/%m/%Y')}"
         else:
             data_dev = "-"
-        data_dev_label = ctk.CTkLabel(row_frame, text=data_dev)
-        data_dev_label.grid(row=0, column=3, padx=5, pady=8)
+        linha['data_devolucao'].configure(text=data_dev)
 
         status_text = f"{emprestimo['icone_status']} {emprestimo['status']}"
         cores_status = {
@@ -2341,66 +2489,30 @@ class SistemaBibliotecaCompleto:
         }
         cor = cores_status.get(emprestimo['cor_status'], "#000000")
 
-        status_label = ctk.CTkLabel(
-            row_frame,
-            text=status_text,
-            text_color=cor,
-            font=ctk.CTkFont(weight="bold")
-        )
-        status_label.grid(row=0, column=4, padx=5, pady=8)
+        linha['status'].configure(text=status_text, text_color=cor)
 
         if emprestimo['status_visual'] == "devolvido":
-
-            ctk.CTkButton(
-                row_frame,
+            linha['acao'].configure(
                 text="⭐ Avaliar",
                 command=lambda emp=emprestimo: self.mostrar_formulario_avaliacao(
                     emp['livro_id'],
                     emp['livro_titulo'],
                     emp['id']),
-                width=80,
-                height=25,
                 fg_color="#FFC107",
-                hover_color="#E0A800").grid(
-                row=0,
-                column=5,
-                padx=5,
-                pady=4)
+                hover_color="#E0A800")
         else:
-
-            ctk.CTkButton(
-                row_frame,
+            linha['acao'].configure(
                 text="📥 Devolver",
                 command=lambda emp=emprestimo: self.devolver_livro(emp['id']),
-                width=80,
-                height=25,
                 fg_color="#28A745",
-                hover_color="#1E7E34"
-            ).grid(row=0, column=5, padx=5, pady=4)
+                hover_color="#1E7E34")
 
     def recarregar_historico_se_ativo(self):
-        """Recarrega o histórico de empréstimos se a aba estiver ativa"""
+        """Recarrega o histórico de empréstimos se a aba já foi criada"""
         try:
 
-            if hasattr(self, 'notebook') and hasattr(self, 'usuario_logado'):
-
-                current_tab = self.notebook.get()
-                if "empréstimo" in current_tab.lower() or "histórico" in current_tab.lower():
-
-                    try:
-
-                        for child in self.notebook.winfo_children():
-                            if hasattr(child, 'winfo_children'):
-                                for grandchild in child.winfo_children():
-                                    if hasattr(
-                                            grandchild, 'winfo_children') and len(
-                                            grandchild.winfo_children()) > 0:
-
-                                        self.carregar_historico_emprestimos(
-                                            grandchild)
-                                        return
-                    except Exception:
-                        pass
+            if hasattr(self, 'tabela_historico') and self.tabela_historico.winfo_exists():
+                self.carregar_historico_emprestimos()
         except Exception:
 
             pass
@@ -2431,7 +2543,8 @@ class SistemaBibliotecaCompleto:
         )
         self.search_entry_catalogo.pack(side="left", padx=(0, 10))
         self.search_entry_catalogo.bind(
-            "<KeyRelease>", lambda e: self.buscar_livros_catalogo())
+            "<KeyRelease>",
+            lambda e: self.busca_catalogo.agendar(self.search_entry_catalogo.get()))
 
         ctk.CTkButton(
             search_frame,
@@ -2472,177 +2585,215 @@ class SistemaBibliotecaCompleto:
             header_frame.grid_columnconfigure(
                 i, weight=1 if i in [0, 1] else 0)
 
-        self.catalogo_content_frame = ctk.CTkScrollableFrame(
-            list_frame, height=350)
-        self.catalogo_content_frame.pack(
-            fill="both", expand=True, padx=5, pady=5)
+        self.tabela_catalogo = TabelaVirtual(
+            list_frame,
+            criar_linha=self.criar_linha_livro_catalogo,
+            preencher_linha=self.preencher_linha_livro_catalogo,
+            height=350)
+        self.tabela_catalogo.pack(fill="both", expand=True, padx=5, pady=5)
 
         self.carregar_catalogo_livros()
 
     def carregar_catalogo_livros(self):
         """Carrega livros do catálogo com priorização para professores"""
 
-        for widget in self.catalogo_content_frame.winfo_children():
-            widget.destroy()
-
-        try:
-            livros = Livro.listar_todos(incluir_inativos=False)
+        usuario_id = self.usuario_logado.id if self.usuario_logado is not None else None
+        professor = hasattr(
+            self, 'tipo_usuario_catalogo') and self.tipo_usuario_catalogo.lower() == 'professor'
 
+        def consultar():
+            livros = Livro.listar_todos(
+                incluir_inativos=False, campos=self.CAMPOS_CATALOGO)
+            pendentes = set()
+            if usuario_id is not None:
+                pendentes = Reserva.livros_aguardando_retirada(usuario_id)
             if not livros:
-                ctk.CTkLabel(
-                    self.catalogo_content_frame,
-                    text="📭 Nenhum livro disponível no momento",
-                    font=ctk.CTkFont(size=14)
-                ).pack(pady=50)
-                return
+                return [], pendentes
 
-            if hasattr(
-                    self,
-                    'tipo_usuario_catalogo') and self.tipo_usuario_catalogo.lower() == 'professor':
-                try:
-                    from Backend.Avaliacao import Avaliacao
-
-                    livros_com_media = []
-                    for livro in livros:
-                        media = Avaliacao.calcular_media_livro(livro.id)
-                        livros_com_media.append((livro, media))
+            medias = self.carregar_medias_catalogo(livros)
 
-                    livros_com_media.sort(key=lambda x: (-x[1], x[0].nome))
-                    livros = [livro for livro, media in livros_com_media]
+            if professor:
+                livros = sorted(
+                    livros, key=lambda l: (-medias.get(l.id, 0.0), l.nome))
 
-                except Exception as e:
-                    print(f"Erro ao ordenar por avaliações: {e}")
+            return [(livro, medias.get(livro.id, 0.0), livro.id in pendentes)
+                    for livro in livros], pendentes
 
-            for livro in livros:
-                self.criar_linha_livro_catalogo(livro)
+        def exibir(resultado):
+            itens, self.retiradas_pendentes = resultado
 
+            if not self.tabela_catalogo.winfo_exists():
+                return
+            self.tabela_catalogo.definir_itens(
+                itens, mensagem_vazia="📭 Nenhum livro disponível no momento")
+
+        # Mesma chave da busca do catálogo: a última pedida é a exibida
+        self.tarefas.executar(
+            consultar,
+            ao_concluir=exibir,
+            ao_falhar=lambda e: print(f"Erro ao carregar catálogo: {e}"),
+            chave="busca_catalogo")
+
+    def carregar_medias_catalogo(self, livros) -> dict:
+        """Médias de avaliação dos livros exibidos, em uma única consulta"""
+        try:
+            from Backend.Avaliacao import Avaliacao
+            resumos = Avaliacao.medias_por_livro([livro.id for livro in livros])
+            return {livro_id: r['media'] for livro_id, r in resumos.items()}
         except Exception as e:
-            print(f"Erro ao carregar catálogo: {e}")
-
-    def criar_linha_livro_catalogo(self, livro):
-        """Cria linha do catálogo de livros"""
+            print(f"Erro ao carregar avaliações: {e}")
+            return {}
 
-        row_frame = ctk.CTkFrame(self.catalogo_content_frame)
-        row_frame.pack(fill="x", pady=2, padx=2)
+    def criar_linha_livro_catalogo(self, row_frame) -> dict:
+        """Cria os widgets de uma linha do catálogo de livros"""
 
         for i in range(6):
             row_frame.grid_columnconfigure(i, weight=1 if i in [0, 1] else 0)
 
-        titulo_texto = livro.nome[:35] + \
-            "..." if len(livro.nome) > 35 else livro.nome
-        titulo_label = ctk.CTkLabel(
-            row_frame,
-            text=titulo_texto,
-            font=ctk.CTkFont(
-                weight="bold"))
-        titulo_label.grid(row=0, column=0, padx=5, pady=8, sticky="w")
-
-        autor_label = ctk.CTkLabel(row_frame, text=livro.autor)
-        autor_label.grid(row=0, column=1, padx=5, pady=8, sticky="w")
-
-        genero_label = ctk.CTkLabel(row_frame, text=livro.genero)
-        genero_label.grid(row=0, column=2, padx=5, pady=8)
-
-        try:
-            from Backend.Avaliacao import Avaliacao
-            media = Avaliacao.calcular_media_livro(livro.id)
-            if media > 0:
-                estrelas = "⭐" * int(media) + "☆" * (5 - int(media))
-                avaliacao_texto = f"{estrelas} ({media:.1f})"
-            else:
-                avaliacao_texto = "Sem avaliações"
-        except BaseException:
-            avaliacao_texto = "N/A"
-
-        avaliacao_label = ctk.CTkLabel(row_frame, text=avaliacao_texto)
-        avaliacao_label.grid(row=0, column=3, padx=5, pady=8)
-
-        disponivel = getattr(livro, 'quantidade_disponivel', 0)
-        if disponivel > 0:
-            disp_texto = f"✅ {disponivel} exemplar(es)"
-            disp_cor = "#28A745"
-        else:
-            disp_texto = "❌ Indisponível"
-            disp_cor = "#DC3545"
+        linha = {
+            'titulo': ctk.CTkLabel(row_frame, text="", font=ctk.CTkFont(weight="bold")),
+            'autor': ctk.CTkLabel(row_frame, text=""),
+            'genero': ctk.CTkLabel(row_frame, text=""),
+            'avaliacao': ctk.CTkLabel(row_frame, text=""),
+            'disponivel': ctk.CTkLabel(row_frame, text=""),
+        }
 
-        disp_label = ctk.CTkLabel(
-            row_frame,
-            text=disp_texto,
-            text_color=disp_cor)
-        disp_label.grid(row=0, column=4, padx=5, pady=8)
+        linha['titulo'].grid(row=0, column=0, padx=5, pady=8, sticky="w")
+        linha['autor'].grid(row=0, column=1, padx=5, pady=8, sticky="w")
+        linha['genero'].grid(row=0, column=2, padx=5, pady=8)
+        linha['avaliacao'].grid(row=0, column=3, padx=5, pady=8)
+        linha['disponivel'].grid(row=0, column=4, padx=5, pady=8)
 
         actions_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
         actions_frame.grid(row=0, column=5, padx=5, pady=4)
 
-        ctk.CTkButton(
+        linha['avaliacoes'] = ctk.CTkButton(
             actions_frame,
             text="⭐ Avaliações",
-            command=lambda l=livro: self.mostrar_avaliacoes_livro(l),
             width=90,
             height=25,
             fg_color="#FFC107",
             hover_color="#E0A800",
             text_color="black"
-        ).pack(side="left", padx=2)
+        )
+        linha['avaliacoes'].pack(side="left", padx=2)
 
-        if disponivel > 0:
-            ctk.CTkButton(
-                actions_frame,
-                text="� Emprestar",
-                command=lambda l=livro: self.pegar_emprestado(l),
-                width=80,
-                height=25,
-                fg_color="#28A745",
-                hover_color="#1E7E34"
-            ).pack(side="left", padx=2)
+        linha['emprestar'] = ctk.CTkButton(
+            actions_frame,
+            text="� Emprestar",
+            width=80,
+            height=25,
+            fg_color="#28A745",
+            hover_color="#1E7E34"
+        )
+        linha['emprestar'].pack(side="left", padx=2)
 
-        ctk.CTkButton(
+        linha['reservar'] = ctk.CTkButton(
             actions_frame,
             text="📋 Reservar",
-            command=lambda l=livro: self.fazer_reserva_livro(l),
             width=80,
             height=25,
             fg_color="#007BFF",
             hover_color="#0056B3"
-        ).pack(side="left", padx=2)
+        )
+        linha['reservar'].pack(side="left", padx=2)
 
-    def buscar_livros_catalogo(self):
-        """Filtra livros no catálogo"""
-        texto_busca = self.search_entry_catalogo.get().strip().lower()
+        return linha
 
-        for widget in self.catalogo_content_frame.winfo_children():
-            widget.destroy()
+    def preencher_linha_livro_catalogo(self, linha: dict, item, index: int):
+        """Exibe (livro, média, separado) numa linha já criada do catálogo"""
 
-        if not texto_busca:
-            self.carregar_catalogo_livros()
-            return
+        livro, media, separado = item
 
-        try:
-            livros = Livro.listar_todos(incluir_inativos=False)
-            livros_filtrados = []
+        titulo_texto = livro.nome[:35] + \
+            "..." if len(livro.nome) > 35 else livro.nome
+        linha['titulo'].configure(text=titulo_texto)
+        linha['autor'].configure(text=livro.autor)
+        linha['genero'].configure(text=livro.genero)
 
-            for livro in livros:
-                if (texto_busca in livro.nome.lower() or
-                    texto_busca in livro.autor.lower() or
-                    texto_busca in livro.isbn.lower() or
-                        texto_busca in livro.genero.lower()):
-                    livros_filtrados.append(livro)
+        if media > 0:
+            estrelas = "⭐" * int(media) + "☆" * (5 - int(media))
+            avaliacao_texto = f"{estrelas} ({media:.1f})"
+        else:
+            avaliacao_texto = "Sem avaliações"
+        linha['avaliacao'].configure(text=avaliacao_texto)
 
-            if not livros_filtrados:
-                ctk.CTkLabel(
-                    self.catalogo_content_frame,
-                    text="📭 Nenhum livro encontrado com os critérios de busca",
-                    font=ctk.CTkFont(size=14)
-                ).pack(pady=50)
+        disponivel = getattr(livro, 'quantidade_disponivel', 0)
+        if separado:
+            disp_texto = "📦 Separado para você"
+            disp_cor = "#007BFF"
+        elif disponivel > 0:
+            disp_texto = f"✅ {disponivel} exemplar(es)"
+            disp_cor = "#28A745"
+        else:
+            disp_texto = "❌ Indisponível"
+            disp_cor = "#DC3545"
+        linha['disponivel'].configure(text=disp_texto, text_color=disp_cor)
+
+        linha['avaliacoes'].configure(
+            command=lambda l=livro: self.mostrar_avaliacoes_livro(l))
+        linha['reservar'].configure(
+            command=lambda l=livro: self.fazer_reserva_livro(l))
+
+        if disponivel > 0 or separado:
+            linha['emprestar'].configure(
+                command=lambda l=livro: self.pegar_emprestado(l))
+            linha['emprestar'].pack(side="left", padx=2, before=linha['reservar'])
+        else:
+            linha['emprestar'].pack_forget()
+
+    def buscar_livros_catalogo(self):
+        """Filtra livros no catálogo"""
+        self.busca_catalogo.buscar_agora(self.search_entry_catalogo.get())
+
+    def consultar_catalogo(self, texto_busca: str) -> list:
+        """Consulta da busca do catálogo (roda fora da thread do Tk).
+
+        Devolve (livro, média, separado para o usuário); quem atualiza
+        retiradas_pendentes é exibir_busca_catalogo, já na thread do Tk.
+        Os livros vêm do índice em memória, por relevância, e o estoque é
+        lido do banco só para eles.
+        """
+        from Backend.IndiceLivros import obter_indice
+
+        encontrados = obter_indice().buscar(texto_busca, limite=100)
+        livros_filtrados = Livro.listar_por_ids(
+            [livro.id for livro in encontrados], campos=self.CAMPOS_CATALOGO)
+        pendentes = set()
+        if self.usuario_logado is not None:
+            pendentes = Reserva.livros_aguardando_retirada(self.usuario_logado.id)
+        medias = self.carregar_medias_catalogo(livros_filtrados) if livros_filtrados else {}
+        return [(livro, medias.get(livro.id, 0.0), livro.id in pendentes)
+                for livro in livros_filtrados]
+
+    @staticmethod
+    def filtrar_catalogo(itens: list, texto_busca: str) -> list:
+        """Refina localmente o resultado de uma busca anterior do catálogo.
+
+        O catálogo busca no IndiceLivros, e corresponde é a regra do índice.
+        """
+        from Backend.IndiceLivros import corresponde
+        return [item for item in itens if corresponde(item[0], texto_busca)]
+
+    def exibir_busca_catalogo(self, texto_busca: str, itens: list):
+        """Mostra o resultado da busca no catálogo"""
+
+        if not hasattr(self, 'tabela_catalogo') or not self.tabela_catalogo.winfo_exists():
+            return
+
+        for livro, _, separado in itens:
+            if separado:
+                self.retiradas_pendentes.add(livro.id)
             else:
-                for livro in livros_filtrados:
-                    self.criar_linha_livro_catalogo(livro)
+                self.retiradas_pendentes.discard(livro.id)
 
-        except Exception as e:
-            print(f"Erro na busca: {e}")
+        self.tabela_catalogo.definir_itens(
+            itens,
+            mensagem_vazia="📭 Nenhum livro encontrado com os critérios de busca")
 
     def limpar_busca_catalogo(self):
         """Limpa a busca do catálogo"""
+        self.busca_catalogo.cancelar()
         self.search_entry_catalogo.delete(0, 'end')
         self.carregar_catalogo_livros()
 
@@ -2679,146 +2830,204 @@ class SistemaBibliotecaCompleto:
             font=ctk.CTkFont(size=14)
         ).pack(pady=(0, 10))
 
-        try:
-            from Backend.Avaliacao import Avaliacao
-            avaliacoes = Avaliacao.listar_por_livro(livro.id)
+        conteudo_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        conteudo_frame.pack(fill="both", expand=True)
 
-            if avaliacoes:
-                media = Avaliacao.calcular_media_livro(livro.id)
-                total_avaliacoes = len(avaliacoes)
+        carregando_label = ctk.CTkLabel(
+            conteudo_frame,
+            text="⏳ Carregando avaliações...",
+            font=ctk.CTkFont(size=14)
+        )
+        carregando_label.pack(expand=True, pady=50)
 
-                stats_frame = ctk.CTkFrame(main_frame)
-                stats_frame.pack(fill="x", pady=(0, 15))
+        ctk.CTkButton(
+            main_frame,
+            text="✅ Fechar",
+            command=modal.destroy,
+            width=100
+        ).pack(pady=10)
 
-                estrelas_visual = "⭐" * int(media) + "☆" * (5 - int(media))
-                ctk.CTkLabel(
-                    stats_frame,
-                    text=f"Média: {estrelas_visual} {media:.1f}/5.0",
-                    font=ctk.CTkFont(size=16, weight="bold")
-                ).pack(pady=5)
+        def carregar():
+            from Backend.Avaliacao import Avaliacao
 
-                ctk.CTkLabel(
-                    stats_frame,
-                    text=f"Total de avaliações: {total_avaliacoes}",
-                    font=ctk.CTkFont(size=12)
-                ).pack(pady=5)
+            resumo = Avaliacao.resumo_livro(livro.id)
+            if not resumo['total']:
+                return resumo, []
 
-                avaliacoes_frame = ctk.CTkScrollableFrame(
-                    main_frame, height=300)
-                avaliacoes_frame.pack(fill="both", expand=True, pady=(0, 15))
-
-                for i, avaliacao in enumerate(avaliacoes, 1):
-                    av_frame = ctk.CTkFrame(avaliacoes_frame)
-                    av_frame.pack(fill="x", pady=5, padx=5)
-
-                    av_header = ctk.CTkFrame(av_frame, fg_color="transparent")
-                    av_header.pack(fill="x", padx=10, pady=5)
-
-                    estrelas = "⭐" * avaliacao.nota + \
-                        "☆" * (5 - avaliacao.nota)
-                    ctk.CTkLabel(
-                        av_header,
-                        text=f"{estrelas} ({avaliacao.nota}/5)",
-                        font=ctk.CTkFont(weight="bold")
-                    ).pack(side="left")
-
-                    try:
-                        from Backend.Usuario import Usuario
-                        usuario_avaliador = Usuario.buscar_por_id(
-                            avaliacao.usuario_id)
-                        if usuario_avaliador:
-                            tipo_icon = "👨‍🏫" if usuario_avaliador.tipo_usuario.lower() == 'professor' else "👨‍🎓"
-                            nome_curto = usuario_avaliador.nome.split()[0]
-                            avaliador_info = f"{tipo_icon} {nome_curto}"
-                        else:
-                            avaliador_info = "👤 Usuário"
-                    except BaseException:
-                        avaliador_info = "👤 Usuário"
-
-                    ctk.CTkLabel(
-                        av_header,
-                        text=avaliador_info,
-                        font=ctk.CTkFont(size=10),
-                        text_color="gray"
-                    ).pack(side="right", padx=(5, 10))
-
-                    data_str = avaliacao.data_avaliacao.strftime(
-                        "%d/%m/%Y") if avaliacao.data_avaliacao else "Data N/A"
-                    ctk.CTkLabel(
-                        av_header,
-                        text=data_str,
-                        font=ctk.CTkFont(size=10),
-                        text_color="gray"
-                    ).pack(side="right")
-
-                    if avaliacao.comentario:
-                        ctk.CTkLabel(
-                            av_frame,
-                            text=avaliacao.comentario,
-                            font=ctk.CTkFont(size=12),
-                            wraplength=500,
-                            justify="left"
-                        ).pack(fill="x", padx=15, pady=(0, 10))
+            return resumo, Avaliacao.listar_por_livro_com_avaliador(
+                livro.id, limite=self.TAMANHO_PAGINA_AVALIACOES)
 
-            else:
-                ctk.CTkLabel(
-                    main_frame,
-                    text="😔 Este livro ainda não possui avaliações",
-                    font=ctk.CTkFont(size=14)
-                ).pack(expand=True, pady=50)
+        def exibir(resultado):
+            if not modal.winfo_exists():
+                return
+            carregando_label.destroy()
+            self.exibir_avaliacoes_livro(conteudo_frame, livro, *resultado)
 
-        except Exception as e:
+        def falhar(e):
             print(f"Erro ao carregar avaliações: {e}")
+            if not modal.winfo_exists():
+                return
+            carregando_label.configure(text="❌ Erro ao carregar avaliações")
+
+        self.tarefas.executar(
+            carregar,
+            ao_concluir=exibir,
+            ao_falhar=falhar,
+            chave="avaliacoes_livro")
+
+    def exibir_avaliacoes_livro(self, parent, livro, resumo: dict, avaliacoes: list):
+        """Monta a média e a primeira página de avaliações"""
+
+        if not avaliacoes:
             ctk.CTkLabel(
-                main_frame,
-                text="❌ Erro ao carregar avaliações",
+                parent,
+                text="😔 Este livro ainda não possui avaliações",
                 font=ctk.CTkFont(size=14)
             ).pack(expand=True, pady=50)
+            return
 
-        ctk.CTkButton(
-            main_frame,
-            text="✅ Fechar",
-            command=modal.destroy,
-            width=100
-        ).pack(pady=10)
+        media = resumo['media']
+        total_avaliacoes = resumo['total']
+
+        stats_frame = ctk.CTkFrame(parent)
+        stats_frame.pack(fill="x", pady=(0, 15))
+
+        estrelas_visual = "⭐" * int(media) + "☆" * (5 - int(media))
+        ctk.CTkLabel(
+            stats_frame,
+            text=f"Média: {estrelas_visual} {media:.1f}/5.0",
+            font=ctk.CTkFont(size=16, weight="bold")
+        ).pack(pady=5)
+
+        ctk.CTkLabel(
+            stats_frame,
+            text=f"Total de avaliações: {total_avaliacoes}",
+            font=ctk.CTkFont(size=12)
+        ).pack(pady=5)
+
+        avaliacoes_frame = ctk.CTkScrollableFrame(parent, height=300)
+        avaliacoes_frame.pack(fill="both", expand=True, pady=(0, 15))
+
+        btn_carregar_mais = ctk.CTkButton(
+            avaliacoes_frame,
+            text="⬇️ Carregar mais avaliações",
+            width=200,
+            fg_color="#6C757D",
+            hover_color="#545B62"
+        )
+        exibidas = []
+
+        def acrescentar(pagina):
+            if not avaliacoes_frame.winfo_exists():
+                return
+            for avaliacao in pagina:
+                self.criar_item_avaliacao(avaliacoes_frame, avaliacao)
+            exibidas.extend(pagina)
+
+            # O botão fica sempre depois da última avaliação
+            btn_carregar_mais.pack_forget()
+            if pagina and len(exibidas) < total_avaliacoes:
+                btn_carregar_mais.pack(pady=10)
+
+        def carregar_mais():
+            from Backend.Avaliacao import Avaliacao
+            self.tarefas.executar(
+                Avaliacao.listar_por_livro_com_avaliador,
+                livro.id,
+                limite=self.TAMANHO_PAGINA_AVALIACOES,
+                offset=len(exibidas),
+                ao_concluir=acrescentar,
+                ao_falhar=lambda e: print(f"Erro ao carregar avaliações: {e}"),
+                chave="avaliacoes_livro",
+                desabilitar=[btn_carregar_mais])
+
+        btn_carregar_mais.configure(command=carregar_mais)
+        acrescentar(avaliacoes)
+
+    def criar_item_avaliacao(self, parent, avaliacao: dict):
+        """Cria o cartão de uma avaliação (dict de listar_por_livro_com_avaliador)"""
+
+        av_frame = ctk.CTkFrame(parent)
+        av_frame.pack(fill="x", pady=5, padx=5)
+
+        av_header = ctk.CTkFrame(av_frame, fg_color="transparent")
+        av_header.pack(fill="x", padx=10, pady=5)
+
+        nota = avaliacao['nota']
+        estrelas = "⭐" * nota + "☆" * (5 - nota)
+        ctk.CTkLabel(
+            av_header,
+            text=f"{estrelas} ({nota}/5)",
+            font=ctk.CTkFont(weight="bold")
+        ).pack(side="left")
+
+        nome = avaliacao.get('avaliador_nome')
+        if nome:
+            tipo = (avaliacao.get('avaliador_tipo') or '').lower()
+            tipo_icon = "👨‍🏫" if tipo == 'professor' else "👨‍🎓"
+            avaliador_info = f"{tipo_icon} {nome.split()[0]}"
+        else:
+            avaliador_info = "👤 Usuário"
+
+        ctk.CTkLabel(
+            av_header,
+            text=avaliador_info,
+            font=ctk.CTkFont(size=10),
+            text_color="gray"
+        ).pack(side="right", padx=(5, 10))
+
+        data_avaliacao = avaliacao.get('data_avaliacao')
+        data_str = data_avaliacao.strftime(
+            "%d/%m/%Y") if data_avaliacao else "Data N/A"
+        ctk.CTkLabel(
+            av_header,
+            text=data_str,
+            font=ctk.CTkFont(size=10),
+            text_color="gray"
+        ).pack(side="right")
+
+        if avaliacao.get('comentario'):
+            ctk.CTkLabel(
+                av_frame,
+                text=avaliacao['comentario'],
+                font=ctk.CTkFont(size=12),
+                wraplength=500,
+                justify="left"
+            ).pack(fill="x", padx=15, pady=(0, 10))
 
     def pegar_emprestado(self, livro):
         """Realiza empréstimo do livro"""
-        try:
+        if self.tarefas.em_andamento("emprestimo"):
+            return
+
+        usuario_id = self.usuario_logado.id
+        separado = livro.id in self.retiradas_pendentes
+
+        def realizar():
             from Backend.Emprestimo import Emprestimo, StatusEmprestimo
             from datetime import datetime, timedelta
 
-            emprestimos_ativos = Emprestimo.listar_por_usuario(
-                self.usuario_logado.id)
+            emprestimos_ativos = Emprestimo.listar_por_usuario(usuario_id)
             ja_tem_emprestimo = any(
                 emp.livro_id == livro.id and emp.status in [
                     StatusEmprestimo.ATIVO,
                     StatusEmprestimo.ATRASADO] for emp in emprestimos_ativos)
 
             if ja_tem_emprestimo:
-                messagebox.showwarning(
-                    "Empréstimo Duplicado",
-                    "Você já possui um empréstimo ativo deste livro!")
-                return
+                return "duplicado", None, None
 
             disponivel = getattr(livro, 'quantidade_disponivel', 0)
             print(
                 f"🔍 DEBUG: Livro {livro.nome} - Quantidade disponível: {disponivel}")
-            print(f"🔍 DEBUG: Livro ativo: {livro.ativo}")
-            print(
-                f"🔍 DEBUG: Disponível para empréstimo: {livro.disponivel_para_emprestimo}")
 
-            if disponivel <= 0:
-                messagebox.showwarning(
-                    "Indisponível",
-                    "Este livro não está disponível no momento. Deseja fazer uma reserva?")
-                return
+            if disponivel <= 0 and not separado:
+                return "indisponivel", None, None
 
             data_emprestimo = datetime.now()
             data_devolucao_prevista = data_emprestimo + timedelta(days=14)
 
             novo_emprestimo = Emprestimo(
-                usuario_id=self.usuario_logado.id,
+                usuario_id=usuario_id,
                 livro_id=livro.id,
                 biblioteca_id=1,
                 data_emprestimo=data_emprestimo,
@@ -2826,129 +3035,163 @@ class SistemaBibliotecaCompleto:
             )
 
             sucesso, mensagem = novo_emprestimo.salvar()
+            return ("sucesso" if sucesso else "falha"), mensagem, data_devolucao_prevista
 
-            if sucesso:
+        def concluir(resultado):
+            situacao, mensagem, data_devolucao_prevista = resultado
+
+            if situacao == "duplicado":
+                messagebox.showwarning(
+                    "Empréstimo Duplicado",
+                    "Você já possui um empréstimo ativo deste livro!")
+            elif situacao == "indisponivel":
+                messagebox.showwarning(
+                    "Indisponível",
+                    "Este livro não está disponível no momento. Deseja fazer uma reserva?")
+            elif situacao == "sucesso":
                 messagebox.showinfo(
                     "Sucesso", f"Empréstimo realizado com sucesso!\n\n"
                     f"📚 Livro: {livro.nome}\n"
                     f"📅 Data de devolução: {data_devolucao_prevista.strftime('%d/%m/%Y')}\n"
                     f"⏰ Prazo: 14 dias")
 
+                self.busca_catalogo.invalidar()
                 self.carregar_catalogo_livros()
+            elif "limite" in mensagem.lower() or "atingiu" in mensagem.lower():
+                resposta = messagebox.askyesno(
+                    "Limite Atingido", f"Você atingiu o limite de empréstimos.\n\n"
+                    f"Deseja fazer uma reserva do livro '{livro.nome}'?\n\n"
+                    f"Você será notificado quando o livro estiver disponível.")
+                if resposta:
+                    self.fazer_reserva_livro(livro)
             else:
+                messagebox.showerror(
+                    "Erro", f"Falha ao realizar empréstimo: {mensagem}")
 
-                if "limite" in mensagem.lower() or "atingiu" in mensagem.lower():
-                    resposta = messagebox.askyesno(
-                        "Limite Atingido", f"Você atingiu o limite de empréstimos.\n\n"
-                        f"Deseja fazer uma reserva do livro '{livro.nome}'?\n\n"
-                        f"Você será notificado quando o livro estiver disponível.")
-                    if resposta:
-                        self.fazer_reserva_livro(livro)
-                else:
-                    messagebox.showerror(
-                        "Erro", f"Falha ao realizar empréstimo: {mensagem}")
-
-        except Exception as e:
+        def falhar(e):
             messagebox.showerror(
                 "Erro", f"Erro ao processar empréstimo: {str(e)}")
             print(f"Erro detalhado: {e}")
-            import traceback
-            traceback.print_exc()
+
+        self.tarefas.executar(
+            realizar,
+            ao_concluir=concluir,
+            ao_falhar=falhar,
+            chave="emprestimo")
 
     def devolver_livro(self, emprestimo_id):
         """Realiza devolução do livro"""
-        try:
-            from Backend.Emprestimo import Emprestimo
-            from datetime import datetime
-            from tkinter import messagebox
+        if self.tarefas.em_andamento("devolucao"):
+            return
 
-            resposta = messagebox.askyesno(
-                "Confirmar Devolução",
-                "Deseja confirmar a devolução deste livro?"
-            )
+        resposta = messagebox.askyesno(
+            "Confirmar Devolução",
+            "Deseja confirmar a devolução deste livro?"
+        )
 
-            if not resposta:
-                return
+        if not resposta:
+            return
+
+        def realizar():
+            from Backend.Emprestimo import Emprestimo
+            from datetime import datetime
 
             emprestimo_obj = Emprestimo.buscar_por_id(emprestimo_id)
 
             if not emprestimo_obj:
-                messagebox.showerror("Erro", "Empréstimo não encontrado!")
-                return
+                return False, "Empréstimo não encontrado!"
 
             sucesso, mensagem = emprestimo_obj.devolver(datetime.now())
+            if not sucesso:
+                mensagem = f"Falha na devolução: {mensagem}"
+            return sucesso, mensagem
+
+        def concluir(resultado):
+            sucesso, mensagem = resultado
 
             if sucesso:
+                if "reserva" in mensagem:
+                    detalhe = "📦 O exemplar foi separado para o próximo da fila de espera."
+                else:
+                    detalhe = "📚 O livro já está disponível para outros usuários."
                 messagebox.showinfo(
                     "Sucesso",
-                    "Livro devolvido com sucesso!\n\n"
-                    "📚 O livro já está disponível para outros usuários."
+                    f"Livro devolvido com sucesso!\n\n{detalhe}"
                 )
 
                 self.recarregar_historico_se_ativo()
 
+                self.busca_catalogo.invalidar()
                 if hasattr(self, 'carregar_catalogo_livros'):
                     self.carregar_catalogo_livros()
             else:
-                messagebox.showerror("Erro", f"Falha na devolução: {mensagem}")
+                messagebox.showerror("Erro", mensagem)
 
-        except Exception as e:
+        def falhar(e):
             messagebox.showerror(
                 "Erro", f"Erro ao processar devolução: {str(e)}")
             print(f"Erro detalhado: {e}")
-            import traceback
-            traceback.print_exc()
+
+        self.tarefas.executar(
+            realizar,
+            ao_concluir=concluir,
+            ao_falhar=falhar,
+            chave="devolucao")
 
     def fazer_reserva_livro(self, livro):
         """Faz reserva de um livro"""
-        try:
-            from Backend.Reserva import Reserva, StatusReserva
-
-            reservas_ativas = Reserva.listar_ativas(livro.id)
-            ja_reservou = any(
-                r.usuario_id == self.usuario_logado.id for r in reservas_ativas)
+        if self.tarefas.em_andamento("reserva"):
+            return
 
-            if ja_reservou:
-                messagebox.showwarning(
-                    "Reserva Duplicada",
-                    "Você já possui uma reserva ativa para este livro!")
-                return
+        usuario_id = self.usuario_logado.id
+        professor = self.usuario_logado.tipo_usuario.lower() == 'professor'
 
-            nova_reserva = Reserva(
-                usuario_id=self.usuario_logado.id,
-                livro_id=livro.id
-            )
+        def realizar():
+            from Backend.Reserva import Reserva
+            from Backend.Notificacao import Notificacao
 
+            nova_reserva = Reserva(usuario_id=usuario_id, livro_id=livro.id)
             sucesso, mensagem = nova_reserva.salvar()
+            if not sucesso:
+                return False, mensagem, None
 
-            if sucesso:
+            if professor:
+                mensagem_notif = f"Sua reserva PRIORITÁRIA para o livro '{livro.nome}' foi registrada. Como professor, você tem prioridade na fila de espera."
+            else:
+                mensagem_notif = f"Sua reserva para o livro '{livro.nome}' foi registrada com sucesso. Você será notificado quando o livro estiver disponível."
 
-                from Backend.Notificacao import Notificacao
+            Notificacao.criar_notificacao_sistema(
+                usuario_id=usuario_id,
+                titulo=f"📋 Reserva Confirmada: {livro.nome}",
+                mensagem=mensagem_notif,
+                livro_id=livro.id
+            )
 
-                if self.usuario_logado.tipo_usuario.lower() == 'professor':
-                    mensagem_notif = f"Sua reserva PRIORITÁRIA para o livro '{livro.nome}' foi registrada. Como professor, você tem prioridade na fila de espera."
-                    titulo_dialog = "Reserva Prioritária Realizada"
-                else:
-                    mensagem_notif = f"Sua reserva para o livro '{livro.nome}' foi registrada com sucesso. Você será notificado quando o livro estiver disponível."
-                    titulo_dialog = "Reserva Realizada"
-
-                Notificacao.criar_notificacao_sistema(
-                    usuario_id=self.usuario_logado.id,
-                    titulo=f"📋 Reserva Confirmada: {livro.nome}",
-                    mensagem=mensagem_notif,
-                    livro_id=livro.id
-                )
+            return True, mensagem, nova_reserva.posicao_na_fila()
 
+        def concluir(resultado):
+            sucesso, mensagem, posicao = resultado
+
+            if sucesso:
+                titulo_dialog = "Reserva Prioritária Realizada" if professor else "Reserva Realizada"
                 messagebox.showinfo(
                     titulo_dialog,
-                    f"Reserva do livro '{livro.nome}' realizada com sucesso!\n\n{mensagem}")
+                    f"Reserva do livro '{livro.nome}' realizada com sucesso!\n\n{mensagem}"
+                    + (f"\n\n📋 Sua posição na fila: {posicao}º" if posicao else ""))
+            elif "já possui uma reserva ativa" in mensagem:
+                messagebox.showwarning(
+                    "Reserva Duplicada",
+                    "Você já possui uma reserva ativa para este livro!")
             else:
                 messagebox.showerror(
                     "Erro", f"Erro ao fazer reserva: {mensagem}")
 
-        except Exception as e:
-            messagebox.showerror(
-                "Erro", f"Erro ao processar reserva: {str(e)}")
+        self.tarefas.executar(
+            realizar,
+            ao_concluir=concluir,
+            ao_falhar=lambda e: messagebox.showerror(
+                "Erro", f"Erro ao processar reserva: {str(e)}"),
+            chave="reserva")
 
     def criar_aba_avaliacoes_usuario(self, parent):
         """Cria aba para o usuário gerenciar suas avaliações"""
@@ -2983,12 +3226,17 @@ class SistemaBibliotecaCompleto:
                 pady=50)
             return
 
-        try:
-            from Backend.Avaliacao import Avaliacao
-            from Backend.Livro import Livro
+        carregando_label = ctk.CTkLabel(
+            main_frame,
+            text="⏳ Carregando suas avaliações...",
+            font=ctk.CTkFont(size=14)
+        )
+        carregando_label.pack(pady=50)
 
-            avaliacoes_usuario = self.buscar_avaliacoes_usuario(
-                self.usuario_logado.id)
+        def exibir(avaliacoes_usuario):
+            if not main_frame.winfo_exists():
+                return
+            carregando_label.destroy()
 
             if avaliacoes_usuario:
 
@@ -3037,26 +3285,19 @@ class SistemaBibliotecaCompleto:
                     text_color="#6C757D").pack(
                     pady=10)
 
-        except Exception as e:
+        def falhar(e):
             print(f"Erro ao carregar avaliações do usuário: {e}")
-            ctk.CTkLabel(
-                main_frame,
-                text="❌ Erro ao carregar suas avaliações",
-                font=ctk.CTkFont(size=14)
-            ).pack(expand=True)
-
-    def buscar_avaliacoes_usuario(self, usuario_id):
-        """Busca todas as avaliações feitas por um usuário"""
-        if not BACKEND_DISPONIVEL:
-            return []
-            
-        try:
-            from Backend.Avaliacao import Avaliacao
-            return Avaliacao.listar_por_usuario(usuario_id)
-            
-        except Exception as e:
-            print(f"Erro ao buscar avaliações do usuário: {e}")
-            return []
+            if main_frame.winfo_exists():
+                carregando_label.configure(
+                    text="❌ Erro ao carregar suas avaliações")
+
+        from Backend.Avaliacao import Avaliacao
+        self.tarefas.executar(
+            Avaliacao.listar_por_usuario,
+            self.usuario_logado.id,
+            ao_concluir=exibir,
+            ao_falhar=falhar,
+            chave="avaliacoes_usuario")
 
     def atualizar_aba_avaliacoes(self):
         """Atualiza a aba de avaliações do usuário"""
@@ -3136,20 +3377,35 @@ class SistemaBibliotecaCompleto:
     def mostrar_formulario_avaliacao(
             self, livro_id, livro_titulo, emprestimo_id):
         """Mostra formulário para avaliar um livro usando ID do empréstimo como chave"""
+        from Backend.Avaliacao import Avaliacao
 
-        try:
-            from Backend.Avaliacao import Avaliacao
-
-            avaliacoes = Avaliacao.listar_por_emprestimo(emprestimo_id)
-
+        def concluir(avaliacoes):
             if avaliacoes:
                 messagebox.showinfo(
                     "Avaliação Existente",
                     "Você já avaliou este empréstimo!")
                 return
+            self.abrir_formulario_avaliacao(
+                livro_id, livro_titulo, emprestimo_id)
 
-        except Exception as e:
+        def falhar(e):
+            # Sem a checagem o formulário abre; salvar recusa a duplicada
             print(f"Erro ao verificar avaliação: {e}")
+            self.abrir_formulario_avaliacao(
+                livro_id, livro_titulo, emprestimo_id)
+
+        if self.tarefas.em_andamento("verificar_avaliacao"):
+            return
+
+        self.tarefas.executar(
+            Avaliacao.listar_por_emprestimo, emprestimo_id,
+            ao_concluir=concluir,
+            ao_falhar=falhar,
+            chave="verificar_avaliacao")
+
+    def abrir_formulario_avaliacao(
+            self, livro_id, livro_titulo, emprestimo_id):
+        """Abre o modal de avaliação de um empréstimo ainda não avaliado"""
 
         modal = ctk.CTkToplevel(self.root)
         modal.title(f"⭐ Avaliar: {livro_titulo}")
@@ -3219,22 +3475,21 @@ class SistemaBibliotecaCompleto:
         buttons_frame.pack(pady=(0, 10))
 
         def salvar_avaliacao():
-            try:
-                from Backend.Avaliacao import Avaliacao
+            from Backend.Avaliacao import Avaliacao
 
-                comentario = comentario_text.get("1.0", "end-1c").strip()
-                comentario = comentario if comentario else None
+            comentario = comentario_text.get("1.0", "end-1c").strip()
+            comentario = comentario if comentario else None
 
-                nova_avaliacao = Avaliacao(
-                    livro_id=livro_id,
-                    usuario_id=self.usuario_logado.id,
-                    nota=nota_var.get(),
-                    comentario=comentario,
-                    emprestimo_id=emprestimo_id
-                )
-
-                sucesso, mensagem = nova_avaliacao.salvar()
+            nova_avaliacao = Avaliacao(
+                livro_id=livro_id,
+                usuario_id=self.usuario_logado.id,
+                nota=nota_var.get(),
+                comentario=comentario,
+                emprestimo_id=emprestimo_id
+            )
 
+            def concluir(resultado):
+                sucesso, mensagem = resultado
                 if sucesso:
                     messagebox.showinfo(
                         "Sucesso", "Avaliação salva com sucesso!")
@@ -3244,13 +3499,15 @@ class SistemaBibliotecaCompleto:
                 else:
                     messagebox.showerror("Erro", mensagem)
 
-            except Exception as e:
-                messagebox.showerror(
-                    "Erro", f"Erro ao salvar avaliação: {str(e)}")
-                import traceback
-                traceback.print_exc()
+            self.tarefas.executar(
+                nova_avaliacao.salvar,
+                ao_concluir=concluir,
+                ao_falhar=lambda e: messagebox.showerror(
+                    "Erro", f"Erro ao salvar avaliação: {str(e)}"),
+                chave="salvar_avaliacao",
+                desabilitar=[botao_salvar])
 
-        ctk.CTkButton(
+        botao_salvar = ctk.CTkButton(
             buttons_frame,
             text="⭐ Salvar Avaliação",
             command=salvar_avaliacao,
@@ -3258,7 +3515,8 @@ class SistemaBibliotecaCompleto:
             fg_color="#FFC107",
             hover_color="#E0A800",
             text_color="black"
-        ).pack(side="left", padx=10)
+        )
+        botao_salvar.pack(side="left", padx=10)
 
         ctk.CTkButton(
             buttons_frame,
@@ -3302,15 +3560,31 @@ class SistemaBibliotecaCompleto:
             width=180,
             fg_color="#28A745",
             hover_color="#1E7E34"
-        ).pack(side="right", padx=20, pady=15)
+        ).pack(side="right", padx=(0, 20), pady=15)
+
+        ctk.CTkButton(
+            header_frame,
+            text="🗄️ Arquivar Todas",
+            command=lambda: self.arquivar_todas_notificacoes(modal),
+            width=130,
+            fg_color="#6C757D",
+            hover_color="#545B62"
+        ).pack(side="right", padx=10, pady=15)
 
         notif_frame = ctk.CTkScrollableFrame(main_frame)
         notif_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
-        try:
-            from Backend.Notificacao import Notificacao
-            notificacoes = Notificacao.listar_por_usuario(
-                self.usuario_logado.id, apenas_nao_lidas=False)
+        carregando_label = ctk.CTkLabel(
+            notif_frame,
+            text="⏳ Carregando notificações...",
+            font=ctk.CTkFont(size=14)
+        )
+        carregando_label.pack(pady=50)
+
+        def exibir(notificacoes):
+            if not modal.winfo_exists():
+                return
+            carregando_label.destroy()
 
             if not notificacoes:
                 ctk.CTkLabel(
@@ -3322,8 +3596,20 @@ class SistemaBibliotecaCompleto:
                 for notif in notificacoes:
                     self.criar_item_notificacao(notif_frame, notif)
 
-        except Exception as e:
+        def falhar(e):
             print(f"Erro ao carregar notificações: {e}")
+            if modal.winfo_exists():
+                carregando_label.configure(
+                    text="❌ Erro ao carregar notificações")
+
+        from Backend.Notificacao import Notificacao
+        self.tarefas.executar(
+            Notificacao.listar_por_usuario,
+            self.usuario_logado.id,
+            apenas_nao_lidas=False,
+            ao_concluir=exibir,
+            ao_falhar=falhar,
+            chave="notificacoes")
 
         ctk.CTkButton(
             main_frame,
@@ -3367,51 +3653,124 @@ class SistemaBibliotecaCompleto:
         ).pack(anchor="w", padx=15, pady=(0, 10))
 
         if notificacao.status.value == "NAO_LIDA":
-            ctk.CTkButton(
+            botao_lida = ctk.CTkButton(
                 notif_frame,
                 text="✅ Marcar como Lida",
-                command=lambda: self.marcar_notificacao_lida(notificacao),
+                command=lambda: self.marcar_notificacao_lida(
+                    notificacao, botao_lida),
                 width=150,
                 height=25,
                 fg_color="#28A745",
                 hover_color="#1E7E34"
-            ).pack(anchor="e", padx=15, pady=(0, 10))
+            )
+            botao_lida.pack(anchor="e", padx=15, pady=(0, 10))
 
-    def marcar_notificacao_lida(self, notificacao):
+    def marcar_notificacao_lida(self, notificacao, botao=None):
         """Marca uma notificação como lida"""
-        try:
-            sucesso, mensagem = notificacao.marcar_como_lida()
+
+        def concluir(resultado):
+            sucesso, mensagem = resultado
             if sucesso:
+                self.atualizar_contador_notificacoes(reagendar=False)
 
                 messagebox.showinfo(
                     "Sucesso", "Notificação marcada como lida!")
             else:
                 messagebox.showerror("Erro", mensagem)
-        except Exception as e:
+
+        def falhar(e):
             messagebox.showerror(
                 "Erro", f"Erro ao marcar notificação: {str(e)}")
 
+        self.tarefas.executar(
+            notificacao.marcar_como_lida,
+            ao_concluir=concluir,
+            ao_falhar=falhar,
+            chave=f"notificacao_lida_{notificacao.id}",
+            desabilitar=[botao] if botao is not None else ())
+
     def marcar_todas_como_lidas(self, modal):
         """Marca todas as notificações como lidas"""
-        try:
-            from Backend.Notificacao import Notificacao
-            notificacoes = Notificacao.listar_por_usuario(
-                self.usuario_logado.id, apenas_nao_lidas=True)
+        from Backend.Notificacao import Notificacao
+        self.atualizar_notificacoes_em_lote(
+            modal, Notificacao.marcar_todas_como_lidas,
+            "notificação(ões) marcada(s) como lida(s)")
+
+    def arquivar_todas_notificacoes(self, modal):
+        """Arquiva todas as notificações do usuário"""
+        from Backend.Notificacao import Notificacao
+        self.atualizar_notificacoes_em_lote(
+            modal, Notificacao.arquivar_todas,
+            "notificação(ões) arquivada(s)")
+
+    def atualizar_notificacoes_em_lote(self, modal, operacao, descricao):
+        """Roda operacao(usuario_id) fora da thread do Tk e fecha o modal"""
+
+        def concluir(total):
+            self.atualizar_contador_notificacoes(reagendar=False)
+            messagebox.showinfo("Sucesso", f"{total} {descricao}!")
+            if modal.winfo_exists():
+                modal.destroy()
+
+        def falhar(e):
+            messagebox.showerror(
+                "Erro", f"Erro ao atualizar notificações: {str(e)}")
 
-            for notif in notificacoes:
-                notif.marcar_como_lida()
+        if self.tarefas.em_andamento("notificacoes_lote"):
+            return
 
-            messagebox.showinfo(
-                "Sucesso",
-                f"{len(notificacoes)} notificação(ões) marcada(s) como lida(s)!")
-            modal.destroy()
+        self.tarefas.executar(
+            operacao, self.usuario_logado.id,
+            ao_concluir=concluir,
+            ao_falhar=falhar,
+            chave="notificacoes_lote")
+
+    def atualizar_contador_notificacoes(self, reagendar: bool = True):
+        """Consulta as notificações novas desde a última vista e atualiza o
+        contador do sino; repete a cada INTERVALO_NOTIFICACOES_MS enquanto
+        o painel do usuário estiver aberto"""
+        from Backend.Notificacao import Notificacao
+
+        if reagendar:
+            self.agendamento_notificacoes = None
+        if (self.usuario_logado is None or self.notificacoes_btn is None
+                or not self.notificacoes_btn.winfo_exists()):
+            return
 
-        except Exception as e:
-            messagebox.showerror(
-                "Erro", f"Erro ao marcar notificações: {str(e)}")
+        def concluir(novidades):
+            self.ultima_notificacao_id = novidades['ultimo_id']
+            if self.notificacoes_btn is None or not self.notificacoes_btn.winfo_exists():
+                return
+
+            total = novidades['nao_lidas']
+            self.notificacoes_btn.configure(
+                text=f"🔔 Notificações ({total})" if total else "🔔 Notificações",
+                fg_color="#FFC107" if total else "#6C757D",
+                text_color="black" if total else "white")
+
+        self.tarefas.executar(
+            Notificacao.buscar_novidades,
+            self.usuario_logado.id, self.ultima_notificacao_id,
+            ao_concluir=concluir,
+            ao_falhar=lambda e: print(f"✗ Erro ao consultar notificações: {e}"),
+            chave="contador_notificacoes",
+            silenciosa=True)
+
+        if reagendar:
+            self.agendamento_notificacoes = self.root.after(
+                self.INTERVALO_NOTIFICACOES_MS, self.atualizar_contador_notificacoes)
+
+    def parar_contador_notificacoes(self):
+
+        if self.agendamento_notificacoes is not None:
+            self.root.after_cancel(self.agendamento_notificacoes)
+            self.agendamento_notificacoes = None
+        self.tarefas.cancelar("contador_notificacoes")
+        self.notificacoes_btn = None
 
     def fazer_logout(self):
         """Realiza o logout do usuário"""
+        self.parar_contador_notificacoes()
         messagebox.showinfo(
             "Logout",
             f"Logout realizado com sucesso! Até logo, {self.usuario_logado.nome}!")
@@ -3421,6 +3780,37 @@ class SistemaBibliotecaCompleto:
         self.livros_atuais = []
         self.criar_tela_selecao_usuario()
 
+    def varrer_atrasados(self):
+        """Atualiza status e multas dos atrasados, cria os avisos do dia e
+        agenda a próxima rodada (reservas vencidas ficam com o
+        AgendadorExpiracoes)"""
+
+        def varrer():
+            return Emprestimo.varrer_atrasados(), Notificacao.gerar_alertas_atraso()
+
+        def concluir(resultado):
+            alterados, avisos = resultado
+            if alterados or avisos:
+                print(f"✓ {alterados} empréstimo(s) atualizados como atrasados, "
+                      f"{avisos} aviso(s) de atraso criados")
+
+        if not self.tarefas.em_andamento("varredura_atrasados"):
+            self.tarefas.executar(
+                varrer,
+                ao_concluir=concluir,
+                ao_falhar=lambda e: print(f"✗ Erro na varredura de atrasados: {e}"),
+                chave="varredura_atrasados",
+                silenciosa=True)
+
+        self.root.after(self.INTERVALO_VARREDURA_MS, self.varrer_atrasados)
+
+    def fechar_janela(self):
+        """Encerra as tarefas em segundo plano e fecha a aplicação"""
+        self.tarefas.encerrar()
+        if BACKEND_DISPONIVEL:
+            parar_agendador()
+        self.root.destroy()
+
     def executar(self):
         """Executa a aplicação"""
         self.root.mainloop()
@@ -0,0 +1,291 @@
+import math
+import sys
+import tkinter
+from typing import Any, Callable, Optional
+
+import customtkinter as ctk
+
+
+COR_LINHA = ["gray92", "gray14"]
+COR_LINHA_SELECIONADA = ["#E3F2FD", "#1E3A8A"]
+
+
+class _Linha:
+    """Linha reaproveitável: o frame, a janela dele no canvas e os widgets
+    criados por criar_linha"""
+
+    def __init__(self, frame: ctk.CTkFrame, janela: int, widgets: Any):
+        self.frame = frame
+        self.janela = janela
+        self.widgets = widgets
+        self.indice: Optional[int] = None
+
+
+class TabelaVirtual(ctk.CTkFrame):
+    """Tabela com rolagem que só cria widgets para as linhas visíveis.
+
+    Em vez de um CTkFrame por registro, mantém apenas linhas suficientes
+    para preencher a área visível, posicionadas num canvas do tamanho da
+    lista inteira. Ao rolar, as linhas que saem da tela são reaproveitadas
+    para os registros que entram, então o número de widgets não depende da
+    quantidade de registros.
+
+    criar_linha(frame) monta os widgets de uma linha e devolve o que
+    preencher_linha(widgets, item, indice) precisa para exibir um registro.
+    """
+
+    def __init__(
+            self,
+            master,
+            criar_linha: Callable[[ctk.CTkFrame], Any],
+            preencher_linha: Callable[[Any, Any, int], None],
+            altura_linha: int = 44,
+            ao_selecionar: Optional[Callable[[Any], None]] = None,
+            mensagem_vazia: str = "📭 Nenhum registro encontrado",
+            **kwargs):
+
+        super().__init__(master, **kwargs)
+
+        self._criar_linha = criar_linha
+        self._preencher_linha = preencher_linha
+        self._altura_linha = altura_linha
+        self._ao_selecionar = ao_selecionar
+
+        self._itens: list = []
+        self._linhas: list[_Linha] = []
+        self._selecionado: Optional[int] = None
+
+        self._vazio = ctk.CTkLabel(
+            self, text=mensagem_vazia, font=ctk.CTkFont(size=14))
+
+        self._canvas = tkinter.Canvas(
+            self, highlightthickness=0, bg=self._cor_fundo(),
+            yscrollincrement=max(1, altura_linha // 2))
+        self._barra = ctk.CTkScrollbar(self, command=self._canvas.yview)
+        self._canvas.configure(yscrollcommand=self._ao_rolar)
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self._canvas.grid(row=0, column=0, sticky="nsew", padx=(5, 0), pady=5)
+        self._barra.grid(row=0, column=1, sticky="ns", pady=5)
+
+        self._canvas.bind("<Configure>", lambda e: self._redimensionar())
+
+        # Mesmo esquema do CTkScrollableFrame: a roda do mouse é capturada
+        # globalmente e só rola se o ponteiro estiver sobre esta tabela.
+        # Os funcids ficam guardados para destroy() tirar só estes handlers
+        if "linux" in sys.platform:
+            sequencias = ("<Button-4>", "<Button-5>")
+        else:
+            sequencias = ("<MouseWheel>",)
+        self._bindings_roda = [
+            (sequencia, self.bind_all(sequencia, self._roda_do_mouse, add=True))
+            for sequencia in sequencias]
+
+        self._mostrar_vazio()
+
+    def destroy(self) -> None:
+
+        # unbind_all apagaria também os handlers de outros widgets, então
+        # o script da tag "all" é regravado sem as linhas desta tabela
+        for sequencia, funcid in self._bindings_roda:
+            script = self.tk.call("bind", "all", sequencia)
+            restante = "\n".join(linha for linha in script.split("\n")
+                                 if funcid not in linha)
+            self.tk.call("bind", "all", sequencia, restante)
+            self.deletecommand(funcid)
+        self._bindings_roda = []
+
+        super().destroy()
+
+    @property
+    def itens(self) -> list:
+        return self._itens
+
+    @property
+    def item_selecionado(self) -> Any:
+        if self._selecionado is None or self._selecionado >= len(self._itens):
+            return None
+        return self._itens[self._selecionado]
+
+    def definir_itens(self, itens: list, mensagem_vazia: Optional[str] = None) -> None:
+        """Troca todos os registros e volta ao topo"""
+
+        if mensagem_vazia is not None:
+            self._vazio.configure(text=mensagem_vazia)
+
+        self._itens = list(itens)
+        self._selecionado = None
+        self._invalidar_linhas()
+        self._atualizar_regiao()
+        self._canvas.yview_moveto(0)
+        self._renderizar()
+
+    def acrescentar_itens(self, itens: list) -> None:
+        """Adiciona registros ao fim mantendo a posição da rolagem"""
+
+        self._itens.extend(itens)
+        self._atualizar_regiao()
+        self._renderizar()
+
+    def atualizar(self) -> None:
+        """Redesenha as linhas visíveis (após alterar algum registro)"""
+
+        self._invalidar_linhas()
+        self._renderizar()
+
+    def limpar_selecao(self) -> None:
+
+        self._selecionado = None
+        self._colorir_linhas()
+
+    def _cor_fundo(self) -> str:
+        cor = self.cget("fg_color")
+        if cor == "transparent":
+            cor = self.cget("bg_color")
+        return self._apply_appearance_mode(cor)
+
+    def _set_appearance_mode(self, mode_string):
+        super()._set_appearance_mode(mode_string)
+        self._canvas.configure(bg=self._cor_fundo())
+
+    def _ao_rolar(self, primeiro, ultimo) -> None:
+
+        self._barra.set(primeiro, ultimo)
+        self._renderizar()
+
+    def _roda_do_mouse(self, event) -> None:
+
+        try:
+            if not self.winfo_exists() or not self._sob_a_tabela(event.widget):
+                return
+        except (tkinter.TclError, KeyError):
+            return
+
+        if sys.platform.startswith("win"):
+            passos = -int(event.delta / 120) * 2
+        elif sys.platform == "darwin":
+            passos = -event.delta
+        else:
+            passos = -1 if event.num == 4 else 1
+
+        if self._canvas.yview() != (0.0, 1.0):
+            self._canvas.yview_scroll(passos, "units")
+
+    def _sob_a_tabela(self, widget) -> bool:
+        if isinstance(widget, str):
+            return widget == str(self) or widget.startswith(str(self) + ".")
+        while widget is not None:
+            if widget is self:
+                return True
+            widget = widget.master
+        return False
+
+    def _redimensionar(self) -> None:
+
+        largura = self._canvas.winfo_width()
+        visiveis = math.ceil(self._canvas.winfo_height() / self._altura_linha) + 1
+
+        while len(self._linhas) < visiveis:
+            self._linhas.append(self._nova_linha())
+
+        for linha in self._linhas:
+            self._canvas.itemconfigure(linha.janela, width=largura)
+
+        self._atualizar_regiao()
+        self._renderizar()
+
+    def _nova_linha(self) -> _Linha:
+
+        frame = ctk.CTkFrame(self._canvas, fg_color=COR_LINHA)
+        janela = self._canvas.create_window(
+            0, -self._altura_linha, window=frame, anchor="nw",
+            width=self._canvas.winfo_width(),
+            height=self._altura_linha - 2,
+            state="hidden")
+        widgets = self._criar_linha(frame)
+
+        linha = _Linha(frame, janela, widgets)
+        self._vincular_clique(frame, linha)
+        return linha
+
+    def _vincular_clique(self, widget, linha: _Linha) -> None:
+        """Clique em qualquer parte da linha (menos botões) seleciona o registro"""
+
+        if self._ao_selecionar is None:
+            return
+
+        widget.bind("<Button-1>", lambda e: self._selecionar(linha))
+        for filho in widget.winfo_children():
+            if isinstance(filho, ctk.CTkFrame):
+                self._vincular_clique(filho, linha)
+            elif isinstance(filho, ctk.CTkLabel):
+                filho.bind("<Button-1>", lambda e: self._selecionar(linha))
+
+    def _selecionar(self, linha: _Linha) -> None:
+
+        if linha.indice is None:
+            return
+
+        self._selecionado = linha.indice
+        self._colorir_linhas()
+        self._ao_selecionar(self._itens[linha.indice])
+
+    def _colorir_linhas(self) -> None:
+
+        for linha in self._linhas:
+            selecionada = linha.indice is not None and linha.indice == self._selecionado
+            linha.frame.configure(
+                fg_color=COR_LINHA_SELECIONADA if selecionada else COR_LINHA)
+
+    def _invalidar_linhas(self) -> None:
+        for linha in self._linhas:
+            linha.indice = None
+
+    def _atualizar_regiao(self) -> None:
+
+        altura = len(self._itens) * self._altura_linha
+        self._canvas.configure(
+            scrollregion=(0, 0, self._canvas.winfo_width(), altura))
+
+    def _mostrar_vazio(self) -> None:
+        if self._itens:
+            self._vazio.place_forget()
+        else:
+            self._vazio.place(relx=0.5, rely=0.3, anchor="center")
+
+    def _renderizar(self) -> None:
+        """Associa as linhas do pool aos registros da área visível"""
+
+        self._mostrar_vazio()
+
+        topo = max(0, int(self._canvas.canvasy(0)))
+        primeiro = topo // self._altura_linha
+        ultimo = min(len(self._itens), primeiro + len(self._linhas))
+        visiveis = range(primeiro, ultimo)
+
+        livres = []
+        ocupados = set()
+        for linha in self._linhas:
+            if linha.indice is not None and linha.indice in visiveis:
+                ocupados.add(linha.indice)
+            else:
+                livres.append(linha)
+
+        for indice in visiveis:
+            if indice in ocupados:
+                continue
+            linha = livres.pop()
+            linha.indice = indice
+            self._preencher_linha(linha.widgets, self._itens[indice], indice)
+            selecionada = indice == self._selecionado
+            linha.frame.configure(
+                fg_color=COR_LINHA_SELECIONADA if selecionada else COR_LINHA)
+            self._canvas.coords(linha.janela, 0, indice * self._altura_linha)
+            self._canvas.itemconfigure(linha.janela, state="normal")
+
+        # Sobras ficam acima da região rolável, fora da vista
+        for linha in livres:
+            linha.indice = None
+            self._canvas.coords(linha.janela, 0, -self._altura_linha)
+            self._canvas.itemconfigure(linha.janela, state="hidden")
@@ -0,0 +1,172 @@
+import queue
+import tkinter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional
+
+
+# Intervalo (ms) com que a thread do Tk recolhe os resultados prontos
+INTERVALO_COLETA = 30
+
+
+class ExecutorTarefas:
+    """Roda chamadas ao backend fora da thread do Tk.
+
+    As funções vão para um pool de threads; o resultado volta por uma fila
+    que a thread principal esvazia com root.after, então ao_concluir e
+    ao_falhar sempre rodam na thread do Tk e podem mexer nos widgets.
+
+    Tarefas com a mesma chave se substituem: ao disparar uma nova, a
+    anterior é cancelada se ainda não começou e, se já estiver rodando,
+    o resultado dela é descartado quando chegar.
+    """
+
+    def __init__(self, root, max_workers: int = 4):
+        self._root = root
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="biblioteca-ui")
+        self._prontas: queue.Queue = queue.Queue()
+        self._geracoes: dict[str, int] = {}
+        self._futuros: dict[str, Future] = {}
+        self._pendentes = 0
+        self._silenciosas = 0
+        self._coleta_agendada = False
+        self._encerrado = False
+
+    @property
+    def ocupado(self) -> bool:
+        return self._pendentes > 0
+
+    def executar(
+            self,
+            funcao: Callable[..., Any],
+            *args,
+            ao_concluir: Optional[Callable[[Any], None]] = None,
+            ao_falhar: Optional[Callable[[Exception], None]] = None,
+            chave: Optional[str] = None,
+            desabilitar: Iterable = (),
+            silenciosa: bool = False,
+            **kwargs) -> Optional[Future]:
+        """Agenda funcao(*args, **kwargs) no pool.
+
+        Os widgets em desabilitar ficam com state="disabled" até a tarefa
+        terminar. Sem ao_falhar, a exceção é apenas registrada no console.
+        Tarefas silenciosas (varreduras, consultas periódicas) não trocam o
+        cursor para "ocupado".
+        """
+
+        if self._encerrado:
+            return None
+
+        geracao = None
+        if chave is not None:
+            geracao = self._geracoes.get(chave, 0) + 1
+            self._geracoes[chave] = geracao
+            anterior = self._futuros.get(chave)
+            if anterior is not None:
+                anterior.cancel()
+
+        widgets = list(desabilitar)
+        self._alterar_estado(widgets, "disabled")
+        self._pendentes += 1
+        if silenciosa:
+            self._silenciosas += 1
+        self._atualizar_cursor()
+
+        futuro = self._pool.submit(funcao, *args, **kwargs)
+        if chave is not None:
+            self._futuros[chave] = futuro
+
+        def ao_terminar(f: Future):
+            self._prontas.put(
+                (f, chave, geracao, widgets, silenciosa, ao_concluir, ao_falhar))
+
+        futuro.add_done_callback(ao_terminar)
+        self._agendar_coleta()
+        return futuro
+
+    def em_andamento(self, chave: str) -> bool:
+        """Se já existe tarefa com esta chave aguardando resultado.
+
+        Útil para operações de escrita (empréstimo, devolução), em que
+        um segundo clique deve ser ignorado em vez de substituir o primeiro.
+        """
+        return chave in self._futuros
+
+    def cancelar(self, chave: str) -> None:
+        """Descarta a tarefa pendente com esta chave"""
+
+        self._geracoes[chave] = self._geracoes.get(chave, 0) + 1
+        futuro = self._futuros.pop(chave, None)
+        if futuro is not None:
+            futuro.cancel()
+
+    def encerrar(self) -> None:
+        """Cancela o que ainda não começou e libera as threads"""
+
+        self._encerrado = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _agendar_coleta(self) -> None:
+        if not self._coleta_agendada and not self._encerrado:
+            self._coleta_agendada = True
+            self._root.after(INTERVALO_COLETA, self._coletar)
+
+    def _coletar(self) -> None:
+        """Entrega na thread do Tk os resultados que ficaram prontos"""
+
+        self._coleta_agendada = False
+
+        while True:
+            try:
+                item = self._prontas.get_nowait()
+            except queue.Empty:
+                break
+            self._entregar(*item)
+
+        if self._pendentes > 0:
+            self._agendar_coleta()
+
+    def _entregar(self, futuro: Future, chave, geracao, widgets, silenciosa,
+                  ao_concluir, ao_falhar) -> None:
+
+        self._pendentes -= 1
+        if silenciosa:
+            self._silenciosas -= 1
+        self._alterar_estado(widgets, "normal")
+        self._atualizar_cursor()
+
+        if chave is not None:
+            if self._geracoes.get(chave) != geracao:
+                return
+            self._futuros.pop(chave, None)
+
+        if futuro.cancelled() or self._encerrado:
+            return
+
+        erro = futuro.exception()
+        try:
+            if erro is not None:
+                if ao_falhar is not None:
+                    ao_falhar(erro)
+                else:
+                    print(f"✗ Erro em tarefa de segundo plano: {erro}")
+            elif ao_concluir is not None:
+                ao_concluir(futuro.result())
+        except tkinter.TclError as e:
+            # A janela que ia receber o resultado foi fechada no meio tempo
+            print(f"✗ Resultado descartado: {e}")
+
+    def _alterar_estado(self, widgets: list, estado: str) -> None:
+        for widget in widgets:
+            try:
+                if widget.winfo_exists():
+                    widget.configure(state=estado)
+            except tkinter.TclError:
+                pass
+
+    def _atualizar_cursor(self) -> None:
+        try:
+            ocupado = self._pendentes > self._silenciosas
+            self._root.configure(cursor="watch" if ocupado else "")
+        except tkinter.TclError:
+            pass